@@ -0,0 +1,171 @@
+"""Sound effects.
+
+The simulation posts named events to World.audio as they happen: a shot
+(the player's or a ranged enemy's), a beam, an explosion, a hit, an enemy
+death, a power-up, the player getting hurt, a new wave. Posting only
+appends to a bounded queue. AudioEngine.update(), once per frame, drains
+the queue and plays the sounds through a fixed number of voices. A burst of
+one sound in a single frame is merged into a couple of plays. When every
+voice is busy, the oldest of the least important ones is stolen.
+
+The sounds are synthesised with NumPy, so there are no asset files. The
+samples are computed once on a loader thread, so synthesis doesn't delay
+the first frame. SDL isn't safe to initialise from two threads, so the
+mixer is opened, and the samples turned into Sounds, by the first update()
+on the main thread after the loader is done. Events that arrive before then
+are dropped rather than waited for. With no audio device, or with
+enabled=False, the engine is silent but still drains and counts events.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+import pygame
+
+from simulation import SCREEN_WIDTH
+
+SAMPLE_RATE = 22050
+MAX_PER_FRAME = 2  # plays of the same sound per update; the rest of a burst is merged into them
+
+# name: (priority, volume, waveform, start Hz, end Hz, seconds). Higher priority steals lower.
+SOUNDS = {
+    "shot": (1, 0.25, "square", 1400, 500, 0.06),
+    "enemy_shot": (1, 0.2, "saw", 700, 350, 0.08),
+    "beam": (2, 0.3, "saw", 2200, 1800, 0.2),
+    "hit": (2, 0.35, "noise", 3000, 1200, 0.05),
+    "enemy_death": (3, 0.5, "noise", 900, 60, 0.3),
+    "explosion": (4, 0.7, "noise", 400, 30, 0.5),
+    "powerup": (4, 0.45, "square", 660, 1320, 0.25),
+    "player_hurt": (4, 0.6, "saw", 240, 90, 0.3),
+    "wave_start": (5, 0.45, "square", 440, 880, 0.35),
+}
+
+def synth(waveform, start, end, seconds, rate, rng):
+    """A pitch sweep from `start` to `end` Hz with a fast attack and quadratic decay, in -1..1."""
+    n = int(rate * seconds)
+    cycles = np.cumsum(np.geomspace(start, end, n)) / rate
+    if waveform == "square":
+        wave = np.where(cycles % 1.0 < 0.5, 1.0, -1.0)
+    elif waveform == "saw":
+        wave = 2.0 * (cycles % 1.0) - 1.0
+    else:
+        # Noise held for one cycle at a time, so the sweep is audible as pitch
+        wave = rng.uniform(-1.0, 1.0, int(cycles[-1]) + 1)[cycles.astype(np.int64)]
+    envelope = (1.0 - np.arange(n) / n) ** 2
+    attack = min(n, int(rate * 0.004))
+    envelope[:attack] *= np.linspace(0.0, 1.0, attack)
+    return wave * envelope
+
+def make_samples(name, rate, rng):
+    """Mono 16-bit samples of a sound; NumPy only, so safe off the main thread."""
+    priority, volume, waveform, start, end, seconds = SOUNDS[name]
+    return (synth(waveform, start, end, seconds, rate, rng) * 32767 * volume).astype(np.int16)
+
+def to_sound(samples, channels):
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+
+def make_sound(name, rate, channels, rng):
+    return to_sound(make_samples(name, rate, rng), channels)
+
+class AudioEngine:
+    """Plays the simulation's sound events through `voices` mixer channels."""
+
+    def __init__(self, voices=8, enabled=True):
+        self.voice_count = voices
+        self.events = deque(maxlen=64)  # (name, x) posted by the simulation; the oldest go first if it overflows
+        self.samples = None  # name -> int16 array at SAMPLE_RATE, published by the loader thread
+        self.sounds = {}  # name -> pygame Sound, built from the samples by the first update() after loading
+        self.channels = []
+        self.voices = [(0, 0)] * voices  # (priority, serial) of what each channel was last given
+        self.serial = 0
+        self.played = 0
+        self.stolen = 0
+        self.merged = 0
+        self.dropped = 0  # not played: no free voice, or no sounds yet
+        self.ready = threading.Event()  # set once the samples are built (or the engine is silent)
+        self.silent = not enabled
+        if enabled:
+            threading.Thread(target=self.load, name="audio-load", daemon=True).start()
+        else:
+            self.ready.set()
+
+    def load(self):
+        # Loader thread: synthesis only, no SDL calls
+        try:
+            rng = np.random.default_rng(0)
+            self.samples = {name: make_samples(name, SAMPLE_RATE, rng) for name in SOUNDS}
+        finally:
+            self.ready.set()
+
+    def open(self):
+        """Open the mixer and build the Sounds; main thread only."""
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=512)
+            pygame.mixer.set_num_channels(self.voice_count)
+            rate, _, channels = pygame.mixer.get_init()
+            samples = self.samples
+            if rate != SAMPLE_RATE:
+                # The device wouldn't run at our rate; synthesise again at its own
+                rng = np.random.default_rng(0)
+                samples = {name: make_samples(name, rate, rng) for name in SOUNDS}
+            sounds = {name: to_sound(samples[name], channels) for name in SOUNDS}
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.voice_count)]
+            self.sounds = sounds
+        except pygame.error:
+            self.silent = True  # no audio device; play on without sound
+
+    def post(self, name, x=None):
+        """Queue a sound; `x` pans it toward that side of the screen. Never blocks."""
+        self.events.append((name, x))
+
+    def update(self):
+        """Play everything posted since the last call."""
+        if not self.sounds and not self.silent and self.samples is not None:
+            self.open()
+        events = self.events
+        if not events:
+            return
+        if not self.sounds:
+            self.dropped += len(events)
+            events.clear()
+            return
+        plays = {}
+        while events:
+            name, x = events.popleft()
+            count = plays.get(name, 0)
+            if count >= MAX_PER_FRAME:
+                self.merged += 1
+                continue
+            plays[name] = count + 1
+            self.play(name, x)
+
+    def play(self, name, x=None):
+        priority = SOUNDS[name][0]
+        voice = self.free_voice(priority)
+        if voice < 0:
+            self.dropped += 1
+            return
+        self.serial += 1
+        self.voices[voice] = (priority, self.serial)
+        channel = self.channels[voice]
+        channel.play(self.sounds[name])
+        if x is None:
+            channel.set_volume(1.0)
+        else:
+            pan = min(max(x / SCREEN_WIDTH, 0.0), 1.0)
+            channel.set_volume(1.0 - 0.7 * pan, 0.3 + 0.7 * pan)
+        self.played += 1
+
+    def free_voice(self, priority):
+        """An idle channel, or the one to steal for a sound of `priority`; -1 if none may be."""
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+        voice = min(range(self.voice_count), key=self.voices.__getitem__)
+        if self.voices[voice][0] > priority:
+            return -1
+        self.stolen += 1
+        return voice
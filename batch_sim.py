@@ -0,0 +1,164 @@
+"""Headless batch simulator for wave-balance sweeps.
+
+Plays N games per parameter set with a scripted player (aim at the nearest
+enemy, fire whenever the shot cooldown allows) across a multiprocessing pool
+and reports the distribution of waves survived, score and time to death.
+
+    python batch_sim.py --games 200
+    python batch_sim.py --games 100 --sweep bullet_damage=1,2 --sweep wave_heal=0,30
+    python batch_sim.py --games 100 --sweep enemy_speed_scale=0.8,1,1.2 --sweep wave_growth=2,3,4
+    python batch_sim.py --games 100 --sweep contact_damage=10,20,30 --json results.json
+    python batch_sim.py --games 100 --waves waves/classic.json
+
+Any numeric World balance knob can be swept: wave_heal, bullet_damage,
+bullet_speed, contact_damage, enemy_shot_damage, wave_break_duration,
+enemy_separation. Enemy stats and wave contents come from the wave script
+(see wavescript.py), chosen with --waves, and these knobs override it for
+each game:
+
+    enemy_speed_min, enemy_speed_max   every archetype's speed range
+    enemy_speed_scale                  multiplies every archetype's speed range
+    wave_base, wave_growth,            the endless waves' size, min(base + growth * wave, max)
+    max_wave_size
+    enemy_spawn_delay                  ticks between endless spawns
+"""
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # one banner per worker is noise
+
+from profiler import percentile
+from simulation import TICK_RATE, Inputs, World
+from wavescript import WaveScript, default_script
+
+WORLD_KNOBS = ["wave_heal", "bullet_damage", "bullet_speed", "contact_damage", "enemy_shot_damage",
+               "wave_break_duration", "enemy_separation"]
+ENDLESS_KNOBS = {"wave_base": "base", "wave_growth": "growth", "max_wave_size": "max",
+                 "enemy_spawn_delay": "interval"}
+SCRIPT_KNOBS = ["enemy_speed_min", "enemy_speed_max", "enemy_speed_scale"] + list(ENDLESS_KNOBS)
+SWEEPABLE = WORLD_KNOBS + SCRIPT_KNOBS
+
+def bot_inputs(world):
+    """Scripted player: aim at the nearest enemy and fire whenever the gun is ready."""
+    player = world.player
+    enemies = world.enemies
+    target = enemies.nearest(player.x, player.y)
+    if target < 0:
+        return Inputs((player.x + 100, player.y), False)
+    return Inputs((float(enemies.x[target]), float(enemies.y[target])), player.can_shoot(world.tick))
+
+def override_script(script, params):
+    """A copy of the wave script with the SCRIPT_KNOBS in `params` applied."""
+    spec = copy.deepcopy(script.spec)
+    for archetype in spec["archetypes"].values():
+        low, high = archetype.get("speed", (2.5, 4.5))
+        low = params.get("enemy_speed_min", low)
+        high = params.get("enemy_speed_max", high)
+        scale = params.get("enemy_speed_scale", 1)
+        archetype["speed"] = [low * scale, high * scale]
+    for name, key in ENDLESS_KNOBS.items():
+        if name in params:
+            spec.setdefault("endless", {})[key] = int(params[name])
+    return WaveScript(spec, script.path)
+
+def play_game(task):
+    params, seed, max_ticks, waves = task
+    script = WaveScript.load(waves) if waves else default_script()
+    if any(name in params for name in SCRIPT_KNOBS):
+        script = override_script(script, params)
+    world = World(waves=script)
+    for name, value in params.items():
+        if name in WORLD_KNOBS:
+            setattr(world, name, value)
+    world.reset(seed)
+    while not world.game_over and world.tick < max_ticks:
+        world.step(bot_inputs(world))
+    return {
+        "params": params,
+        "seed": seed,
+        "waves_survived": world.wave_number - 1,
+        "score": world.score,
+        "time_to_death": world.tick / TICK_RATE if world.game_over else None,
+    }
+
+def parse_sweep(specs):
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in SWEEPABLE or not values:
+            raise SystemExit(f"bad --sweep {spec!r}; expected NAME=V1,V2,... with NAME one of {', '.join(SWEEPABLE)}")
+        axes.append([(name, float(v) if "." in v else int(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)] or [{}]
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "mean": statistics.fmean(values),
+        "p10": percentile(values, 10),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "min": min(values),
+        "max": max(values),
+    }
+
+def format_stats(stats, fmt):
+    if stats is None:
+        return "-"
+    return " / ".join(format(stats[k], fmt) for k in ("p10", "p50", "p90"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless games across a process pool for balance sweeps.")
+    parser.add_argument("--games", type=int, default=100, help="games per parameter set")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="first seed; game i uses seed + i")
+    parser.add_argument("--max-minutes", type=float, default=30.0,
+                        help="stop a game after this much simulated time")
+    parser.add_argument("--waves", metavar="FILE", help="wave script to play instead of waves/default.json")
+    parser.add_argument("--json", metavar="FILE", help="also write per-game results and summaries here")
+    args = parser.parse_args(argv)
+
+    param_sets = parse_sweep(args.sweep)
+    max_ticks = int(args.max_minutes * 60 * TICK_RATE)
+    tasks = [(params, args.seed + i, max_ticks, args.waves) for params in param_sets for i in range(args.games)]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.map(play_game, tasks, chunksize=max(1, len(tasks) // (args.workers * 4)))
+    elapsed = time.perf_counter() - start
+
+    summaries = []
+    print(f"{len(tasks)} games on {args.workers} workers in {elapsed:.1f}s")
+    print("waves / score / time-to-death shown as p10 / p50 / p90")
+    for params in param_sets:
+        games = [r for r in results if r["params"] == params]
+        deaths = [r["time_to_death"] for r in games if r["time_to_death"] is not None]
+        summary = {
+            "params": params,
+            "games": len(games),
+            "waves_survived": summarize([r["waves_survived"] for r in games]),
+            "score": summarize([r["score"] for r in games]),
+            "time_to_death": summarize(deaths),
+            "survived_to_limit": len(games) - len(deaths),
+        }
+        summaries.append(summary)
+        label = ", ".join(f"{k}={v}" for k, v in params.items()) or "defaults"
+        print(f"{label}: waves {format_stats(summary['waves_survived'], 'd')} | "
+              f"score {format_stats(summary['score'], 'd')} | "
+              f"death {format_stats(summary['time_to_death'], '.0f')}s | "
+              f"alive at limit {summary['survived_to_limit']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"summaries": summaries, "games": results}, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Allocation and GC benchmark: a headless session of 30 cleared waves with the
+scripted player (restarting on death), comparing the pooled Bullet storage
+against allocating a fresh object for every shot. Enemies live in
+EnemyManager arrays and allocate no objects at all.
+
+Reports entity allocations per tick and the number and duration of garbage
+collector passes (from gc.callbacks) per generation.
+
+    python benchmarks/bench_alloc.py [--waves N] [--seed N]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_sim import bot_inputs
+from simulation import Pool, World
+
+class NoReusePool(Pool):
+    # Baseline: every acquire allocates, released objects become garbage
+    def acquire(self, *args):
+        self.free.clear()
+        self.created += 1
+        return self.factory(*args)
+
+class GCWatcher:
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pause = [0.0, 0.0, 0.0]
+        self.max_pause = 0.0
+        self.started = 0.0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+        else:
+            elapsed = time.perf_counter() - self.started
+            generation = info["generation"]
+            self.collections[generation] += 1
+            self.pause[generation] += elapsed
+            self.max_pause = max(self.max_pause, elapsed)
+
+def run_session(waves, seed, pooled):
+    world = World()
+    if not pooled:
+        world.bullet_pool = NoReusePool(world.bullet_pool.factory)
+    world.reset(seed)
+
+    gc.collect()
+    watcher = GCWatcher()
+    gc.callbacks.append(watcher)
+    start = time.perf_counter()
+    ticks = cleared = 0
+    try:
+        while cleared < waves:
+            wave = world.wave_number
+            world.step(bot_inputs(world))
+            ticks += 1
+            cleared += world.wave_number - wave
+            if world.game_over:
+                # Keep playing into the same pools so a death doesn't end the session
+                world.reset(world.seed + 1)
+    finally:
+        gc.callbacks.remove(watcher)
+    elapsed = time.perf_counter() - start
+
+    allocations = world.bullet_pool.created
+    return ticks, allocations, watcher, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--waves", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.waves}-wave session, seed {args.seed}")
+    print(f"{'storage':>9} {'ticks':>7} {'entity allocs':>14} {'allocs/tick':>12} "
+          f"{'gc gen0/1/2':>14} {'gc total ms':>12} {'gc max ms':>10} {'ticks/s':>9}")
+    for name, pooled in (("unpooled", False), ("pooled", True)):
+        ticks, allocations, gc_stats, elapsed = run_session(args.waves, args.seed, pooled)
+        collections = "/".join(str(c) for c in gc_stats.collections)
+        print(f"{name:>9} {ticks:>7} {allocations:>14} {allocations / ticks:>12.4f} {collections:>14} "
+              f"{sum(gc_stats.pause) * 1000:>12.2f} {gc_stats.max_pause * 1000:>10.3f} {ticks / elapsed:>9.0f}")
+
+if __name__ == "__main__":
+    main()
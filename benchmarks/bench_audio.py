@@ -0,0 +1,84 @@
+"""Audio benchmark: frame-loop cost of sound playback during a bot game from
+a late wave, with a 25-enemy wipe posted every two seconds on top.
+
+The baseline builds each sound when its event arrives and plays every event
+on whatever channel pygame hands out. The engine plays preloaded sounds,
+merges bursts and steals voices. Runs on the dummy audio driver, so it
+measures the mixer calls, not the speakers.
+
+    python benchmarks/bench_audio.py [--frames N] [--wave N] [--voices N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pygame
+
+from audio import AudioEngine, make_sound
+from batch_sim import bot_inputs
+from profiler import percentile
+from simulation import SCREEN_WIDTH, World
+
+WIPE = 25
+
+class NaiveAudio(AudioEngine):
+    # Baseline: no preloading, merging or voice limit
+    def __init__(self, voices=8):
+        super().__init__(voices)
+        self.events = deque()
+        self.rng = np.random.default_rng(0)
+
+    def update(self):
+        rate, _, channels = pygame.mixer.get_init()
+        while self.events:
+            name, x = self.events.popleft()
+            make_sound(name, rate, channels, self.rng).play()
+            self.played += 1
+
+def run(audio, frames, wave):
+    world = World(seed=1)
+    world.start_at_wave(wave)
+    world.audio = audio
+    audio.ready.wait()
+    audio.update()  # opens the mixer and builds the sounds, outside the timed loop
+    times = []
+    for frame in range(frames):
+        world.step(bot_inputs(world))
+        if world.game_over:
+            world.reset(world.seed + 1)
+            world.start_at_wave(wave)
+        if frame % 120 == 0:
+            for i in range(WIPE):
+                audio.post("hit", i * SCREEN_WIDTH / WIPE)
+                audio.post("enemy_death", i * SCREEN_WIDTH / WIPE)
+        start = time.perf_counter()
+        audio.update()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--wave", type=int, default=8)
+    parser.add_argument("--voices", type=int, default=8)
+    args = parser.parse_args()
+
+    pygame.mixer.init()
+    print(f"{args.frames} frames from wave {args.wave}, {args.voices} voices, a {WIPE}-enemy wipe every 120 frames")
+    print(f"{'engine':>9} {'mean ms':>8} {'p99 ms':>7} {'max ms':>7} {'played':>7} {'merged':>7} "
+          f"{'stolen':>7} {'dropped':>8}")
+    for name, audio in (("naive", NaiveAudio(args.voices)), ("engine", AudioEngine(args.voices))):
+        times = run(audio, args.frames, args.wave)
+        print(f"{name:>9} {statistics.fmean(times):>8.4f} {percentile(times, 99):>7.3f} {max(times):>7.3f} "
+              f"{audio.played:>7} {audio.merged:>7} {audio.stolen:>7} {audio.dropped:>8}")
+
+if __name__ == "__main__":
+    main()
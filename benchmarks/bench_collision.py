@@ -0,0 +1,83 @@
+"""Collision benchmark: frame time of the spatial-hash broadphase against the
+old nested bullets x enemies loop, at increasing enemy counts.
+
+    python benchmarks/bench_collision.py [--frames N] [--bullets N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, ORANGE, RED, Bullet, Inputs, World
+
+ENEMY_COUNTS = [100, 1000, 10000]
+
+def populate(world, enemy_count, bullet_count):
+    world.reset()
+    world.player.health = 10 ** 9  # never die mid-benchmark
+    for _ in range(enemy_count):
+        world.enemies.spawn(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), 3.5)
+    refill_bullets(world, bullet_count)
+
+def refill_bullets(world, bullet_count):
+    while len(world.bullets) < bullet_count:
+        world.bullets.append(Bullet(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT),
+                                    random.uniform(-math.pi, math.pi)))
+
+def naive_collisions(world):
+    # The original main-loop implementation (every bullet against every enemy), kept as the baseline
+    enemies = world.enemies
+    cx, cy = enemies.centers()
+    alive = [True] * len(enemies)
+    for bullet in world.bullets:
+        for i in range(len(enemies)):
+            if alive[i] and bullet.rect.colliderect(enemies.rect(i, cx[i], cy[i])):
+                bullet.alive = False
+                world.create_explosion(enemies.x[i], enemies.y[i], ORANGE, 3)
+                if enemies.damage(i, 1):
+                    alive[i] = False
+                    enemies.kill(i)
+                    world.create_explosion(enemies.x[i], enemies.y[i], RED, 8)
+                break
+    world.bullet_pool.sweep(world.bullets)
+    enemies.sweep()
+
+def time_phase(world, phase, frames, bullet_count):
+    total = 0.0
+    for _ in range(frames):
+        refill_bullets(world, bullet_count)
+        start = time.perf_counter()
+        phase()
+        total += time.perf_counter() - start
+    return total / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--bullets", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1234)
+    world = World()
+    idle = Inputs((SCREEN_WIDTH, SCREEN_HEIGHT // 2), False)
+
+    print(f"{'enemies':>8} {'grid (ms)':>10} {'naive (ms)':>11} {'full step (ms)':>15}")
+    for count in ENEMY_COUNTS:
+        populate(world, count, args.bullets)
+        grid_ms = time_phase(world, world.handle_collisions, args.frames, args.bullets)
+
+        populate(world, count, args.bullets)
+        naive_frames = max(3, args.frames // (count // 100))
+        naive_ms = time_phase(world, lambda: naive_collisions(world), naive_frames, args.bullets)
+
+        populate(world, count, args.bullets)
+        step_ms = time_phase(world, lambda: world.step(idle), args.frames, args.bullets)
+
+        print(f"{count:>8} {grid_ms:>10.2f} {naive_ms:>11.2f} {step_ms:>15.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Enemy movement benchmark: per-tick cost of steering N enemies toward the
+player with the vectorised EnemyManager, with and without separation, against
+the original one-object-per-enemy move loop.
+
+    python benchmarks/bench_enemies.py [--ticks N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from enemies import EnemyManager
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT
+
+ENEMY_COUNTS = [25, 100, 500, 1000, 5000]
+
+class ObjectEnemy:
+    # The pre-manager Enemy: its own hypot() and Rect update every tick
+    __slots__ = ("x", "y", "speed", "rect")
+
+    def __init__(self, x, y, speed):
+        self.x, self.y, self.speed = x, y, speed
+        self.rect = pygame.Rect(0, 0, 18, 55)
+
+    def move(self, target_x, target_y):
+        dx = target_x - self.x
+        dy = target_y - self.y
+        distance = math.hypot(dx, dy)
+        if distance > 1:
+            self.x += (dx / distance) * self.speed
+            self.y += (dy / distance) * self.speed
+        self.rect.center = (self.x, self.y)
+
+def spawn_points(count):
+    return [(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), random.uniform(2.5, 4.5))
+            for _ in range(count)]
+
+def time_ticks(tick, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    return (time.perf_counter() - start) / ticks * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1234)
+    target = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    print(f"{'enemies':>8} {'objects (ms)':>13} {'arrays (ms)':>12} {'+separation (ms)':>17}")
+    for count in ENEMY_COUNTS:
+        points = spawn_points(count)
+
+        objects = [ObjectEnemy(x, y, speed) for x, y, speed in points]
+        def move_objects():
+            for enemy in objects:
+                enemy.move(*target)
+        object_ms = time_ticks(move_objects, args.ticks)
+
+        results = []
+        for separation in (0.0, 1.0):
+            manager = EnemyManager()
+            for x, y, speed in points:
+                manager.spawn(x, y, speed)
+            results.append(time_ticks(lambda: manager.move(*target, separation), args.ticks))
+
+        print(f"{count:>8} {object_ms:>13.3f} {results[0]:>12.3f} {results[1]:>17.3f}")
+
+if __name__ == "__main__":
+    main()
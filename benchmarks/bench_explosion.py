@@ -0,0 +1,113 @@
+"""Area damage benchmark: ms per hit query and its damage, for the grid and
+vectorised path against a Python loop over every enemy.
+
+Each trial fills the screen with enemies, rebuilds the enemy grid as the
+collision phase does, then times one hit:
+
+    screen     an explosion whose radius covers the whole screen
+    blast      an explosive round's blast where it lands
+    beam       a beam fired across the screen
+
+The baseline tests each enemy in turn and damages the ones it hits one by one
+with damage_enemy, which is how a single bullet hit is applied.
+
+    python benchmarks/bench_explosion.py [--enemies N] [--trials N] [--seed N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, World
+from spatial import segment_box_entry
+from weapons import BEAM_WIDTH, WEAPONS
+
+class LoopWorld(World):
+    # Baseline: every enemy tested and damaged one at a time, no grid
+    def enemies_in_radius(self, x, y, radius):
+        enemies = self.enemies
+        slots = []
+        for i in range(len(enemies)):
+            if enemies.alive[i]:
+                dx = max(abs(enemies.x[i] - x) - enemies.width[i] / 2, 0.0)
+                dy = max(abs(enemies.y[i] - y) - enemies.height[i] / 2, 0.0)
+                if dx * dx + dy * dy <= radius * radius:
+                    slots.append(i)
+        return slots
+
+    def enemies_on_ray(self, x0, y0, x1, y1, radius=0.0):
+        enemies = self.enemies
+        hits = []
+        for i in range(len(enemies)):
+            if enemies.alive[i]:
+                half_width = enemies.width[i] / 2 + radius
+                half_height = enemies.height[i] / 2 + radius
+                t = segment_box_entry(x0, y0, x1 - x0, y1 - y0, enemies.x[i] - half_width,
+                                      enemies.y[i] - half_height, enemies.x[i] + half_width,
+                                      enemies.y[i] + half_height)
+                if t is not None:
+                    hits.append((t, i))
+        return [i for _, i in sorted(hits)]
+
+    def damage_enemies(self, slots, amount):
+        for i in slots:
+            if self.enemies.alive[i]:
+                self.damage_enemy(i, amount)
+
+def fill(world, count, rng):
+    world.reset(rng.randrange(2 ** 32))
+    for _ in range(count):
+        archetype = rng.choice(world.waves.archetypes)
+        world.enemies.spawn(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), 0.0, archetype.health,
+                            archetype.index, archetype.width, archetype.height)
+    world.enemy_grid.rebuild_points(*world.enemies.centers())
+
+def hit(world, case, rng):
+    """Apply one hit of the given case; returns how many enemies it touched."""
+    before = world.enemies.health[:len(world.enemies)].copy()
+    if case == "screen":
+        world.explode(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2, math.hypot(SCREEN_WIDTH, SCREEN_HEIGHT) / 2, 1)
+    elif case == "blast":
+        weapon = WEAPONS["explosive"]
+        world.explode(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), weapon.blast, weapon.damage)
+    else:
+        weapon = WEAPONS["beam"]
+        y0 = rng.uniform(0, SCREEN_HEIGHT)
+        angle = rng.uniform(-0.3, 0.3)
+        slots = world.enemies_on_ray(0, y0, weapon.beam * math.cos(angle), y0 + weapon.beam * math.sin(angle),
+                                     BEAM_WIDTH)
+        if len(slots):
+            world.damage_enemies(slots, weapon.damage)
+    return int((world.enemies.health[:len(before)] != before).sum())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enemies", type=int, default=500)
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.enemies} enemies, {args.trials} trials per case, ms per hit")
+    print(f"{'case':>8} {'enemies hit':>12} {'loop':>8} {'grid':>8} {'speedup':>8}")
+    for case in ("screen", "blast", "beam"):
+        results = []
+        for world in (LoopWorld(), World()):
+            rng = random.Random(args.seed)
+            elapsed = 0.0
+            touched = 0
+            for _ in range(args.trials):
+                fill(world, args.enemies, rng)
+                start = time.perf_counter()
+                touched += hit(world, case, rng)
+                elapsed += time.perf_counter() - start
+            results.append((touched / args.trials, elapsed / args.trials * 1000))
+        (touched, loop_ms), (grid_touched, grid_ms) = results
+        assert touched == grid_touched, (case, touched, grid_touched)
+        print(f"{case:>8} {touched:>12.1f} {loop_ms:>8.3f} {grid_ms:>8.3f} {loop_ms / grid_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Netcode benchmark: an authoritative server with 8 scripted clients and a
+standing crowd of 200 enemies, all over loopback UDP.
+
+Reports the server's per-tick cost (simulation, snapshot capture and delta
+encoding for every client), the tick rate it actually held, and bandwidth
+per client in each direction, with the size a full snapshot would have had.
+The clients run in a separate process so the server has its core to itself.
+
+    python benchmarks/bench_netcode.py [--seconds N] [--clients N] [--enemies N] [--snapshot-rate N]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netcode import capture, encode
+from profiler import percentile
+from server import bot_process, serve
+from simulation import TICK_RATE, World
+
+class CrowdWorld(World):
+    # Waves replaced by a constant crowd, and nobody dies, so the load stays put
+    crowd = 200
+
+    def update_waves(self):
+        while len(self.enemies) < self.crowd:
+            self.spawn_enemy()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--enemies", type=int, default=200)
+    parser.add_argument("--snapshot-rate", type=int, default=20)
+    parser.add_argument("--port", type=int, default=9998)
+    args = parser.parse_args()
+
+    world = CrowdWorld(seed=1)
+    world.crowd = args.enemies
+    world.contact_damage = 0
+    world.enemy_separation = 1.0  # keep the crowd spread out instead of one stacked blob
+
+    results = multiprocessing.Queue()
+    bots = multiprocessing.Process(target=bot_process,
+                                   args=("127.0.0.1", args.port, args.clients, args.seconds + 1, results))
+    bots.start()
+    server = asyncio.run(serve("127.0.0.1", args.port, world, args.clients, args.snapshot_rate, args.seconds,
+                               record=True))
+    client_stats = results.get()
+    bots.join()
+
+    ticks = [t * 1000 for t in server.tick_times]
+    elapsed = args.seconds
+    conns = list(server.connections.values())
+    down = [conn.bytes_sent / elapsed for conn in conns]
+    up = [conn.bytes_received / elapsed for conn in conns]
+    snapshots = sum(conn.snapshots for conn in conns)
+    full_size = len(encode(capture(world)))
+
+    print(f"{len(conns)} clients, {len(world.enemies)} enemies, {args.snapshot_rate} snapshots/s, {elapsed:.0f}s")
+    print(f"server tick: mean {statistics.fmean(ticks):.2f} ms  p99 {percentile(ticks, 99):.2f} ms  "
+          f"max {max(ticks):.2f} ms  ({len(ticks) / elapsed:.1f} ticks/s of {TICK_RATE})")
+    print(f"snapshots: {snapshots} sent, {sum(conn.full_snapshots for conn in conns)} full, "
+          f"mean {sum(conn.bytes_sent for conn in conns) / max(1, snapshots):.0f} bytes "
+          f"(full snapshot now {full_size} bytes)")
+    print(f"per client: down {statistics.fmean(down) / 1024:.1f} KiB/s  up {statistics.fmean(up) / 1024:.2f} KiB/s")
+    print(f"client decode failures: {sum(dropped for _, dropped in client_stats)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Entity render benchmark: draw calls, Surface allocations and time per frame
+for the immediate-mode stickman/bullet drawing against the cached sprites.
+
+    python benchmarks/bench_render.py [--frames N] [--enemies N] [--bullets N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import sprites
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, BLUE, Bullet, World
+
+class Counters:
+    draw_calls = 0
+    allocations = 0
+
+class CountingSurface(pygame.Surface):
+    def __init__(self, *args, **kwargs):
+        Counters.allocations += 1
+        super().__init__(*args, **kwargs)
+
+    def blit(self, *args, **kwargs):
+        Counters.draw_calls += 1
+        return super().blit(*args, **kwargs)
+
+def counted(func):
+    def wrapper(*args, **kwargs):
+        Counters.draw_calls += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+def install_counters():
+    pygame.Surface = CountingSurface
+    for name in ("circle", "line", "rect"):
+        setattr(pygame.draw, name, counted(getattr(pygame.draw, name)))
+
+def draw_uncached(surface, world):
+    # The pre-cache drawing path: primitives per entity, temp surfaces per trail dot
+    player = world.player
+    sprites.draw_player_shape(surface, player.x, player.y, player.width, player.height,
+                              player.gun_length, player.gun_angle)
+    enemies = world.enemies
+    for i in range(len(enemies)):
+        sprites.draw_enemy_shape(surface, enemies.x[i], enemies.y[i], int(enemies.width[i]), int(enemies.height[i]),
+                                 enemies.health[i], enemies.max_health[i], enemies.hit_timer[i] > 0)
+    for bullet in world.bullets:
+        for i, pos in enumerate(bullet.trail):
+            alpha = int(255 * (i + 1) / len(bullet.trail))
+            size = int(bullet.radius * (i + 1) / len(bullet.trail))
+            s = pygame.Surface((size * 2, size * 2))
+            s.set_alpha(alpha // 2)
+            pygame.draw.circle(s, BLUE, (size, size), size)
+            surface.blit(s, (pos[0] - size, pos[1] - size))
+        pygame.draw.circle(surface, BLUE, (int(bullet.x), int(bullet.y)), bullet.radius)
+
+def draw_cached(surface, world):
+    sprites.draw_player(surface, world.player)
+    sprites.draw_enemies(surface, world.enemies)
+    for bullet in world.bullets:
+        sprites.draw_bullet(surface, bullet)
+
+def populate(world, enemy_count, bullet_count):
+    world.reset()
+    enemies = world.enemies
+    for _ in range(enemy_count):
+        i = enemies.spawn(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT), 3.5)
+        enemies.health[i] = random.choice([1, 2])
+        enemies.hit_timer[i] = random.choice([0, 0, 0, 5])
+    for _ in range(bullet_count):
+        bullet = Bullet(random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT),
+                        random.uniform(-math.pi, math.pi))
+        for _ in range(5):
+            bullet.move()
+        world.bullets.append(bullet)
+
+def measure(draw, surface, world, frames):
+    Counters.draw_calls = Counters.allocations = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(surface, world)
+    elapsed = time.perf_counter() - start
+    return Counters.draw_calls / frames, Counters.allocations / frames, elapsed / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--enemies", type=int, default=25)
+    parser.add_argument("--bullets", type=int, default=20)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    random.seed(1234)
+    world = World()
+    populate(world, args.enemies, args.bullets)
+
+    install_counters()
+    target = CountingSurface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    draw_cached(target, world)  # warm the sprite cache
+
+    print(f"{args.enemies} enemies, {args.bullets} bullets, {args.frames} frames")
+    print(f"{'path':>9} {'draw calls':>11} {'allocations':>12} {'ms/frame':>9}")
+    for name, draw in (("uncached", draw_uncached), ("cached", draw_cached)):
+        calls, allocs, ms = measure(draw, target, world, args.frames)
+        print(f"{name:>9} {calls:>11.1f} {allocs:>12.1f} {ms:>9.3f}")
+    print(f"sprite cache: {len(sprites.sprite_cache)} entries")
+
+if __name__ == "__main__":
+    main()
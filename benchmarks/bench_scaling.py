@@ -0,0 +1,110 @@
+"""Scaling benchmark: run the stress ramp (see stress.py) headless, simulating
+and drawing every frame to an offscreen surface, until every subsystem has
+gone over the frame budget, the level passes --max-enemies or a level's
+frames take longer than --max-frame-ms.
+
+Prints the mean ms of each subsystem at every level and the entity counts at
+which each one broke the budget. --json writes the same to a file, with the
+commit it was run at, so results from two commits can be diffed; --compare
+prints the breakpoints of an earlier run alongside.
+
+    python benchmarks/bench_scaling.py [--frames N] [--growth X] [--max-enemies N] [--max-frame-ms MS]
+                                        [--detail auto|0|1|2] [--separation S]
+    python benchmarks/bench_scaling.py --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+
+from lod import DETAILS, DetailController
+from profiler import BUDGET_MS, FrameProfiler
+from shooter import draw_world
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, Inputs, World
+from stress import BULLETS_PER_ENEMY, PARTICLES_PER_ENEMY, SUBSYSTEMS, StressRamp
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def run(ramp, surface, lod, max_enemies, max_frame_ms):
+    world = ramp.world
+    profiler = world.profiler = FrameProfiler()
+    inputs = Inputs((SCREEN_WIDTH // 2 + 100, SCREEN_HEIGHT // 2), False)
+    names = ["frame"] + list(SUBSYSTEMS)
+    print(f"{'enemies':>8} {'bullets':>8} {'particles':>10} " + " ".join(f"{name:>10}" for name in names))
+    reported = 0
+    while not ramp.finished() and ramp.enemy_target <= max_enemies:
+        if ramp.levels and ramp.levels[-1]["ms"]["frame"] > max_frame_ms:
+            break
+        ramp.fill()
+        profiler.begin_frame()
+        world.step(inputs)
+        draw_world(surface, world, inputs.mouse_pos, 1.0, profiler.lap, lod.detail)
+        frame_ms, _, phases, _ = profiler.end_frame()
+        ramp.record(frame_ms, phases)
+        lod.update(frame_ms, len(world.enemies), len(world.particles))
+        if len(ramp.levels) > reported:
+            level = ramp.levels[-1]
+            reported += 1
+            print(f"{level['enemies']:>8} {level['bullets']:>8} {level['particles']:>10} "
+                  + " ".join(f"{level['ms'][name]:>10.2f}" for name in names))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=30, help="frames averaged per level")
+    parser.add_argument("--start", type=int, default=25, help="enemies at the first level")
+    parser.add_argument("--growth", type=float, default=1.5, help="enemy count multiplier per level")
+    parser.add_argument("--max-enemies", type=int, default=50000)
+    parser.add_argument("--max-frame-ms", type=float, default=500,
+                        help="stop once a level's frames take this long, if anything is still in budget")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="ms")
+    parser.add_argument("--detail", choices=["auto"] + [str(level) for level in range(len(DETAILS))], default="0",
+                        help="rendering level of detail (see lod.py); fixed by default so runs compare like for like")
+    parser.add_argument("--separation", type=float, default=0.0, help="World.enemy_separation")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="FILE", help="write the levels and breakpoints to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="an earlier --json result to compare against")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert(screen)
+
+    world = World(seed=args.seed)
+    world.enemy_separation = args.separation
+    ramp = StressRamp(world, args.start, args.growth, args.frames, args.budget, seed=args.seed)
+    print(f"budget {args.budget:.1f} ms, {args.frames} frames per level, x{args.growth} per level, "
+          f"{BULLETS_PER_ENEMY} bullets and {PARTICLES_PER_ENEMY} particles per enemy")
+    lod = DetailController(args.budget, None if args.detail == "auto" else int(args.detail))
+    run(ramp, surface, lod, args.max_enemies, args.max_frame_ms)
+    print()
+    print(ramp.report())
+
+    result = dict(ramp.summary(), commit=commit(), detail=args.detail, separation=args.separation, seed=args.seed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        print(f"\nenemies at breakpoint: {before.get('commit') or args.compare} -> {result['commit'] or 'now'}")
+        for name, counts in ramp.breakpoints.items():
+            old = (before["breakpoints"].get(name) or {}).get("enemies")
+            new = (counts or {}).get("enemies")
+            change = f"{(new - old) / old:+.0%}" if old and new else ""
+            print(f"{name:>10}: {old or '-':>8} -> {new or '-':>8} {change}")
+
+if __name__ == "__main__":
+    main()
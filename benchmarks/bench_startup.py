@@ -0,0 +1,140 @@
+"""Startup benchmark: cold-start time of shooter.py from process launch to
+the first frame on screen, with the import time of each subsystem and the
+cost of each pygame init step.
+
+Every run is a fresh interpreter. The eager path is the old startup, where
+pygame.init() brings up every subsystem, the mixer opens the audio device and
+all three fonts load before the first frame; the lazy path is the current
+one. Exits non-zero if the lazy path's median time-to-first-frame is over
+--budget.
+
+    python benchmarks/bench_startup.py [--runs N] [--budget MS] [--video-driver NAME]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child: times the init calls, and exits at the first display flip
+CHILD = r"""
+import json, sys, time
+launched = float(sys.argv[1])
+sys.argv[1:] = []
+sys.path.insert(0, {root!r})
+phases = {{}}
+start = time.perf_counter()
+import pygame
+phases["import pygame"] = time.perf_counter() - start
+start = time.perf_counter()
+import shooter
+phases["import game modules"] = time.perf_counter() - start
+
+def timed(owner, name, label):
+    real = getattr(owner, name)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return real(*args, **kwargs)
+        finally:
+            phases[label] = phases.get(label, 0.0) + time.perf_counter() - start
+    setattr(owner, name, wrapper)
+
+timed(pygame, "init", "pygame.init")
+timed(pygame.display, "init", "display init")
+timed(pygame.display, "set_mode", "set_mode")
+timed(pygame.font, "init", "font init")
+timed(pygame.font, "Font", "font load")
+timed(pygame.mixer, "init", "mixer init")
+timed(shooter, "make_background", "background")
+
+def first_frame(*args):
+    print(json.dumps({{"first_frame": time.time() - launched, "phases": phases}}))
+    sys.stdout.flush()
+    import os
+    os._exit(0)
+pygame.display.flip = first_frame
+pygame.display.update = first_frame
+
+if {eager}:
+    # The old startup, ahead of main()
+    pygame.init()
+    pygame.mixer.init()
+    for size in (shooter.FONT_SIZE, shooter.LARGE_FONT_SIZE, shooter.TITLE_FONT_SIZE):
+        shooter.get_font(size)
+shooter.main()
+"""
+
+def launch(eager, env):
+    code = CHILD.format(root=ROOT, eager=eager)
+    out = subprocess.run([sys.executable, "-c", code, repr(time.time())], env=env, capture_output=True,
+                         text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def import_times(env):
+    """Cumulative import time in ms of each module shooter imports first, and
+    of the modules those import in turn, keyed "parent/child"."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import shooter"], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    groups = []
+    # -X importtime lists a module after everything it imported, so walk it backwards
+    for line in reversed(err.splitlines()):
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        ms = int(fields[1]) / 1000
+        if depth == 1:
+            groups.append([(name.strip(), ms)])
+        elif depth == 2 and groups:
+            groups[-1].append((f"{groups[-1][0][0]}/{name.strip()}", ms))
+    return {name: ms for parent, *children in reversed(groups) for name, ms in [parent, *reversed(children)]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=600.0, help="time-to-first-frame budget in ms")
+    parser.add_argument("--video-driver", default="dummy", help="SDL video driver; pass '' to use the real one")
+    parser.add_argument("--audio-driver", default="dummy", help="SDL audio driver; pass '' to use the real one")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    for var, value in (("SDL_VIDEODRIVER", args.video_driver), ("SDL_AUDIODRIVER", args.audio_driver)):
+        if value:
+            env[var] = value
+
+    results = {}
+    for name, eager in (("eager", True), ("lazy", False)):
+        launch(eager, env)  # warm the OS file cache, so every counted run is alike
+        results[name] = [launch(eager, env) for _ in range(args.runs)]
+
+    print(f"time to first frame, median of {args.runs} launches")
+    print(f"{'phase':<22} {'eager ms':>9} {'lazy ms':>9}")
+    labels = []
+    for runs in results.values():
+        labels += [label for label in runs[0]["phases"] if label not in labels]
+    for label in labels:
+        row = [statistics.median(run["phases"].get(label, 0.0) * 1000 for run in runs) for runs in results.values()]
+        print(f"{label:<22} {row[0]:>9.1f} {row[1]:>9.1f}")
+    ttff = {name: statistics.median(run["first_frame"] * 1000 for run in runs) for name, runs in results.items()}
+    print(f"{'first frame':<22} {ttff['eager']:>9.1f} {ttff['lazy']:>9.1f}   (from process launch)")
+
+    print(f"\nimport time per subsystem, median of {args.runs}")
+    samples = [import_times(env) for _ in range(args.runs)]
+    for module in samples[0]:
+        ms = statistics.median(sample.get(module, 0.0) for sample in samples)
+        if ms >= 1.0:
+            parent, _, child = module.rpartition("/")
+            print(f"{'  ' + child if parent else module:<28} {ms:>7.1f} ms")
+
+    over = ttff["lazy"] > args.budget
+    print(f"\nbudget {args.budget:.0f} ms: {'OVER' if over else 'ok'} ({ttff['lazy']:.1f} ms)")
+    return 1 if over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""HUD and menu text benchmark: per-frame cost of the HUD and the START and
+GAME_OVER screens with font.render on every call against the text cache.
+
+    python benchmarks/bench_text.py [--frames N]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+import render_cache
+import shooter
+from batch_sim import bot_inputs
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, World
+
+def run(surface, frames, cache_size):
+    render_cache.text_cache.maxsize = cache_size
+    shooter.hud_cache.maxsize = cache_size
+    render_cache.text_cache.clear()
+    shooter.hud_cache.clear()
+
+    world = World()
+    hud = menus = 0.0
+    for _ in range(frames):
+        world.step(bot_inputs(world))
+        if world.game_over:
+            world.reset()
+
+        start = time.perf_counter()
+        shooter.draw_hud(surface, world)
+        hud += time.perf_counter() - start
+
+        start = time.perf_counter()
+        shooter.draw_start_screen(surface)
+        shooter.draw_game_over_screen(surface, world)
+        menus += time.perf_counter() - start
+    return hud / frames * 1000, menus / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    print(f"{'path':>9} {'HUD ms/frame':>13} {'menus ms/frame':>15}")
+    for name, cache_size in (("uncached", 0), ("cached", 256)):
+        hud_ms, menu_ms = run(screen, args.frames, cache_size)
+        print(f"{name:>9} {hud_ms:>13.4f} {menu_ms:>15.4f}")
+    cache = render_cache.text_cache
+    print(f"text cache: {len(cache)} entries, {cache.hits} hits, {cache.misses} misses")
+
+if __name__ == "__main__":
+    main()
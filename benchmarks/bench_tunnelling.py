@@ -0,0 +1,77 @@
+"""Tunnelling benchmark: hit rate of shots that are on target, at increasing
+bullet speeds, for the swept collision test against the old overlap check at
+the bullet's end-of-tick position.
+
+Each trial places one enemy walking toward the player and fires a single
+shot whose line passes through the enemy's box, so every trial should hit.
+Doubling the bullet speed is the same as halving the tick rate.
+
+    python benchmarks/bench_tunnelling.py [--trials N] [--seed N]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import TICK_RATE, Inputs, World
+
+SPEEDS = [12, 24, 48, 96, 192]
+
+class DiscreteWorld(World):
+    # Baseline: the pre-swept test, bullet rect against enemy rect after both have moved
+    def collide_enemies(self):
+        enemies = self.enemies
+        cx, cy = enemies.centers()
+        for bullet in self.bullets:
+            for i in range(len(enemies)):
+                if enemies.alive[i] and bullet.rect.colliderect(enemies.rect(i, cx[i], cy[i])):
+                    bullet.alive = False
+                    if enemies.damage(i, self.bullet_damage):
+                        enemies.kill(i)
+                    break
+        enemies.sweep()
+
+def trial(world, speed, rng):
+    world.reset(rng.randrange(2 ** 32))
+    world.bullet_speed = speed
+    world.contact_damage = 0
+    world.enemy_count_to_spawn = 0  # no wave spawns; the trial enemy is the only one
+    player = world.player
+
+    angle = rng.uniform(-math.pi, math.pi)
+    distance = rng.uniform(120, 320)
+    x = player.x + math.cos(angle) * distance
+    y = player.y + math.sin(angle) * distance
+    grunt = world.waves.archetypes[0]
+    world.enemies.spawn(x, y, rng.uniform(grunt.speed_min, grunt.speed_max), health=1)
+
+    # Aim off-centre, but well inside the enemy's 18 px width plus the 6 px bullet radius
+    offset = rng.uniform(-13, 13)
+    aim = (x - math.sin(angle) * offset, y + math.cos(angle) * offset)
+    world.step(Inputs(aim, True))
+    while world.bullets and len(world.enemies):
+        world.step(Inputs(aim, False))
+    return not len(world.enemies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.trials} on-target shots per speed")
+    print(f"{'px/tick':>8} {'at tick rate':>13} {'overlap hits':>13} {'swept hits':>11}")
+    for speed in SPEEDS:
+        rates = []
+        for world in (DiscreteWorld(), World()):
+            rng = random.Random(args.seed)
+            hits = sum(trial(world, speed, rng) for _ in range(args.trials))
+            rates.append(hits / args.trials * 100)
+        equivalent = TICK_RATE * 12 / speed  # tick rate at which the default 12 px/tick bullet moves this far
+        print(f"{speed:>8} {equivalent:>10.1f} Hz {rates[0]:>12.1f}% {rates[1]:>10.1f}%")
+
+if __name__ == "__main__":
+    main()
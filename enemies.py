@@ -0,0 +1,206 @@
+# --- Enemy Manager ---
+# Struct-of-arrays enemy store. Positions, speeds, health, sizes and timers
+# live in preallocated NumPy arrays holding the live enemies in slots
+# [0, count), so steering the whole horde toward the player is one vectorised
+# step instead of a hypot() and a Rect update per enemy. Each enemy also
+# keeps its archetype index (see wavescript.py) as `kind`.
+
+import numpy as np
+
+ENEMY_WIDTH = 18
+ENEMY_HEIGHT = 55
+HIT_FLASH = 10  # ticks an enemy flashes after taking damage
+
+class EnemyManager:
+    FIELDS = ("pos", "prev", "speed", "health", "max_health", "hit_timer", "alive", "ids", "kind", "width",
+              "height", "range", "cooldown")
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = np.zeros((2, capacity))  # rows are x and y, so both axes step in one operation
+        self.prev = np.zeros((2, capacity))  # position at the start of the tick, for interpolation
+        self.views()
+        self.speed = np.zeros(capacity)
+        self.health = np.zeros(capacity, dtype=np.int32)
+        self.max_health = np.zeros(capacity, dtype=np.int32)
+        self.hit_timer = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.ids = np.zeros(capacity, dtype=np.int64)  # stable per enemy across compaction, for netcode
+        self.kind = np.zeros(capacity, dtype=np.int16)
+        self.width = np.zeros(capacity, dtype=np.int16)
+        self.height = np.zeros(capacity, dtype=np.int16)
+        self.range = np.zeros(capacity)  # ranged enemies hold this far from their target; 0 walks into it
+        self.cooldown = np.zeros(capacity, dtype=np.int32)  # ticks until a ranged enemy can fire again
+        self.next_id = 0
+        self.separation_radius = 20.0  # enemies closer than this push each other apart
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.next_id = 0
+
+    def views(self):
+        self.x, self.y = self.pos
+        self.prev_x, self.prev_y = self.prev
+
+    def grow(self):
+        self.capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(old.shape[:-1] + (self.capacity,), dtype=old.dtype)
+            new[..., :self.count] = old[..., :self.count]
+            setattr(self, name, new)
+        self.views()
+
+    def spawn(self, x, y, speed, health=2, kind=0, width=ENEMY_WIDTH, height=ENEMY_HEIGHT, range=0.0, cooldown=0):
+        """Append an enemy at (x, y) and return its slot."""
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.speed[i] = speed
+        self.health[i] = self.max_health[i] = health
+        self.hit_timer[i] = 0
+        self.kind[i] = kind
+        self.width[i] = width
+        self.height[i] = height
+        self.range[i] = range
+        self.cooldown[i] = cooldown
+        self.alive[i] = True
+        self.ids[i] = self.next_id
+        self.next_id += 1
+        self.count += 1
+        return i
+
+    def move(self, target_x, target_y, separation=0.0):
+        """Step every enemy `speed` pixels toward (target_x, target_y), then push
+        crowded enemies apart by `separation` times their overlap. With no
+        separation the whole wave converges on one point. The target may also
+        be a pair of per-enemy arrays, as from nearest_targets(). Ranged
+        enemies stop at their range, backing off if the target comes closer.
+        Returns each enemy's distance to its target before the step."""
+        n = self.count
+        if not n:
+            return None
+        pos = self.pos[:, :n]
+        self.prev[:, :n] = pos
+
+        delta = np.array([target_x, target_y], dtype=float).reshape(2, -1) - pos
+        distance = np.hypot(*delta)
+        step = self.speed[:n]
+        held = self.range[:n]
+        if held.any():
+            step = np.where(held > 0, np.clip(distance - held, -step, step), step)
+            cooldown = self.cooldown[:n]
+            cooldown -= cooldown > 0
+        if distance.min() > 1:
+            pos += delta / distance * step
+        else:
+            # Enemies already on the target stay put instead of dividing by ~0
+            pos += np.divide(delta, distance, out=np.zeros_like(delta), where=distance > 1) * step
+
+        if separation:
+            self.separate(separation)
+
+        hit_timer = self.hit_timer[:n]
+        hit_timer -= hit_timer > 0
+        return distance
+
+    def separate(self, strength):
+        """Push overlapping enemies apart.
+
+        Neighbours are found with a vectorised grid: enemies are sorted by the
+        separation_radius-sized cell they're in, and each enemy's candidates are
+        the sorted runs of its own and the eight surrounding cells.
+        """
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        radius = self.separation_radius
+        cell_x = np.floor(x / radius).astype(np.int64)
+        cell_y = np.floor(y / radius).astype(np.int64)
+        stride = int(cell_y.max() - cell_y.min()) + 3
+        key = cell_x * stride + (cell_y - cell_y.min() + 1)
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+
+        push_x = np.zeros(n)
+        push_y = np.zeros(n)
+        for offset_x in (-1, 0, 1):
+            for offset_y in (-1, 0, 1):
+                neighbour = key + (offset_x * stride + offset_y)
+                start = np.searchsorted(sorted_key, neighbour, "left")
+                counts = np.searchsorted(sorted_key, neighbour, "right") - start
+                total = int(counts.sum())
+                if not total:
+                    continue
+                # Expand each enemy's run of candidates into flat (i, j) pairs
+                i = np.repeat(np.arange(n), counts)
+                run = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                j = order[np.repeat(start, counts) + run]
+
+                dx = x[i] - x[j]
+                dy = y[i] - y[j]
+                distance = np.hypot(dx, dy)
+                close = (distance < radius) & (distance > 0)
+                # Each neighbour pushes along the line between the pair, harder the deeper the overlap
+                weight = np.divide(radius - distance, distance, out=np.zeros(total), where=close)
+                push_x += np.bincount(i, dx * weight, n)
+                push_y += np.bincount(i, dy * weight, n)
+        x += push_x * (strength * 0.5)
+        y += push_y * (strength * 0.5)
+
+    def damage(self, i, amount):
+        """Apply damage and start the hit flash. Returns True if the enemy died."""
+        self.health[i] -= amount
+        self.hit_timer[i] = HIT_FLASH
+        return self.health[i] <= 0
+
+    def kill(self, i):
+        self.alive[i] = False
+
+    def sweep(self):
+        """Drop dead enemies, compacting the arrays in place and keeping spawn order."""
+        n = self.count
+        keep = np.flatnonzero(self.alive[:n])
+        if len(keep) == n:
+            return
+        k = len(keep)
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[..., :k] = array[..., keep]
+        self.count = k
+
+    def centers(self):
+        """Integer centres as lists, rounded the way pygame.Rect.center rounds floats."""
+        pos = self.pos[:, :self.count]
+        return np.trunc(pos + np.copysign(0.5, pos)).astype(np.int64).tolist()
+
+    def rect(self, i, cx, cy):
+        """Bounding box tuple for enemy `i` centred at the integer point (cx, cy)."""
+        width = int(self.width[i])
+        height = int(self.height[i])
+        return (cx - width // 2, cy - height // 2, width, height)
+
+    def nearest_targets(self, xs, ys):
+        """For every enemy, the position of the closest of the points (xs[k], ys[k])."""
+        n = self.count
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        dx = self.x[:n, None] - xs
+        dy = self.y[:n, None] - ys
+        closest = (dx * dx + dy * dy).argmin(axis=1)
+        return xs[closest], ys[closest]
+
+    def nearest(self, x, y):
+        """Slot of the enemy closest to (x, y), or -1 if there are none."""
+        n = self.count
+        if not n:
+            return -1
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        return int((dx * dx + dy * dy).argmin())
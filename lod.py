@@ -0,0 +1,67 @@
+# --- Level of Detail ---
+# Rendering gets cheaper in steps as the screen fills up. Level 0 is full
+# detail; level 1 drops enemy shadows and health bars, shortens bullet trails
+# and draws every other spark; level 2 draws enemies as flat single-colour
+# stickmen, bullets without trails and one spark in four. The simulation is
+# the same at every level; only what is drawn changes.
+#
+# DetailController picks the level each frame from two signals: entity counts,
+# which raise it as soon as a crowd arrives, and a moving average of frame
+# time, which raises it when frames run over budget whatever the cause and
+# lowers it again once there is plenty of headroom.
+
+from collections import namedtuple
+
+from profiler import BUDGET_MS
+
+Detail = namedtuple("Detail", ["shadows", "health_bars", "trail", "particle_step", "simple_enemies"])
+
+DETAILS = [
+    Detail(shadows=True, health_bars=True, trail=5, particle_step=1, simple_enemies=False),
+    Detail(shadows=False, health_bars=False, trail=2, particle_step=2, simple_enemies=False),
+    Detail(shadows=False, health_bars=False, trail=1, particle_step=4, simple_enemies=True),
+]
+FULL = DETAILS[0]
+
+ENEMY_THRESHOLDS = (150, 400)  # on-field enemies at which levels 1 and 2 start
+PARTICLE_THRESHOLDS = (1500, 4000)
+RAISE_AT = 0.9  # of the budget, for the frame-time average
+LOWER_AT = 0.5
+SMOOTHING = 0.1  # weight of the newest frame in the average
+RAISE_FRAMES = 15  # frames to wait after a change before raising again
+LOWER_FRAMES = 120  # and before lowering, so the level doesn't flap
+
+class DetailController:
+    def __init__(self, budget_ms=BUDGET_MS, fixed=None):
+        self.budget_ms = budget_ms
+        self.fixed = fixed  # a level to hold instead of adapting
+        self.level = fixed or 0
+        self.load_level = 0  # the part of the level the entity counts call for
+        self.average_ms = 0.0
+        self.since_change = 0
+        self.changes = 0
+
+    @property
+    def detail(self):
+        return DETAILS[self.level]
+
+    def update(self, frame_ms, enemies=0, particles=0):
+        """Feed one frame's work time and entity counts; returns the level for the next frame."""
+        if self.fixed is not None:
+            return self.level
+        self.average_ms += (frame_ms - self.average_ms) * SMOOTHING
+        self.since_change += 1
+        self.load_level = max(sum(enemies >= t for t in ENEMY_THRESHOLDS),
+                              sum(particles >= t for t in PARTICLE_THRESHOLDS))
+
+        level = self.level
+        if self.average_ms > self.budget_ms * RAISE_AT and self.since_change >= RAISE_FRAMES:
+            level += 1
+        elif self.average_ms < self.budget_ms * LOWER_AT and self.since_change >= LOWER_FRAMES:
+            level -= 1
+        level = min(max(level, self.load_level), len(DETAILS) - 1)
+        if level != self.level:
+            self.level = level
+            self.since_change = 0
+            self.changes += 1
+        return self.level
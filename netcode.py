@@ -0,0 +1,366 @@
+"""Snapshot delta compression for networked play.
+
+The server captures the World as a snapshot every few ticks: a quantised
+integer record per player, enemy, bullet, enemy shot, power-up pickup and
+beam, keyed by a stable id. Each
+client is sent its snapshot as a delta against the last snapshot it
+acknowledged, so entities that didn't change cost nothing and moving ones
+only carry small per-field differences. The encoding is plain bytes in,
+bytes out; server.py does the server's socket I/O and UDPClient below is
+the non-blocking socket the game client polls once per frame.
+
+Datagrams (little endian, first byte is the message type):
+
+    HELLO     client -> server  u8 type
+    WELCOME   server -> client  u8 type, u8 player index, u16 tick rate, u64 seed
+    INPUT     client -> server  u8 type, u32 ack tick, i16 mouse x, i16 mouse y, u8 flags
+    SNAPSHOT  server -> client  header, then one section each for players, enemies, bullets, enemy shots,
+                                pickups, beams
+
+A section is u16 count, then per entity u16 id, u16 field mask and the
+fields the mask selects; then u16 count and the u16 ids removed since the
+baseline. Each field takes two mask bits: 0 unchanged, 1 an i8 difference
+from the baseline value, 2 the absolute value in the field's own format, so
+a record has at most eight fields.
+"""
+import math
+import socket
+import struct
+
+from simulation import TICK_RATE, Beam, Inputs, Pickup
+from weapons import POWERUPS, WEAPONS
+
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+
+WELCOME_PACKET = struct.Struct("<BBHQ")
+INPUT_PACKET = struct.Struct("<BIhhB")
+SNAPSHOT_HEADER = struct.Struct("<BIIHBHHIB")  # type, tick, baseline, wave, state, break timer, pending, score, over
+NO_BASELINE = 0xFFFFFFFF
+FLAG_SHOOT = 1
+
+COUNT = struct.Struct("<H")
+ENTITY = struct.Struct("<HH")  # id, field mask
+DELTA = struct.Struct("<b")
+
+POSITION_SCALE = 4  # quarter-pixel positions
+ANGLE_SCALE = 32768 / math.pi
+
+# Absolute format of every field, per section
+KINDS = (
+    # x, y, gun angle, health, invulnerable timer, weapon, weapon timer, rapid fire timer
+    ("players", ("h", "h", "h", "h", "B", "B", "H", "H")),
+    ("enemies", ("h", "h", "b", "B", "B")),  # x, y, health, hit timer, archetype
+    ("bullets", ("h", "h", "h")),  # x, y, angle
+    ("shots", ("h", "h")),  # x, y
+    ("pickups", ("h", "h", "B", "H")),  # x, y, power-up, timer
+    ("beams", ("h", "h", "h", "h", "B")),  # x, y, angle, length, timer
+)
+FIELD_STRUCTS = {fmt: struct.Struct("<" + fmt) for _, fields in KINDS for fmt in fields}
+WAVE_STATES = ("SPAWNING", "BREAK")
+WEAPON_NAMES = tuple(WEAPONS)
+
+def quantize_position(value):
+    return max(-32768, min(32767, round(value * POSITION_SCALE)))
+
+def quantize_angle(angle):
+    return (round(angle * ANGLE_SCALE) + 32768) % 65536 - 32768
+
+# --- Capture ---
+def capture(world):
+    """Quantised snapshot of everything a client needs to draw the world."""
+    players = {}
+    for i, player in enumerate(world.players):
+        players[i] = (quantize_position(player.x), quantize_position(player.y), quantize_angle(player.gun_angle),
+                      max(-32768, player.health), min(255, player.invulnerable_timer),
+                      WEAPON_NAMES.index(player.weapon), min(65535, player.weapon_timer),
+                      min(65535, player.rapid_timer))
+
+    enemies = world.enemies
+    n = len(enemies)
+    positions = (enemies.pos[:, :n] * POSITION_SCALE).round().clip(-32768, 32767).astype(int).tolist()
+    enemy_records = {}
+    for enemy_id, x, y, health, hit, kind in zip((enemies.ids[:n] & 0xFFFF).tolist(), positions[0], positions[1],
+                                                 enemies.health[:n].tolist(), enemies.hit_timer[:n].tolist(),
+                                                 enemies.kind[:n].tolist()):
+        enemy_records[enemy_id] = (x, y, max(-128, min(127, health)), min(255, hit), kind)
+
+    bullets = {bullet.id & 0xFFFF: (quantize_position(bullet.x), quantize_position(bullet.y),
+                                    quantize_angle(bullet.angle)) for bullet in world.bullets}
+    shots = {shot.id & 0xFFFF: (quantize_position(shot.x), quantize_position(shot.y)) for shot in world.enemy_shots}
+    pickups = {pickup.id & 0xFFFF: (quantize_position(pickup.x), quantize_position(pickup.y),
+                                    POWERUPS.index(pickup.kind), min(65535, pickup.timer)) for pickup in world.pickups}
+    beams = {beam.id & 0xFFFF: (quantize_position(beam.x), quantize_position(beam.y), quantize_angle(beam.angle),
+                                min(32767, round(beam.length)), beam.timer) for beam in world.beams}
+
+    return {
+        "tick": world.tick,
+        "wave": world.wave_number,
+        "wave_state": world.wave_state,
+        "wave_break_timer": max(0, world.wave_break_timer),
+        "pending": max(0, world.enemy_count_to_spawn - world.enemies_spawned_this_wave),
+        "score": world.score,
+        "game_over": world.game_over,
+        "players": players,
+        "enemies": enemy_records,
+        "bullets": bullets,
+        "shots": shots,
+        "pickups": pickups,
+        "beams": beams,
+    }
+
+# --- Encoding ---
+def encode_section(out, fields, records, baseline):
+    changed = []
+    for entity_id, record in records.items():
+        old = baseline.get(entity_id)
+        if old == record:
+            continue
+        mask = 0
+        payload = []
+        for f, (fmt, value) in enumerate(zip(fields, record)):
+            if old is not None and old[f] == value:
+                continue
+            if old is not None and -128 <= value - old[f] <= 127:
+                mask |= 1 << (2 * f)
+                payload.append(DELTA.pack(value - old[f]))
+            else:
+                mask |= 2 << (2 * f)
+                payload.append(FIELD_STRUCTS[fmt].pack(value))
+        changed.append(ENTITY.pack(entity_id, mask) + b"".join(payload))
+    removed = [entity_id for entity_id in baseline if entity_id not in records]
+
+    out.append(COUNT.pack(len(changed)))
+    out.extend(changed)
+    out.append(COUNT.pack(len(removed)))
+    out.extend(COUNT.pack(entity_id) for entity_id in removed)
+
+def encode(snapshot, baseline=None):
+    """SNAPSHOT datagram for `snapshot`, as a delta against `baseline` if given."""
+    out = [SNAPSHOT_HEADER.pack(SNAPSHOT, snapshot["tick"], baseline["tick"] if baseline else NO_BASELINE,
+                                snapshot["wave"], WAVE_STATES.index(snapshot["wave_state"]),
+                                min(65535, snapshot["wave_break_timer"]), min(65535, snapshot["pending"]),
+                                snapshot["score"], snapshot["game_over"])]
+    for kind, fields in KINDS:
+        encode_section(out, fields, snapshot[kind], baseline[kind] if baseline else {})
+    return b"".join(out)
+
+def decode_section(data, offset, fields, baseline):
+    records = dict(baseline)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        entity_id, mask = ENTITY.unpack_from(data, offset)
+        offset += ENTITY.size
+        old = records.get(entity_id)
+        record = []
+        for f, fmt in enumerate(fields):
+            mode = (mask >> (2 * f)) & 3
+            if mode == 0:
+                record.append(old[f])
+            elif mode == 1:
+                record.append(old[f] + DELTA.unpack_from(data, offset)[0])
+                offset += DELTA.size
+            else:
+                field = FIELD_STRUCTS[fmt]
+                record.append(field.unpack_from(data, offset)[0])
+                offset += field.size
+        records[entity_id] = tuple(record)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        records.pop(COUNT.unpack_from(data, offset)[0], None)
+        offset += COUNT.size
+    return records, offset
+
+def decode(data, baselines):
+    """Rebuild a snapshot from a SNAPSHOT datagram. `baselines` maps tick to
+    snapshots this side already holds; returns None if the delta's baseline
+    isn't among them."""
+    _, tick, baseline_tick, wave, state, break_timer, pending, score, over = SNAPSHOT_HEADER.unpack_from(data)
+    baseline = None
+    if baseline_tick != NO_BASELINE:
+        baseline = baselines.get(baseline_tick)
+        if baseline is None:
+            return None
+    snapshot = {
+        "tick": tick,
+        "wave": wave,
+        "wave_state": WAVE_STATES[state],
+        "wave_break_timer": break_timer,
+        "pending": pending,
+        "score": score,
+        "game_over": bool(over),
+    }
+    offset = SNAPSHOT_HEADER.size
+    for kind, fields in KINDS:
+        snapshot[kind], offset = decode_section(data, offset, fields, baseline[kind] if baseline else {})
+    return snapshot
+
+# --- Packets ---
+def encode_input(inputs, ack):
+    x, y = inputs.mouse_pos
+    return INPUT_PACKET.pack(INPUT, ack, max(-32768, min(32767, int(x))), max(-32768, min(32767, int(y))),
+                             FLAG_SHOOT if inputs.shoot else 0)
+
+def decode_input(data):
+    _, ack, x, y, flags = INPUT_PACKET.unpack(data)
+    return Inputs((x, y), bool(flags & FLAG_SHOOT)), ack
+
+class ClientState:
+    """Client end of the protocol: keeps the snapshots the server may delta
+    against and tracks the newest one for drawing and acknowledgement."""
+
+    def __init__(self, history=2 * TICK_RATE):
+        self.history = history
+        self.snapshots = {}
+        self.latest = None
+        self.player_index = None
+        self.seed = None
+        self.tick_rate = TICK_RATE
+        self.bytes_received = 0
+        self.dropped = 0
+
+    def hello(self):
+        return bytes([HELLO])
+
+    def receive(self, data):
+        """Handle one datagram from the server. Returns the new snapshot, if any."""
+        self.bytes_received += len(data)
+        if data[0] == WELCOME:
+            _, self.player_index, self.tick_rate, self.seed = WELCOME_PACKET.unpack(data)
+            return None
+        if data[0] != SNAPSHOT:
+            return None
+        snapshot = decode(data, self.snapshots)
+        if snapshot is None:
+            self.dropped += 1
+            return None
+        if self.latest is None or snapshot["tick"] > self.latest["tick"]:
+            self.latest = snapshot
+        self.snapshots[snapshot["tick"]] = snapshot
+        oldest = self.latest["tick"] - self.history
+        for tick in [t for t in self.snapshots if t < oldest]:
+            del self.snapshots[tick]
+        return snapshot
+
+    def input_packet(self, inputs):
+        ack = self.latest["tick"] if self.latest else NO_BASELINE
+        return encode_input(inputs, ack)
+
+class UDPClient(ClientState):
+    def __init__(self, host, port):
+        super().__init__()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.connect((host, port))
+        self.send(self.hello())
+
+    def send(self, data):
+        try:
+            self.sock.send(data)
+        except OSError:
+            pass  # server not up yet or gone; UDP just drops it
+
+    def poll(self):
+        """Drain every waiting datagram. Returns the newest snapshot received, if any."""
+        newest = None
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError):
+                return newest
+            snapshot = self.receive(data)
+            if snapshot is not None and snapshot is self.latest:
+                newest = snapshot
+
+    def send_inputs(self, inputs):
+        self.send(self.input_packet(inputs) if self.latest else self.hello())
+
+    def close(self):
+        self.sock.close()
+
+# --- Mirroring ---
+def apply_snapshot(world, snapshot, player_index=0):
+    """Load a snapshot into a World so the usual drawing (and bot) code can run
+    on it. The previous contents become the interpolation start point."""
+    world.tick = snapshot["tick"]
+    world.wave_number = snapshot["wave"]
+    world.wave_state = snapshot["wave_state"]
+    world.wave_break_timer = snapshot["wave_break_timer"]
+    world.score = snapshot["score"]
+    world.game_over = snapshot["game_over"]
+    world.enemies_spawned_this_wave = 0
+    world.enemy_count_to_spawn = snapshot["pending"]
+
+    players = snapshot["players"]
+    while world.player_count < len(players):
+        world.add_player()
+    for i, (x, y, angle, health, invulnerable, weapon, weapon_timer, rapid_timer) in players.items():
+        player = world.players[i]
+        player.x = x / POSITION_SCALE
+        player.y = y / POSITION_SCALE
+        player.gun_angle = angle / ANGLE_SCALE
+        player.health = health
+        player.invulnerable_timer = invulnerable
+        player.weapon = WEAPON_NAMES[weapon]
+        player.weapon_timer = weapon_timer
+        player.rapid_timer = rapid_timer
+        player.rect.center = (player.x, player.y)
+    world.player = world.players[player_index]
+
+    enemies = world.enemies
+    previous = dict(zip((enemies.ids[:len(enemies)] & 0xFFFF).tolist(), enemies.pos[:, :len(enemies)].T.tolist()))
+    enemies.clear()
+    archetypes = world.waves.archetypes
+    for enemy_id, (x, y, health, hit, kind) in snapshot["enemies"].items():
+        archetype = archetypes[kind]
+        i = enemies.spawn(x / POSITION_SCALE, y / POSITION_SCALE, 0.0, health, kind, archetype.width,
+                          archetype.height)
+        enemies.ids[i] = enemy_id
+        enemies.max_health[i] = archetype.health
+        enemies.hit_timer[i] = hit
+        if enemy_id in previous:
+            enemies.prev[:, i] = previous[enemy_id]
+
+    previous = {bullet.id: list(bullet.trail) for bullet in world.bullets}
+    world.bullet_pool.release_all(world.bullets)
+    for bullet_id, (x, y, angle) in snapshot["bullets"].items():
+        x, y = x / POSITION_SCALE, y / POSITION_SCALE
+        bullet = world.bullet_pool.acquire(x, y, angle / ANGLE_SCALE, world.bullet_speed)
+        bullet.id = bullet_id
+        trail = previous.get(bullet_id)
+        if trail:
+            bullet.prev_x, bullet.prev_y = trail[-1]
+            bullet.trail.clear()
+            bullet.trail.extend(trail)
+            bullet.trail.append((x, y))
+        world.bullets.append(bullet)
+
+    previous = {shot.id: (shot.x, shot.y) for shot in world.enemy_shots}
+    world.bullet_pool.release_all(world.enemy_shots)
+    for shot_id, (x, y) in snapshot["shots"].items():
+        shot = world.bullet_pool.acquire(x / POSITION_SCALE, y / POSITION_SCALE, 0.0, 0.0)
+        shot.id = shot_id
+        if shot_id in previous:
+            shot.prev_x, shot.prev_y = previous[shot_id]
+        world.enemy_shots.append(shot)
+
+    previous = {pickup.id: (pickup.x, pickup.y) for pickup in world.pickups}
+    world.pickups = []
+    for pickup_id, (x, y, kind, timer) in snapshot["pickups"].items():
+        pickup = Pickup(x / POSITION_SCALE, y / POSITION_SCALE, POWERUPS[kind], timer)
+        pickup.id = pickup_id
+        if pickup_id in previous:
+            pickup.prev_x, pickup.prev_y = previous[pickup_id]
+        world.pickups.append(pickup)
+
+    # Beams don't move, so there is nothing to interpolate
+    world.beams = []
+    for beam_id, (x, y, angle, length, timer) in snapshot["beams"].items():
+        beam = Beam(x / POSITION_SCALE, y / POSITION_SCALE, angle / ANGLE_SCALE, length, 0)
+        beam.id = beam_id
+        beam.timer = timer
+        world.beams.append(beam)
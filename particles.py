@@ -0,0 +1,148 @@
+# --- Particle System ---
+# Struct-of-arrays particle store. Every spark lives in a slot of a set of
+# preallocated NumPy arrays; new sparks are written at a ring-buffer cursor,
+# so the oldest slot is reused once capacity is reached and nothing is ever
+# allocated per particle.
+
+import numpy as np
+import pygame
+
+GRAVITY = 0.1
+ALPHA_LEVELS = 16  # fade steps baked into the sprite cache
+
+class ParticleSystem:
+    FIELDS = ("x", "y", "vx", "vy", "lifetime", "max_lifetime", "size", "color")
+
+    def __init__(self, capacity=2048, seed=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.max_lifetime = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)  # index into self.palette
+        self.palette = []
+        self.palette_index = {}
+        self.head = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.lifetime > 0))
+
+    def clear(self):
+        self.lifetime[:] = 0
+        self.head = 0
+
+    def reserve(self, capacity):
+        """Grow to at least `capacity` slots, keeping the live sparks."""
+        if capacity <= self.capacity:
+            return
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.ones(capacity, dtype=old.dtype) if name == "max_lifetime" else np.zeros(capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.head = self.capacity  # the new slots are all free, so fill them first
+        self.capacity = capacity
+
+    def reseed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def color_index(self, color):
+        index = self.palette_index.get(color)
+        if index is None:
+            index = self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return index
+
+    def emit(self, x, y, color, count=10):
+        count = min(count, self.capacity)
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+
+        rng = self.rng
+        self.x[slots] = x
+        self.y[slots] = y
+        self.vx[slots] = rng.uniform(-3, 3, count)
+        self.vy[slots] = rng.uniform(-3, 3, count)
+        lifetime = rng.integers(30, 61, count)
+        self.lifetime[slots] = lifetime
+        self.max_lifetime[slots] = lifetime
+        self.size[slots] = rng.integers(2, 6, count)
+        self.color[slots] = self.color_index(color)
+
+    def emit_many(self, xs, ys, color, count=10):
+        """emit() at each of the points (xs[k], ys[k]), in one batch."""
+        xs = np.repeat(np.asarray(xs, dtype=float), count)[-self.capacity:]
+        ys = np.repeat(np.asarray(ys, dtype=float), count)[-self.capacity:]
+        total = len(xs)
+        slots = (self.head + np.arange(total)) % self.capacity
+        self.head = (self.head + total) % self.capacity
+
+        rng = self.rng
+        self.x[slots] = xs
+        self.y[slots] = ys
+        self.vx[slots] = rng.uniform(-3, 3, total)
+        self.vy[slots] = rng.uniform(-3, 3, total)
+        lifetime = rng.integers(30, 61, total)
+        self.lifetime[slots] = lifetime
+        self.max_lifetime[slots] = lifetime
+        self.size[slots] = rng.integers(2, 6, total)
+        self.color[slots] = self.color_index(color)
+
+    def update(self):
+        alive = self.lifetime > 0
+        if not alive.any():
+            return
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += GRAVITY
+        # Expired slots stay at 0 and are skipped by draw() until reused
+        self.lifetime -= alive
+
+    def alive_indices(self):
+        return np.flatnonzero(self.lifetime > 0)
+
+# --- Batched Drawing ---
+_sprite_cache = {}
+
+def particle_sprite(color, size, level):
+    """Pre-rendered spark of the given colour, radius and fade level."""
+    key = (color, size, level)
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((size * 2, size * 2))
+        sprite.set_colorkey((0, 0, 0))
+        pygame.draw.circle(sprite, color, (size, size), size)
+        sprite.set_alpha(255 * level // ALPHA_LEVELS)
+        _sprite_cache[key] = sprite
+    return sprite
+
+def draw_particles(surface, system, alpha=1.0, step=1):
+    """Blit every live on-screen spark in one batch, interpolated `alpha` of the
+    way through the last tick. A `step` above 1 thins them out to every step-th
+    slot, which keeps the same sparks from frame to frame. Returns the list of
+    touched rects."""
+    idx = system.alive_indices()
+    if step > 1:
+        idx = idx[idx % step == 0]
+    if not len(idx):
+        return []
+
+    size = system.size[idx]
+    level = (system.lifetime[idx] * ALPHA_LEVELS + system.max_lifetime[idx] - 1) // system.max_lifetime[idx]
+    back = 1.0 - alpha
+    left = (system.x[idx] - system.vx[idx] * back - size).astype(np.int32)
+    top = (system.y[idx] - (system.vy[idx] - GRAVITY) * back - size).astype(np.int32)
+    width, height = surface.get_size()
+    visible = (left > -2 * size) & (left < width) & (top > -2 * size) & (top < height)
+    if not visible.all():
+        idx, size, level, left, top = idx[visible], size[visible], level[visible], left[visible], top[visible]
+    palette = system.palette
+
+    return surface.blits([(particle_sprite(palette[c], s, a), (l, t))
+                          for c, s, a, l, t in zip(system.color[idx].tolist(), size.tolist(), level.tolist(),
+                                                   left.tolist(), top.tolist())],
+                         doreturn=True)
@@ -0,0 +1,143 @@
+# --- Frame Profiler ---
+# Lap-timer instrumentation for the main loop. Each instrumented phase calls
+# lap(name), which charges the time since the previous lap to that phase, so
+# the cost when enabled is one perf_counter() per phase and zero when the
+# no_lap stub is used instead.
+
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+from render_cache import get_font, render_text
+
+def no_lap(name):
+    pass
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+class FrameProfiler:
+    def __init__(self, history=240, record=False):
+        self.history = history
+        self.record = record  # keep every frame in rows, for dump()
+        self.frame_times = deque(maxlen=history)  # rolling window for the overlay, in ms
+        self.phase_times = {}  # phase -> rolling deque of ms
+        self.rows = []  # with record, every frame for the dump: (frame_ms, interval_ms, {phase: ms}, counts)
+        self.current = {}
+        self.frame_start = self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + (now - self.last)
+        self.last = now
+
+    def end_frame(self, interval_ms=0.0, counts=None):
+        """Close the frame; returns its (frame_ms, interval_ms, {phase: ms}, counts) row."""
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        phases = {name: seconds * 1000 for name, seconds in self.current.items()}
+        self.frame_times.append(frame_ms)
+        for name, ms in phases.items():
+            samples = self.phase_times.get(name)
+            if samples is None:
+                samples = self.phase_times[name] = deque(maxlen=self.history)
+            samples.append(ms)
+        row = (frame_ms, interval_ms, phases, dict(counts or {}))
+        if self.record:
+            self.rows.append(row)
+        return row
+
+    def stats(self, values):
+        return {
+            "mean": sum(values) / len(values) if values else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+
+    def summary(self):
+        """Whole-session percentiles per phase and for the full frame."""
+        phases = sorted({name for row in self.rows for name in row[2]})
+        return {
+            "frames": len(self.rows),
+            "frame": self.stats([row[0] for row in self.rows]),
+            "interval": self.stats([row[1] for row in self.rows]),
+            "phases": {name: self.stats([row[2].get(name, 0.0) for row in self.rows]) for name in phases},
+        }
+
+    def dump(self, path):
+        """Write every recorded frame to path; .json also gets the percentile summary."""
+        phases = sorted({name for row in self.rows for name in row[2]})
+        counters = sorted({name for row in self.rows for name in row[3]})
+        if path.endswith(".json"):
+            frames = [{"frame_ms": f, "interval_ms": i, "phases": p, "counts": c} for f, i, p, c in self.rows]
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "frames": frames}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame", "frame_ms", "interval_ms"] + [f"{name}_ms" for name in phases]
+                                + [f"num_{name}" for name in counters])
+                for i, (frame_ms, interval_ms, p, c) in enumerate(self.rows):
+                    writer.writerow([i, f"{frame_ms:.4f}", f"{interval_ms:.4f}"]
+                                    + [f"{p.get(name, 0.0):.4f}" for name in phases]
+                                    + [c.get(name, 0) for name in counters])
+
+# --- Overlay ---
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 60
+GRAPH_SCALE_MS = 33.3  # top of the graph
+BUDGET_MS = 1000 / 60
+REFRESH_FRAMES = 15  # the text panel is rebuilt four times a second at 60 FPS
+FONT_SIZE = 18
+
+_overlay = {"panel": None, "age": REFRESH_FRAMES}
+
+def build_panel(profiler, counts):
+    font = get_font(FONT_SIZE)
+
+    frame = profiler.stats(list(profiler.frame_times))
+    lines = [f"{'frame':<15} p50 {frame['p50']:5.2f}  p95 {frame['p95']:5.2f}  p99 {frame['p99']:5.2f} ms"]
+    for name, samples in profiler.phase_times.items():
+        s = profiler.stats(list(samples))
+        lines.append(f"{name:<15} p50 {s['p50']:5.2f}  p95 {s['p95']:5.2f}  p99 {s['p99']:5.2f}")
+    lines.append("  ".join(f"{name} {count}" for name, count in counts.items()))
+
+    panel = pygame.Surface((GRAPH_WIDTH + 120, GRAPH_HEIGHT + 8 + 16 * len(lines)), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        # Numbers change every refresh, so bypass the shared text cache for them
+        panel.blit(font.render(line, True, (255, 255, 255)), (6, GRAPH_HEIGHT + 6 + 16 * i))
+    if pygame.display.get_surface() is not None:
+        panel = panel.convert_alpha()
+    return panel
+
+def draw_overlay(surface, profiler, counts, x=10, y=110):
+    """Rolling frame-time graph plus per-phase p50/p95/p99 and entity counts."""
+    _overlay["age"] += 1
+    if _overlay["panel"] is None or _overlay["age"] >= REFRESH_FRAMES:
+        _overlay["panel"] = build_panel(profiler, counts)
+        _overlay["age"] = 0
+    panel = _overlay["panel"]
+    rect = surface.blit(panel, (x, y))
+
+    # Graph, redrawn every frame from the rolling window
+    budget_y = y + GRAPH_HEIGHT - int(GRAPH_HEIGHT * BUDGET_MS / GRAPH_SCALE_MS)
+    pygame.draw.line(surface, (255, 255, 0), (x, budget_y), (x + GRAPH_WIDTH, budget_y), 1)
+    times = profiler.frame_times
+    if len(times) > 1:
+        step = GRAPH_WIDTH / (profiler.history - 1)
+        points = [(x + i * step, y + GRAPH_HEIGHT - min(GRAPH_HEIGHT, GRAPH_HEIGHT * ms / GRAPH_SCALE_MS))
+                  for i, ms in enumerate(times)]
+        pygame.draw.lines(surface, (0, 255, 0), False, points, 1)
+    surface.blit(render_text(get_font(FONT_SIZE), "16.6 ms", (255, 255, 0)), (x + GRAPH_WIDTH + 4, budget_y - 6))
+    return rect
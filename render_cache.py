@@ -0,0 +1,61 @@
+# --- Render Cache ---
+# Small LRU map shared by the sprite and text caches. Rarely used variants
+# fall off the end once maxsize is reached; the common ones stay resident.
+
+from collections import OrderedDict
+
+import pygame
+
+class LRUCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# --- Text Cache ---
+text_cache = LRUCache(maxsize=256)
+
+def render_text(font, text, color, antialias=True):
+    """font.render() through the shared cache; a string is only rasterised when it changes."""
+    key = (font, text, color, antialias)
+    surface = text_cache.get(key)
+    if surface is None:
+        surface = text_cache.put(key, font.render(text, antialias, color))
+    return surface
+
+# --- Fonts ---
+fonts = {}  # point size -> default font
+
+def get_font(size):
+    """The default font at `size`. pygame.font is initialised, and each size
+    loaded, the first time it's asked for."""
+    font = fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = fonts[size] = pygame.font.Font(None, size)
+    return font
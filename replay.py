@@ -0,0 +1,135 @@
+"""Input recording and replay.
+
+A replay is the world seed plus the Inputs fed to every tick, which is all a
+deterministic World needs to reproduce a game. File layout (little endian):
+
+    header   4s magic "SSRP", u16 version, u16 tick rate, u64 seed   (16 bytes)
+    records  i16 mouse x, i16 mouse y, u8 flags (bit 0 = shoot)       (5 bytes/tick)
+
+Records are fixed size and only ever appended, so a log can be streamed while
+the game runs, a truncated log from a crash is still readable, and record N
+lives at a known offset for memory-mapped scans and seeking.
+
+    python replay.py info FILE...   # summary from the memory map only
+    python replay.py run FILE...    # headless replay at full speed
+"""
+import argparse
+import struct
+import sys
+import time
+
+import numpy as np
+
+from simulation import TICK_RATE, Inputs, World
+
+MAGIC = b"SSRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<hhB")
+RECORD_DTYPE = np.dtype([("x", "<i2"), ("y", "<i2"), ("flags", "u1")])
+FLAG_SHOOT = 1
+
+def clamp_i16(value):
+    return max(-32768, min(32767, int(round(value))))
+
+class Recorder:
+    def __init__(self, path, seed, tick_rate=TICK_RATE):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, tick_rate, seed))
+        self.ticks = 0
+
+    def record(self, inputs):
+        x, y = inputs.mouse_pos
+        self.file.write(RECORD.pack(clamp_i16(x), clamp_i16(y), FLAG_SHOOT if inputs.shoot else 0))
+        self.ticks += 1
+        if self.ticks % TICK_RATE == 0:
+            self.file.flush()  # at most a second of input is lost on a crash
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Replay:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            f.seek(0, 2)
+            size = f.tell()
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: truncated replay header")
+        magic, self.version, self.tick_rate, self.seed = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a replay file")
+        if self.version != VERSION:
+            raise ValueError(f"{path}: unsupported replay version {self.version}")
+
+        # A partially written trailing record (crash mid-write) is ignored
+        count = (size - HEADER.size) // RECORD.size
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def inputs(self, tick):
+        x, y, flags = self.records[tick].tolist()
+        return Inputs((x, y), bool(flags & FLAG_SHOOT))
+
+    def __iter__(self):
+        for x, y, flags in self.records.tolist():
+            yield Inputs((x, y), bool(flags & FLAG_SHOOT))
+
+    def shots(self):
+        return int(np.count_nonzero(self.records["flags"] & FLAG_SHOOT))
+
+def seek(world, replay, tick):
+    """Move world to `tick` of the replay, re-simulating from the start when seeking backwards."""
+    tick = max(0, min(tick, len(replay)))
+    if tick < world.tick or world.seed != replay.seed:
+        world.reset(replay.seed)
+    audio, world.audio = world.audio, None  # the skipped-over ticks stay quiet
+    while world.tick < tick and not world.game_over:
+        world.step(replay.inputs(world.tick))
+    world.audio = audio
+
+def run(replay, world=None):
+    """Replay a whole game headless as fast as possible and return the final world."""
+    world = world or World()
+    world.reset(replay.seed)
+    for inputs in replay:
+        world.step(inputs)
+        if world.game_over:
+            break
+    return world
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or re-run recorded games.")
+    parser.add_argument("command", choices=["info", "run"])
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    world = World()
+    for path in args.files:
+        replay = Replay(path)
+        if args.command == "info":
+            print(f"{path}: seed={replay.seed} ticks={len(replay)} "
+                  f"duration={len(replay) / replay.tick_rate:.1f}s shots={replay.shots()}")
+        else:
+            start = time.perf_counter()
+            run(replay, world)
+            elapsed = time.perf_counter() - start
+            print(f"{path}: tick={world.tick} score={world.score} wave={world.wave_number} "
+                  f"game_over={world.game_over} ({world.tick / max(elapsed, 1e-9):.0f} ticks/s)")
+
+if __name__ == "__main__":
+    sys.exit(main())
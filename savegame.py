@@ -0,0 +1,313 @@
+"""Save games and checkpoints.
+
+A save is the complete World state: seed, tick, players, enemies, bullets,
+enemy shots, beams, power-up pickups, particles, wave counters, timers and
+both random generators, so a loaded game carries on exactly as the saved one
+would have. The wave script isn't saved; load into a World with the same
+script. File layout (little endian):
+
+    header  4s magic "SSSV", u16 version, u16 tick rate, u64 seed, u64 tick, u32 wave   (28 bytes)
+    body    zlib-compressed state; see dumps()
+
+The header repeats the seed and tick so `info` can show them without
+decompressing; loads() restores them from the body.
+
+Entity state is packed with struct, and the enemy and particle arrays are
+written as raw array bytes, so saving costs a few memcpys on the game thread.
+Compression and disk I/O happen on AutoSaver's background thread.
+
+    python savegame.py info FILE...                         # header only
+    python savegame.py checkpoint --wave 20 --seed 1 FILE   # a fresh game starting at wave 20
+"""
+import argparse
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+from simulation import TICK_RATE, Beam, Pickup, World
+from weapons import POWERUPS, WEAPONS
+
+MAGIC = b"SSSV"
+VERSION = 4
+HEADER = struct.Struct("<4sHHQQI")
+WORLD = struct.Struct("<QQqIBiiIIBQQI")  # seed, tick, score ... particle ring head; see dumps()
+PLAYER = struct.Struct("<dddiiqiBii")
+BULLET = struct.Struct("<qddddddiiB")
+BEAM = struct.Struct("<qddddii")
+PICKUP = struct.Struct("<qddBi")
+POINT = struct.Struct("<dd")
+COUNT = struct.Struct("<I")
+PY_RANDOM = struct.Struct("<625IBd")
+PCG64 = struct.Struct("<QQQQBI")
+WAVE_STATES = ("SPAWNING", "BREAK")
+WEAPON_NAMES = tuple(WEAPONS)
+MASK64 = (1 << 64) - 1
+
+# --- Random Generators ---
+def pack_rng(rng):
+    version, internal, gauss_next = rng.getstate()
+    return PY_RANDOM.pack(*internal, gauss_next is not None, gauss_next or 0.0)
+
+def unpack_rng(rng, data, offset):
+    *internal, has_gauss, gauss_next = PY_RANDOM.unpack_from(data, offset)
+    rng.setstate((3, tuple(internal), gauss_next if has_gauss else None))
+    return offset + PY_RANDOM.size
+
+def pack_generator(generator):
+    state = generator.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        raise ValueError(f"can't save a {state['bit_generator']} generator")
+    s, inc = state["state"]["state"], state["state"]["inc"]
+    return PCG64.pack(s >> 64, s & MASK64, inc >> 64, inc & MASK64, state["has_uint32"], state["uinteger"])
+
+def unpack_generator(generator, data, offset):
+    s_high, s_low, inc_high, inc_low, has_uint32, uinteger = PCG64.unpack_from(data, offset)
+    generator.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": s_high << 64 | s_low, "inc": inc_high << 64 | inc_low},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+    return offset + PCG64.size
+
+# --- Serialisation ---
+def dumps(world):
+    """Uncompressed body bytes for the world's current state."""
+    enemies = world.enemies
+    particles = world.particles
+    out = [
+        WORLD.pack(world.seed, world.tick, world.score, world.wave_number, WAVE_STATES.index(world.wave_state),
+                   world.wave_break_timer, world.enemy_spawn_timer, world.enemy_count_to_spawn,
+                   world.enemies_spawned_this_wave, world.game_over, world.next_bullet_id, enemies.next_id,
+                   particles.head),
+        pack_rng(world.rng),
+        pack_generator(particles.rng),
+        COUNT.pack(len(world.players)),
+    ]
+    for p in world.players:
+        out.append(PLAYER.pack(p.x, p.y, p.gun_angle, p.health, p.max_health, p.last_shot, p.invulnerable_timer,
+                               WEAPON_NAMES.index(p.weapon), p.weapon_timer, p.rapid_timer))
+
+    n = len(enemies)
+    out.append(COUNT.pack(n))
+    out.extend(np.ascontiguousarray(getattr(enemies, name)[..., :n]).tobytes() for name in enemies.FIELDS)
+
+    for bullets in (world.bullets, world.enemy_shots):
+        out.append(COUNT.pack(len(bullets)))
+        for b in bullets:
+            out.append(BULLET.pack(b.id, b.x, b.y, b.prev_x, b.prev_y, b.angle, b.speed, b.damage, b.blast,
+                                   len(b.trail)))
+            out.extend(POINT.pack(x, y) for x, y in b.trail)
+
+    out.append(COUNT.pack(len(world.beams)))
+    out.extend(BEAM.pack(b.id, b.x, b.y, b.angle, b.length, b.damage, b.timer) for b in world.beams)
+    out.append(COUNT.pack(len(world.pickups)))
+    out.extend(PICKUP.pack(p.id, p.x, p.y, POWERUPS.index(p.kind), p.timer) for p in world.pickups)
+
+    palette = particles.palette
+    out.append(COUNT.pack(particles.capacity))
+    out.append(COUNT.pack(len(palette)))
+    out.append(bytes(channel for color in palette for channel in color))
+    out.extend(getattr(particles, name).tobytes() for name in particles.FIELDS)
+    return b"".join(out)
+
+def read_array(data, offset, dtype, shape):
+    array = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    return array, offset + array.nbytes
+
+def loads(data, world):
+    """Restore the world from body bytes made by dumps(). The world's balance
+    knobs are left as they are."""
+    enemies = world.enemies
+    particles = world.particles
+    (world.seed, world.tick, world.score, world.wave_number, state, world.wave_break_timer,
+     world.enemy_spawn_timer, world.enemy_count_to_spawn, world.enemies_spawned_this_wave, game_over,
+     world.next_bullet_id, enemies.next_id, particles.head) = WORLD.unpack_from(data)
+    world.wave_state = WAVE_STATES[state]
+    world.game_over = bool(game_over)
+    offset = unpack_rng(world.rng, data, WORLD.size)
+    offset = unpack_generator(particles.rng, data, offset)
+
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    while world.player_count < count:
+        world.add_player()
+    del world.players[count:]
+    world.player_count = count
+    world.player = world.players[0]
+    for player in world.players:
+        (player.x, player.y, player.gun_angle, player.health, player.max_health, player.last_shot,
+         player.invulnerable_timer, weapon, player.weapon_timer, player.rapid_timer) = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        player.weapon = WEAPON_NAMES[weapon]
+        player.rect.center = (player.x, player.y)
+
+    (n,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    enemies.clear()
+    while enemies.capacity < n:
+        enemies.grow()
+    for name in enemies.FIELDS:
+        array = getattr(enemies, name)
+        values, offset = read_array(data, offset, array.dtype, array.shape[:-1] + (n,))
+        array[..., :n] = values
+    enemies.count = n
+
+    for bullets in (world.bullets, world.enemy_shots):
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        world.bullet_pool.release_all(bullets)
+        for _ in range(count):
+            (bullet_id, x, y, prev_x, prev_y, angle, speed, damage, blast,
+             trail_length) = BULLET.unpack_from(data, offset)
+            offset += BULLET.size
+            bullet = world.bullet_pool.acquire(x, y, angle, speed, damage, blast)
+            bullet.id = bullet_id
+            bullet.prev_x, bullet.prev_y = prev_x, prev_y
+            bullet.trail.clear()
+            for _ in range(trail_length):
+                bullet.trail.append(POINT.unpack_from(data, offset))
+                offset += POINT.size
+            bullets.append(bullet)
+
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    world.beams = []
+    for _ in range(count):
+        beam_id, x, y, angle, length, damage, timer = BEAM.unpack_from(data, offset)
+        offset += BEAM.size
+        beam = Beam(x, y, angle, length, damage)
+        beam.id = beam_id
+        beam.timer = timer
+        world.beams.append(beam)
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    world.pickups = []
+    for _ in range(count):
+        pickup_id, x, y, kind, timer = PICKUP.unpack_from(data, offset)
+        offset += PICKUP.size
+        pickup = Pickup(x, y, POWERUPS[kind], timer)
+        pickup.id = pickup_id
+        world.pickups.append(pickup)
+
+    capacity, colors = struct.unpack_from("<II", data, offset)
+    offset += 8
+    if capacity != particles.capacity:
+        raise ValueError(f"save has {capacity} particle slots, this world has {particles.capacity}")
+    particles.palette = [tuple(data[offset + 3 * i:offset + 3 * i + 3]) for i in range(colors)]
+    particles.palette_index = {color: i for i, color in enumerate(particles.palette)}
+    offset += 3 * colors
+    for name in particles.FIELDS:
+        array = getattr(particles, name)
+        values, offset = read_array(data, offset, array.dtype, array.shape)
+        array[:] = values
+    return world
+
+# --- Files ---
+def write(path, header, body, level=1):
+    # Write beside the target and rename over it, so a crash mid-save never leaves a torn file
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(header)
+        f.write(zlib.compress(body, level))
+    os.replace(temp, path)
+
+def pack_header(world):
+    return HEADER.pack(MAGIC, VERSION, TICK_RATE, world.seed, world.tick, world.wave_number)
+
+def save(world, path):
+    write(path, pack_header(world), dumps(world))
+
+def read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        body = f.read()
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: truncated save header")
+    magic, version, tick_rate, seed, tick, wave = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a save file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported save version {version}")
+    if tick_rate != TICK_RATE:
+        raise ValueError(f"{path}: saved at {tick_rate} ticks/s, this build runs at {TICK_RATE}")
+    return (seed, tick, wave), body
+
+def load(path, world=None):
+    """Load a save into `world` (a new World if not given) and return it."""
+    (seed, _, _), body = read_header(path)
+    world = world or World()
+    world.reset(seed)
+    loads(zlib.decompress(body), world)
+    return world
+
+class AutoSaver:
+    """Periodic saves on a background thread. The frame loop only pays for
+    dumps(); compressing and writing happen off-thread, and if the disk falls
+    behind, older pending saves are dropped in favour of the newest."""
+
+    def __init__(self, path, interval=10 * TICK_RATE):
+        self.path = path
+        self.interval = interval  # ticks between saves
+        self.last_tick = None
+        self.pending = queue.Queue(maxsize=1)
+        self.saves = 0
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def update(self, world):
+        if self.last_tick is not None and 0 <= world.tick - self.last_tick < self.interval:
+            return
+        self.save(world)
+
+    def save(self, world):
+        self.last_tick = world.tick
+        job = (pack_header(world), dumps(world))
+        try:
+            self.pending.get_nowait()  # superseded
+        except queue.Empty:
+            pass
+        self.pending.put(job)
+
+    def run(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            write(self.path, *job)
+            self.saves += 1
+
+    def close(self):
+        """Finish any pending save and stop the thread."""
+        self.pending.put(None)
+        self.thread.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect save files or make checkpoints.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info")
+    info.add_argument("files", nargs="+")
+    checkpoint = sub.add_parser("checkpoint", help="write a fresh game that starts at the given wave")
+    checkpoint.add_argument("file")
+    checkpoint.add_argument("--wave", type=int, required=True)
+    checkpoint.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        for path in args.files:
+            (seed, tick, wave), body = read_header(path)
+            print(f"{path}: seed={seed} tick={tick} ({tick / TICK_RATE:.1f}s) wave={wave} "
+                  f"size={HEADER.size + len(body)} bytes")
+    else:
+        world = World(args.seed)
+        world.start_at_wave(args.wave)
+        save(world, args.file)
+        print(f"{args.file}: seed={world.seed} wave={world.wave_number}")
+
+if __name__ == "__main__":
+    sys.exit(main())
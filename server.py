@@ -0,0 +1,232 @@
+"""Authoritative multiplayer server.
+
+One World runs here at the fixed tick rate. Clients only send their aim and
+click over UDP and get back delta-compressed snapshots (see netcode.py), so
+every hit, spawn and score is decided on the server.
+
+    python server.py --players 8                   # serve on 127.0.0.1:9999
+    python server.py --bots 8 --seconds 30         # plus 8 scripted clients over loopback
+    python shooter.py --connect 127.0.0.1:9999     # join with the normal renderer
+
+The first client controls player 0; each later one joins as a new player.
+A client that has gone quiet for TIMEOUT keeps its player until a new
+address needs the slot, and then the newcomer takes that player over.
+The world only ticks while somebody is connected and restarts a few seconds
+after everyone has died.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from batch_sim import bot_inputs
+from netcode import (HELLO, INPUT, INPUT_PACKET, NO_BASELINE, WELCOME, WELCOME_PACKET, ClientState,
+                     apply_snapshot, capture, decode_input, encode)
+from simulation import TICK_RATE, TICK, Inputs, World
+
+RESTART_DELAY = 3 * TICK_RATE  # ticks of game-over screen before the server starts a new game
+TIMEOUT = 5 * TICK_RATE  # stop sending to a client that has been silent this long
+
+class Connection:
+    def __init__(self, addr, player):
+        self.addr = addr
+        self.player = player
+        self.ack = NO_BASELINE  # newest snapshot the client has confirmed
+        self.last_heard = 0  # server frame of the client's last packet
+        self.mouse_pos = (0, 0)
+        self.shoot = False  # latched until the next tick consumes it
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+
+class GameServer(asyncio.DatagramProtocol):
+    def __init__(self, world, max_players=8, snapshot_rate=20, record=False):
+        self.world = world
+        self.max_players = max_players
+        self.snapshot_interval = max(1, round(TICK_RATE / snapshot_rate))
+        self.connections = {}
+        self.history = {}  # frame -> snapshot, for delta baselines
+        self.transport = None
+        self.frame = 0  # server tick count; unlike world.tick it never resets, so snapshot ids stay unique
+        self.game_over_frames = 0
+        self.record = record  # keep tick_times, for benchmarks
+        self.tick_times = []  # with record, seconds per server tick: simulation, capture and encoding
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if not data:
+            return
+        conn = self.connections.get(addr)
+        if conn is not None:
+            conn.last_heard = self.frame
+        if data[0] == HELLO:
+            if conn is None:
+                self.drop_timed_out()
+                if len(self.connections) >= self.max_players:
+                    return
+                taken = {other.player for other in self.connections.values()}
+                player = next(i for i in range(self.max_players) if i not in taken)
+                if player >= self.world.player_count:
+                    self.world.add_player()
+                conn = self.connections[addr] = Connection(addr, player)
+                conn.last_heard = self.frame
+            self.transport.sendto(WELCOME_PACKET.pack(WELCOME, conn.player, TICK_RATE, self.world.seed), addr)
+        elif data[0] == INPUT and conn is not None and len(data) == INPUT_PACKET.size:
+            inputs, ack = decode_input(data)
+            conn.bytes_received += len(data)
+            conn.mouse_pos = inputs.mouse_pos
+            conn.shoot = conn.shoot or inputs.shoot
+            if ack != NO_BASELINE and (conn.ack == NO_BASELINE or ack > conn.ack):
+                conn.ack = ack
+
+    def drop_timed_out(self):
+        """Forget clients silent for longer than TIMEOUT, freeing their player slots."""
+        for addr in [addr for addr, conn in self.connections.items() if self.frame - conn.last_heard > TIMEOUT]:
+            del self.connections[addr]
+
+    def tick(self):
+        start = time.perf_counter()
+        world = self.world
+        inputs = [None] * world.player_count
+        for conn in self.connections.values():
+            inputs[conn.player] = Inputs(conn.mouse_pos, conn.shoot)
+            conn.shoot = False
+        world.step(inputs)
+
+        if world.game_over:
+            self.game_over_frames += 1
+            if self.game_over_frames >= RESTART_DELAY:
+                world.reset(world.seed + 1)
+                self.game_over_frames = 0
+
+        self.frame += 1
+        if self.frame % self.snapshot_interval == 0:
+            self.broadcast()
+        if self.record:
+            self.tick_times.append(time.perf_counter() - start)
+
+    def broadcast(self):
+        snapshot = capture(self.world)
+        snapshot["tick"] = self.frame
+        history = self.history
+        history[self.frame] = snapshot
+        for frame in [f for f in history if f < self.frame - 2 * TICK_RATE]:
+            del history[frame]
+
+        # Clients in step with each other have acked the same snapshot; encode each delta once
+        encoded = {}
+        for conn in self.connections.values():
+            if self.frame - conn.last_heard > TIMEOUT:
+                continue  # gone quiet; its player idles until it says HELLO again or a newcomer takes it
+            baseline = history.get(conn.ack)
+            key = baseline["tick"] if baseline else None
+            data = encoded.get(key)
+            if data is None:
+                data = encoded[key] = encode(snapshot, baseline)
+            self.transport.sendto(data, conn.addr)
+            conn.bytes_sent += len(data)
+            conn.snapshots += 1
+            conn.full_snapshots += baseline is None
+
+    async def run(self, seconds=None):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        end = None if seconds is None else next_tick + seconds
+        while end is None or next_tick < end:
+            if self.connections:
+                self.tick()
+            next_tick += TICK
+            delay = next_tick - loop.time()
+            if delay < -5 * TICK:
+                next_tick = loop.time()  # fell far behind; drop the backlog instead of spiralling
+            await asyncio.sleep(max(0.0, delay))
+
+async def serve(host, port, world, max_players=8, snapshot_rate=20, seconds=None, record=False):
+    loop = asyncio.get_running_loop()
+    transport, server = await loop.create_datagram_endpoint(
+        lambda: GameServer(world, max_players, snapshot_rate, record), local_addr=(host, port))
+    try:
+        await server.run(seconds)
+    finally:
+        transport.close()
+    return server
+
+# --- Scripted Clients ---
+class BotClient(asyncio.DatagramProtocol):
+    """Headless client: mirrors the server's snapshots into a local World and
+    plays it with the batch-sim bot."""
+
+    def __init__(self):
+        self.state = ClientState()
+        self.world = World()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.sendto(self.state.hello())
+
+    def datagram_received(self, data, addr):
+        snapshot = self.state.receive(data)
+        if snapshot is not None and snapshot is self.state.latest:
+            apply_snapshot(self.world, snapshot, self.state.player_index)
+
+    async def play(self, seconds):
+        loop = asyncio.get_running_loop()
+        end = loop.time() + seconds
+        while loop.time() < end:
+            if self.state.latest is None:
+                self.transport.sendto(self.state.hello())
+                await asyncio.sleep(0.1)
+                continue
+            self.transport.sendto(self.state.input_packet(bot_inputs(self.world)))
+            await asyncio.sleep(TICK)
+
+async def run_bots(host, port, count, seconds):
+    loop = asyncio.get_running_loop()
+    bots = []
+    for _ in range(count):
+        transport, bot = await loop.create_datagram_endpoint(BotClient, remote_addr=(host, port))
+        bots.append(bot)
+    await asyncio.gather(*(bot.play(seconds) for bot in bots))
+    for bot in bots:
+        bot.transport.close()
+    return [(bot.state.bytes_received, bot.state.dropped) for bot in bots]
+
+def bot_process(host, port, count, seconds, results=None):
+    stats = asyncio.run(run_bots(host, port, count, seconds))
+    if results is not None:
+        results.put(stats)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an authoritative game server over UDP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--players", type=int, default=8, help="maximum number of connected players")
+    parser.add_argument("--snapshot-rate", type=int, default=20, help="snapshots per second sent to each client")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=None, help="stop after this long")
+    parser.add_argument("--bots", type=int, default=0, help="also start this many scripted clients in a subprocess")
+    args = parser.parse_args(argv)
+
+    if args.bots:
+        bots = multiprocessing.Process(target=bot_process, args=(args.host, args.port, args.bots, args.seconds or 3600))
+        bots.start()
+    print(f"serving on {args.host}:{args.port} at {TICK_RATE} Hz, {args.snapshot_rate} snapshots/s")
+    try:
+        server = asyncio.run(serve(args.host, args.port, World(args.seed), args.players, args.snapshot_rate,
+                                   args.seconds))
+    except KeyboardInterrupt:
+        return
+    for conn in server.connections.values():
+        print(f"player {conn.player}: {conn.snapshots} snapshots ({conn.full_snapshots} full), "
+              f"{conn.bytes_sent} bytes sent, {conn.bytes_received} bytes received")
+
+if __name__ == "__main__":
+    sys.exit(main())
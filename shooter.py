@@ -1,543 +1,493 @@
-import pygame
-import random
-import sys
-import math
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
-
-# --- Game Constants ---
-SCREEN_WIDTH = 1000
-SCREEN_HEIGHT = 700
-FPS = 60
-
-# --- Colors ---
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-RED = (255, 50, 50)
-GREEN = (50, 255, 50)
-BLUE = (50, 150, 255)
-DARK_RED = (180, 0, 0)
-DARK_BLUE = (0, 0, 150)
-GRAY = (128, 128, 128)
-LIGHT_GRAY = (200, 200, 200)
-YELLOW = (255, 255, 0)
-ORANGE = (255, 165, 0)
-PURPLE = (128, 0, 128)
-
-# --- Game Setup ---
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Enhanced Stick Man Shooter")
-clock = pygame.time.Clock()
-font = pygame.font.Font(None, 28)
-large_font = pygame.font.Font(None, 64)
-title_font = pygame.font.Font(None, 80)
-
-# --- Game State ---
-game_state = "START"
-wave_number = 1
-wave_state = "SPAWNING"  # SPAWNING, BREAK, COMPLETED
-wave_break_timer = 0
-wave_break_duration = 180  # 3 seconds at 60 FPS
-enemy_spawn_timer = 0
-enemy_spawn_delay = 30  # Much faster spawning (0.5 seconds)
-
-# --- Particle System ---
-class Particle:
-    def __init__(self, x, y, color, velocity, lifetime):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.vx, self.vy = velocity
-        self.lifetime = lifetime
-        self.max_lifetime = lifetime
-        self.size = random.randint(2, 5)
-    
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.1  # gravity
-        self.lifetime -= 1
-        return self.lifetime > 0
-    
-    def draw(self, surface):
-        alpha = int(255 * (self.lifetime / self.max_lifetime))
-        color_with_alpha = (*self.color, alpha)
-        s = pygame.Surface((self.size * 2, self.size * 2))
-        s.set_alpha(alpha)
-        pygame.draw.circle(s, self.color, (self.size, self.size), self.size)
-        surface.blit(s, (self.x - self.size, self.y - self.size))
-
-particles = []
-
-def create_explosion(x, y, color, count=10):
-    for _ in range(count):
-        velocity = (random.uniform(-3, 3), random.uniform(-3, 3))
-        particles.append(Particle(x, y, color, velocity, random.randint(30, 60)))
-
-class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = 25
-        self.height = 70
-        self.gun_length = 35
-        self.gun_angle = 0
-        self.health = 100
-        self.max_health = 100
-        self.rect = pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, self.width, self.height)
-        self.last_shot = 0
-        self.shot_cooldown = 15  # frames between shots
-        self.invulnerable_timer = 0
-        
-    def aim_at_mouse(self, mouse_pos):
-        """Aim the gun at the mouse cursor position."""
-        dx = mouse_pos[0] - self.x
-        dy = mouse_pos[1] - self.y
-        self.gun_angle = math.atan2(dy, dx)
-    
-    def can_shoot(self):
-        return pygame.time.get_ticks() - self.last_shot > self.shot_cooldown * (1000 // FPS)
-    
-    def take_damage(self, damage):
-        if self.invulnerable_timer <= 0:
-            self.health -= damage
-            self.invulnerable_timer = 60  # 1 second of invulnerability
-            create_explosion(self.x, self.y, RED, 5)
-    
-    def update(self):
-        if self.invulnerable_timer > 0:
-            self.invulnerable_timer -= 1
-        self.rect.center = (self.x, self.y)
-    
-    def draw(self, surface):
-        # Add flashing effect when invulnerable
-        if self.invulnerable_timer > 0 and self.invulnerable_timer % 10 < 5:
-            return
-            
-        gun_end_x = self.x + self.gun_length * math.cos(self.gun_angle)
-        gun_end_y = self.y + self.gun_length * math.sin(self.gun_angle)
-        
-        # Shadow effect
-        shadow_offset = 2
-        pygame.draw.circle(surface, GRAY, (self.x + shadow_offset, self.y - self.height // 2 + shadow_offset), self.width // 2)
-        
-        # Head
-        pygame.draw.circle(surface, BLACK, (self.x, self.y - self.height // 2), self.width // 2)
-        pygame.draw.circle(surface, WHITE, (self.x, self.y - self.height // 2), self.width // 2, 2)
-        
-        # Body
-        pygame.draw.line(surface, BLACK, (self.x, self.y - self.height // 2 + self.width // 2), 
-                        (self.x, self.y + self.height // 4), 4)
-        
-        # Legs
-        pygame.draw.line(surface, BLACK, (self.x, self.y + self.height // 4), 
-                        (self.x - self.width // 2, self.y + self.height // 2), 4)
-        pygame.draw.line(surface, BLACK, (self.x, self.y + self.height // 4), 
-                        (self.x + self.width // 2, self.y + self.height // 2), 4)
-        
-        # Gun
-        pygame.draw.line(surface, DARK_BLUE, (self.x, self.y), (gun_end_x, gun_end_y), 6)
-        pygame.draw.circle(surface, DARK_BLUE, (int(gun_end_x), int(gun_end_y)), 4)
-
-class Enemy:
-    def __init__(self, target_x, target_y):
-        self.target_x = target_x
-        self.target_y = target_y
-        
-        # Spawn from random side
-        side = random.choice(['top', 'bottom', 'left', 'right'])
-        margin = 80
-        if side == 'top':
-            self.x = random.randint(margin, SCREEN_WIDTH - margin)
-            self.y = -50
-        elif side == 'bottom':
-            self.x = random.randint(margin, SCREEN_WIDTH - margin)
-            self.y = SCREEN_HEIGHT + 50
-        elif side == 'left':
-            self.x = -50
-            self.y = random.randint(margin, SCREEN_HEIGHT - margin)
-        else:
-            self.x = SCREEN_WIDTH + 50
-            self.y = random.randint(margin, SCREEN_HEIGHT - margin)
-        
-        self.width = 18
-        self.height = 55
-        self.speed = random.uniform(2.5, 4.5)  # Much faster enemies
-        self.health = 2
-        self.max_health = 2
-        self.rect = pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, self.width, self.height)
-        self.hit_timer = 0
-        
-    def move(self):
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
-        distance = math.hypot(dx, dy)
-        
-        if distance > 1:
-            self.x += (dx / distance) * self.speed
-            self.y += (dy / distance) * self.speed
-        
-        self.rect.center = (self.x, self.y)
-        
-        if self.hit_timer > 0:
-            self.hit_timer -= 1
-    
-    def take_damage(self, damage):
-        self.health -= damage
-        self.hit_timer = 10
-        create_explosion(self.x, self.y, ORANGE, 3)
-        return self.health <= 0
-        
-    def draw(self, surface):
-        # Change color when hit
-        color = RED if self.hit_timer <= 0 else YELLOW
-        shadow_color = GRAY if self.hit_timer <= 0 else (200, 200, 0)
-        
-        # Shadow effect
-        shadow_offset = 2
-        pygame.draw.circle(surface, shadow_color, 
-                          (self.x + shadow_offset, self.y - self.height // 2 + shadow_offset), 
-                          self.width // 2)
-        
-        # Head
-        pygame.draw.circle(surface, color, (self.x, self.y - self.height // 2), self.width // 2)
-        pygame.draw.circle(surface, WHITE, (self.x, self.y - self.height // 2), self.width // 2, 2)
-        
-        # Body
-        pygame.draw.line(surface, color, 
-                        (self.x, self.y - self.height // 2 + self.width // 2), 
-                        (self.x, self.y + self.height // 4), 4)
-        
-        # Arms
-        arm_y = self.y - 5
-        pygame.draw.line(surface, color, 
-                        (self.x, arm_y), 
-                        (self.x - self.width // 2, arm_y - 5), 3)
-        pygame.draw.line(surface, color, 
-                        (self.x, arm_y), 
-                        (self.x + self.width // 2, arm_y - 5), 3)
-        
-        # Legs
-        pygame.draw.line(surface, color, 
-                        (self.x, self.y + self.height // 4), 
-                        (self.x - self.width // 2, self.y + self.height // 2), 4)
-        pygame.draw.line(surface, color, 
-                        (self.x, self.y + self.height // 4), 
-                        (self.x + self.width // 2, self.y + self.height // 2), 4)
-        
-        # Health bar
-        if self.health < self.max_health:
-            bar_width = 20
-            bar_height = 4
-            bar_x = self.x - bar_width // 2
-            bar_y = self.y - self.height // 2 - 15
-            
-            pygame.draw.rect(surface, DARK_RED, (bar_x, bar_y, bar_width, bar_height))
-            pygame.draw.rect(surface, GREEN, (bar_x, bar_y, 
-                           bar_width * (self.health / self.max_health), bar_height))
-
-class Bullet:
-    def __init__(self, x, y, angle):
-        self.x = x
-        self.y = y
-        self.speed = 12
-        self.radius = 6
-        self.angle = angle
-        self.vx = math.cos(angle) * self.speed
-        self.vy = math.sin(angle) * self.speed
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
-        self.trail = [(self.x, self.y)]
-        
-    def move(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.rect.center = (self.x, self.y)
-        
-        # Add to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > 5:
-            self.trail.pop(0)
-    
-    def draw(self, surface):
-        # Draw trail
-        for i, pos in enumerate(self.trail):
-            alpha = int(255 * (i + 1) / len(self.trail))
-            size = int(self.radius * (i + 1) / len(self.trail))
-            s = pygame.Surface((size * 2, size * 2))
-            s.set_alpha(alpha // 2)
-            pygame.draw.circle(s, BLUE, (size, size), size)
-            surface.blit(s, (pos[0] - size, pos[1] - size))
-        
-        # Draw bullet
-        pygame.draw.circle(surface, BLUE, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), self.radius // 2)
-
-def draw_health_bar(surface, x, y, current, maximum, width=200, height=20):
-    # Background
-    pygame.draw.rect(surface, DARK_RED, (x, y, width, height))
-    # Health
-    health_width = int(width * (current / maximum))
-    pygame.draw.rect(surface, GREEN, (x, y, health_width, height))
-    # Border
-    pygame.draw.rect(surface, BLACK, (x, y, width, height), 2)
-    # Text
-    health_text = font.render(f"Health: {current}/{maximum}", True, BLACK)
-    surface.blit(health_text, (x, y - 25))
-
-def draw_wave_info(surface, wave, wave_state, enemies_left, break_timer=0):
-    wave_text = font.render(f"Wave: {wave}", True, BLACK)
-    surface.blit(wave_text, (SCREEN_WIDTH - 150, 20))
-    
-    if wave_state == "SPAWNING":
-        enemies_text = font.render(f"Enemies: {enemies_left}", True, BLACK)
-        surface.blit(enemies_text, (SCREEN_WIDTH - 150, 50))
-    elif wave_state == "BREAK":
-        break_seconds = max(0, break_timer // 60)
-        break_text = font.render(f"Next wave in: {break_seconds + 1}", True, BLUE)
-        surface.blit(break_text, (SCREEN_WIDTH - 180, 50))
-        
-        # Healing message
-        heal_text = font.render("+ Health restored!", True, GREEN)
-        surface.blit(heal_text, (SCREEN_WIDTH - 180, 80))
-
-def draw_button(surface, text, x, y, width, height, color, text_color, border_color=BLACK):
-    pygame.draw.rect(surface, color, (x, y, width, height))
-    pygame.draw.rect(surface, border_color, (x, y, width, height), 3)
-    
-    text_surface = font.render(text, True, text_color)
-    text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
-    surface.blit(text_surface, text_rect)
-    
-    return pygame.Rect(x, y, width, height)
-
-def reset_game():
-    global player, enemies, bullets, enemy_count_to_spawn, score, wave_number, enemy_spawn_timer, particles, wave_state, wave_break_timer, enemies_spawned_this_wave
-    player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-    bullets = []
-    enemies = []
-    particles = []
-    enemy_count_to_spawn = 5  # Start with 5 enemies per wave
-    score = 0
-    wave_number = 1
-    wave_state = "SPAWNING"
-    wave_break_timer = 0
-    enemy_spawn_timer = 0
-    enemies_spawned_this_wave = 0
-
-# Initialize game objects
-player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-bullets = []
-enemies = []
-enemy_count_to_spawn = 5
-score = 0
-enemies_spawned_this_wave = 0
-
-# Main Game Loop
-running = True
-reset_game()
-
-while running:
-    dt = clock.tick(FPS)
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Event Handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-            
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-                
-            if game_state == "START":
-                if event.key == pygame.K_SPACE:
-                    reset_game()
-                    game_state = "PLAYING"
-                    
-            elif game_state == "PLAYING":
-                pass  # Shooting now handled by mouse click
-                    
-            elif game_state == "GAME_OVER":
-                if event.key == pygame.K_r:
-                    reset_game()
-                    game_state = "PLAYING"
-        
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left click
-            if game_state == "START":
-                start_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50)
-                if start_button_rect.collidepoint(mouse_pos):
-                    reset_game()
-                    game_state = "PLAYING"
-            elif game_state == "PLAYING":
-                # Shoot with left mouse click
-                if player.can_shoot():
-                    gun_end_x = player.x + player.gun_length * math.cos(player.gun_angle)
-                    gun_end_y = player.y + player.gun_length * math.sin(player.gun_angle)
-                    bullets.append(Bullet(gun_end_x, gun_end_y, player.gun_angle))
-                    player.last_shot = pygame.time.get_ticks()
-            elif game_state == "GAME_OVER":
-                restart_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, 200, 50)
-                if restart_button_rect.collidepoint(mouse_pos):
-                    reset_game()
-                    game_state = "PLAYING"
-    
-    # Game Logic
-    if game_state == "PLAYING":
-        player.update()
-        player.aim_at_mouse(mouse_pos)  # Manual aiming with mouse
-        
-        # Wave system logic
-        if wave_state == "SPAWNING":
-            # Spawn enemies quickly
-            if len(enemies) + enemies_spawned_this_wave < enemy_count_to_spawn:
-                enemy_spawn_timer += 1
-                if enemy_spawn_timer >= enemy_spawn_delay:
-                    enemies.append(Enemy(player.x, player.y))
-                    enemies_spawned_this_wave += 1
-                    enemy_spawn_timer = 0
-            
-            # Check if all enemies are spawned and defeated
-            if enemies_spawned_this_wave >= enemy_count_to_spawn and len(enemies) == 0:
-                wave_state = "BREAK"
-                wave_break_timer = wave_break_duration
-                # Heal player between waves
-                player.health = min(player.health + 30, player.max_health)
-        
-        elif wave_state == "BREAK":
-            wave_break_timer -= 1
-            if wave_break_timer <= 0:
-                # Start next wave
-                wave_number += 1
-                enemy_count_to_spawn = min(wave_number * 3 + 2, 25)  # Increase enemies per wave
-                enemies_spawned_this_wave = 0
-                wave_state = "SPAWNING"
-        
-        # Update bullets
-        for bullet in bullets[:]:
-            bullet.move()
-            if not pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT).colliderect(bullet.rect):
-                bullets.remove(bullet)
-        
-        # Update enemies
-        for enemy in enemies:
-            enemy.move()
-        
-        # Update particles
-        particles = [p for p in particles if p.update()]
-        
-        # Collision Detection
-        for bullet in bullets[:]:
-            for enemy in enemies[:]:
-                if bullet.rect.colliderect(enemy.rect):
-                    if bullet in bullets: bullets.remove(bullet)
-                    if enemy.take_damage(1):
-                        enemies.remove(enemy)
-                        score += 10
-                        create_explosion(enemy.x, enemy.y, RED, 8)
-                    break
-        
-        # Player-Enemy collision
-        for enemy in enemies:
-            if player.rect.colliderect(enemy.rect):
-                player.take_damage(20)
-                if player.health <= 0:
-                    game_state = "GAME_OVER"
-        
-        # Check wave completion
-        # (This logic is now handled in the wave system above)
-    
-    # Drawing
-    screen.fill(LIGHT_GRAY)
-    
-    # Draw grid background
-    for x in range(0, SCREEN_WIDTH, 50):
-        pygame.draw.line(screen, WHITE, (x, 0), (x, SCREEN_HEIGHT), 1)
-    for y in range(0, SCREEN_HEIGHT, 50):
-        pygame.draw.line(screen, WHITE, (0, y), (SCREEN_WIDTH, y), 1)
-    
-    if game_state == "START":
-        # Title
-        title_text = title_font.render("STICK MAN SHOOTER", True, BLACK)
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-        screen.blit(title_text, title_rect)
-        
-        # Subtitle
-        subtitle = font.render("Survive the waves of enemies!", True, GRAY)
-        subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-        screen.blit(subtitle, subtitle_rect)
-        
-        # Start button
-        draw_button(screen, "START GAME", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50, GREEN, BLACK)
-        
-        # Controls
-        controls = [
-            "Mouse - Aim",
-            "Left Click - Shoot",
-            "ESC - Quit"
-        ]
-        for i, control in enumerate(controls):
-            text = font.render(control, True, BLACK)
-            text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120 + i * 30))
-            screen.blit(text, text_rect)
-    
-    elif game_state == "PLAYING":
-        # Draw game objects
-        player.draw(screen)
-        
-        for enemy in enemies:
-            enemy.draw(screen)
-            
-        for bullet in bullets:
-            bullet.draw(screen)
-            
-        for particle in particles:
-            particle.draw(screen)
-        
-        # Draw UI
-        draw_health_bar(screen, 20, 20, player.health, player.max_health)
-        
-        score_text = font.render(f"Score: {score}", True, BLACK)
-        screen.blit(score_text, (20, 70))
-        
-        draw_wave_info(screen, wave_number, wave_state, 
-                      len(enemies) + (enemy_count_to_spawn - enemies_spawned_this_wave) if wave_state == "SPAWNING" else 0, 
-                      wave_break_timer if wave_state == "BREAK" else 0)
-        
-        # Aim line (shows where player is aiming)
-        aim_length = 100
-        aim_end_x = player.x + aim_length * math.cos(player.gun_angle)
-        aim_end_y = player.y + aim_length * math.sin(player.gun_angle)
-        pygame.draw.line(screen, (255, 0, 0, 100), (player.x, player.y), (aim_end_x, aim_end_y), 2)
-        
-        # Crosshair at mouse position
-        pygame.draw.circle(screen, RED, mouse_pos, 12, 2)
-        pygame.draw.line(screen, RED, (mouse_pos[0] - 8, mouse_pos[1]), (mouse_pos[0] + 8, mouse_pos[1]), 2)
-        pygame.draw.line(screen, RED, (mouse_pos[0], mouse_pos[1] - 8), (mouse_pos[0], mouse_pos[1] + 8), 2)
-    
-    elif game_state == "GAME_OVER":
-        # Game over screen
-        game_over_text = large_font.render("GAME OVER", True, RED)
-        game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
-        screen.blit(game_over_text, game_over_rect)
-        
-        final_score_text = font.render(f"Final Score: {score}", True, BLACK)
-        score_rect = final_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-        screen.blit(final_score_text, score_rect)
-        
-        wave_text = font.render(f"Waves Survived: {wave_number - 1}", True, BLACK)
-        wave_rect = wave_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
-        screen.blit(wave_text, wave_rect)
-        
-        # Restart button
-        draw_button(screen, "RESTART", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, 200, 50, GREEN, BLACK)
-        
-        restart_text = font.render("Press R to restart", True, GRAY)
-        restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120))
-        screen.blit(restart_text, restart_rect)
-    
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+import sys
+import os
+import math
+import time
+import argparse
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from audio import AudioEngine
+from lod import DETAILS, FULL, DetailController
+from netcode import UDPClient, apply_snapshot
+from particles import draw_particles
+from profiler import BUDGET_MS, FrameProfiler, draw_overlay, no_lap
+from render_cache import LRUCache, get_font, render_text
+from replay import Recorder, Replay, seek
+from savegame import AutoSaver, load
+from simulation import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TICK_RATE, TICK,
+    BLACK, WHITE, RED, GREEN, BLUE, DARK_RED, GRAY, LIGHT_GRAY,
+    Inputs, World,
+)
+from weapons import DEFAULT_WEAPON, POWERUP_COLORS
+from sprites import draw_player, draw_enemies, draw_enemy_shot, draw_bullet, draw_pickup, draw_beam
+from stress import StressRamp
+
+# --- UI Drawing ---
+FONT_SIZE = 28
+LARGE_FONT_SIZE = 64
+TITLE_FONT_SIZE = 80
+hud_cache = LRUCache(maxsize=64)  # baked HUD panels, keyed on the values they show
+WEAPON_INFO_Y = 100  # weapon and rapid-fire lines, under the score
+OVERLAY_Y = WEAPON_INFO_Y + 60  # profiler overlay, below the weapon lines
+
+def draw_health_bar(surface, x, y, current, maximum, width=200, height=20):
+    key = ("health", current, maximum, width, height)
+    panel = hud_cache.get(key)
+    if panel is None:
+        health_text = render_text(get_font(FONT_SIZE), f"Health: {current}/{maximum}", BLACK)
+        panel = pygame.Surface((max(width, health_text.get_width()), height + 25), pygame.SRCALPHA)
+        # Background
+        pygame.draw.rect(panel, DARK_RED, (0, 25, width, height))
+        # Health
+        health_width = int(width * (current / maximum))
+        pygame.draw.rect(panel, GREEN, (0, 25, health_width, height))
+        # Border
+        pygame.draw.rect(panel, BLACK, (0, 25, width, height), 2)
+        # Text
+        panel.blit(health_text, (0, 0))
+        panel = hud_cache.put(key, panel)
+    return surface.blit(panel, (x, y - 25))
+
+def draw_wave_info(surface, wave, wave_state, enemies_left, break_timer=0):
+    wave_text = render_text(get_font(FONT_SIZE), f"Wave: {wave}", BLACK)
+    rect = surface.blit(wave_text, (SCREEN_WIDTH - 150, 20))
+
+    if wave_state == "SPAWNING":
+        enemies_text = render_text(get_font(FONT_SIZE), f"Enemies: {enemies_left}", BLACK)
+        rect.union_ip(surface.blit(enemies_text, (SCREEN_WIDTH - 150, 50)))
+    elif wave_state == "BREAK":
+        break_seconds = max(0, break_timer // TICK_RATE)
+        break_text = render_text(get_font(FONT_SIZE), f"Next wave in: {break_seconds + 1}", BLUE)
+        rect.union_ip(surface.blit(break_text, (SCREEN_WIDTH - 180, 50)))
+
+        # Healing message
+        heal_text = render_text(get_font(FONT_SIZE), "+ Health restored!", GREEN)
+        rect.union_ip(surface.blit(heal_text, (SCREEN_WIDTH - 180, 80)))
+    return rect
+
+def draw_button(surface, text, x, y, width, height, color, text_color, border_color=BLACK):
+    pygame.draw.rect(surface, color, (x, y, width, height))
+    pygame.draw.rect(surface, border_color, (x, y, width, height), 3)
+
+    text_surface = render_text(get_font(FONT_SIZE), text, text_color)
+    text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
+    surface.blit(text_surface, text_rect)
+
+    return pygame.Rect(x, y, width, height)
+
+def draw_weapon_info(surface, x, y, weapon, weapon_timer, rapid_timer):
+    # Seconds left on a picked-up weapon and on rapid fire
+    text = weapon.capitalize()
+    if weapon != DEFAULT_WEAPON:
+        text += f" {weapon_timer // TICK_RATE + 1}s"
+    color = POWERUP_COLORS.get(weapon, BLACK)
+    rect = surface.blit(render_text(get_font(FONT_SIZE), text, BLACK), (x, y))
+    pygame.draw.circle(surface, color, (x - 10, y + 9), 6)
+    if rapid_timer > 0:
+        rapid_text = render_text(get_font(FONT_SIZE), f"Rapid fire {rapid_timer // TICK_RATE + 1}s", BLACK)
+        rect.union_ip(surface.blit(rapid_text, (x, y + 25)))
+    return rect.union(pygame.Rect(x - 16, y + 3, 12, 12))
+
+def draw_hud(surface, world):
+    player = world.player
+    score_text = render_text(get_font(FONT_SIZE), f"Score: {world.score}", BLACK)
+    return [
+        draw_health_bar(surface, 20, 20, player.health, player.max_health),
+        surface.blit(score_text, (20, 70)),
+        draw_weapon_info(surface, 36, WEAPON_INFO_Y, player.weapon, player.weapon_timer, player.rapid_timer),
+        draw_wave_info(surface, world.wave_number, world.wave_state, world.enemies_left(),
+                       world.wave_break_timer if world.wave_state == "BREAK" else 0),
+    ]
+
+def draw_world(surface, world, mouse_pos, alpha=1.0, lap=no_lap, detail=FULL):
+    """Draw the playing field and HUD, with moving entities interpolated `alpha` of
+    the way from the previous tick to the current one, at the given level of
+    `detail` (see lod.py). Returns the list of rects that were drawn to."""
+    player = world.player
+    dirty = []
+
+    # Draw game objects
+    for pickup in world.pickups:
+        dirty.append(draw_pickup(surface, pickup, alpha))
+    for other in world.living_players():
+        dirty.append(draw_player(surface, other))
+
+    dirty.extend(draw_enemies(surface, world.enemies, alpha, [a.color for a in world.waves.archetypes],
+                              detail.shadows, detail.health_bars, detail.simple_enemies))
+
+    for bullet in world.bullets:
+        dirty.append(draw_bullet(surface, bullet, alpha, detail.trail))
+    for shot in world.enemy_shots:
+        dirty.append(draw_enemy_shot(surface, shot, alpha))
+    for beam in world.beams:
+        dirty.append(draw_beam(surface, beam))
+    lap("draw_entities")
+
+    dirty.extend(draw_particles(surface, world.particles, alpha, detail.particle_step))
+    lap("draw_particles")
+
+    # Draw UI
+    dirty.extend(draw_hud(surface, world))
+
+    # Aim line (shows where player is aiming)
+    aim_length = 100
+    aim_end_x = player.x + aim_length * math.cos(player.gun_angle)
+    aim_end_y = player.y + aim_length * math.sin(player.gun_angle)
+    dirty.append(pygame.draw.line(surface, (255, 0, 0, 100), (player.x, player.y), (aim_end_x, aim_end_y), 2))
+
+    # Crosshair at mouse position
+    dirty.append(pygame.draw.circle(surface, RED, mouse_pos, 12, 2))
+    pygame.draw.line(surface, RED, (mouse_pos[0] - 8, mouse_pos[1]), (mouse_pos[0] + 8, mouse_pos[1]), 2)
+    pygame.draw.line(surface, RED, (mouse_pos[0], mouse_pos[1] - 8), (mouse_pos[0], mouse_pos[1] + 8), 2)
+    lap("draw_hud")
+
+    return [rect for rect in dirty if rect]
+
+def draw_start_screen(surface):
+    # Title
+    title_text = render_text(get_font(TITLE_FONT_SIZE), "STICK MAN SHOOTER", BLACK)
+    title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
+    surface.blit(title_text, title_rect)
+
+    # Subtitle
+    subtitle = render_text(get_font(FONT_SIZE), "Survive the waves of enemies!", GRAY)
+    subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+    surface.blit(subtitle, subtitle_rect)
+
+    # Start button
+    draw_button(surface, "START GAME", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50, GREEN, BLACK)
+
+    # Controls
+    controls = [
+        "Mouse - Aim",
+        "Left Click - Shoot",
+        "ESC - Quit"
+    ]
+    for i, control in enumerate(controls):
+        text = render_text(get_font(FONT_SIZE), control, BLACK)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120 + i * 30))
+        surface.blit(text, text_rect)
+
+def draw_game_over_screen(surface, world):
+    # Game over screen
+    game_over_text = render_text(get_font(LARGE_FONT_SIZE), "GAME OVER", RED)
+    game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
+    surface.blit(game_over_text, game_over_rect)
+
+    final_score_text = render_text(get_font(FONT_SIZE), f"Final Score: {world.score}", BLACK)
+    score_rect = final_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+    surface.blit(final_score_text, score_rect)
+
+    wave_text = render_text(get_font(FONT_SIZE), f"Waves Survived: {world.wave_number - 1}", BLACK)
+    wave_rect = wave_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
+    surface.blit(wave_text, wave_rect)
+
+    # Restart button
+    draw_button(surface, "RESTART", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, 200, 50, GREEN, BLACK)
+
+    restart_text = render_text(get_font(FONT_SIZE), "Press R to restart", GRAY)
+    restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120))
+    surface.blit(restart_text, restart_rect)
+
+def make_background():
+    """Pre-render the grid once; frames restore from this instead of redrawing it."""
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface.fill(LIGHT_GRAY)
+
+    # Draw grid background
+    for x in range(0, SCREEN_WIDTH, 50):
+        pygame.draw.line(surface, WHITE, (x, 0), (x, SCREEN_HEIGHT), 1)
+    for y in range(0, SCREEN_HEIGHT, 50):
+        pygame.draw.line(surface, WHITE, (0, y), (SCREEN_WIDTH, y), 1)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    return surface
+
+# --- Main Game Loop ---
+MAX_TICKS_PER_FRAME = 5  # beyond this the simulation falls behind instead of spiralling
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enhanced Stick Man Shooter")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help=f"render frame cap, 0 for uncapped; the simulation always ticks at {TICK_RATE} Hz")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed every game with this value for a reproducible run")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only push changed screen regions to the display instead of flipping the whole frame")
+    parser.add_argument("--record", metavar="DIR",
+                        help="write a replay of every game played into DIR")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play back a recorded game (arrows: seek/speed, P: pause, R: restart)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="playback speed multiplier for --replay")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="join a game on a server.py server instead of playing locally")
+    parser.add_argument("--load", metavar="FILE",
+                        help="start every game from a save file (see savegame.py) instead of wave 1")
+    parser.add_argument("--start-wave", type=int, default=None, metavar="N",
+                        help="start every game at wave N")
+    parser.add_argument("--autosave", metavar="FILE",
+                        help="save the game in progress to FILE every few seconds and on exit")
+    parser.add_argument("--mute", action="store_true",
+                        help="play without sound; the mixer is never opened")
+    parser.add_argument("--profile", action="store_true",
+                        help="show the frame-time profiler overlay from the start (F3 toggles it)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="record per-phase frame timings and write them to FILE (.csv or .json) on exit")
+    parser.add_argument("--detail", choices=["auto"] + [str(level) for level in range(len(DETAILS))],
+                        default="auto",
+                        help="rendering level of detail, 0 (full) to 2 (cheapest); auto lowers it as the screen "
+                             "fills up or frames run over budget")
+    parser.add_argument("--stress", action="store_true",
+                        help="stress mode: keep adding enemies, bullets and particles until frames go over "
+                             "budget, with the profiler shown (see stress.py)")
+    return parser.parse_args(argv)
+
+def entity_counts(world, detail=0):
+    return {"enemies": len(world.enemies), "bullets": len(world.bullets), "particles": len(world.particles),
+            "detail": detail}
+
+def main():
+    args = parse_args()
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    # Only the display (which brings events, keyboard and mouse with it) is needed before the first
+    # frame. Fonts initialise when first drawn, and the audio engine synthesises its sounds off-thread and
+    # opens the mixer from a later audio.update().
+    pygame.display.init()
+
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Enhanced Stick Man Shooter")
+    clock = pygame.time.Clock()
+    background = make_background()
+    drawn_rects = []  # where the last dirty-rect frame drew, to be erased next frame
+    drawn_state = None
+
+    game_state = "START"
+    world = World(args.seed)
+    running = True
+    accumulator = 0.0  # real time not yet consumed by simulation ticks
+    shoot = False  # a click is held until the next tick consumes it
+    firing = False  # the button is held down after a click in play: auto-fire
+    recorder = None
+    replay = Replay(args.replay) if args.replay else None
+    client = None
+    if args.connect:
+        host, _, port = args.connect.rpartition(":")
+        client = UDPClient(host or "127.0.0.1", int(port))
+    snapshot_time = 0.0  # when the newest snapshot arrived, and how many ticks it covers, for interpolation
+    snapshot_ticks = 1
+    speed = args.replay_speed if replay else 1.0
+    paused = False
+    profiler = FrameProfiler(record=bool(args.profile_out)) if args.profile or args.profile_out or args.stress else None
+    show_profiler = args.profile or args.stress
+    world.profiler = profiler
+    audio = None if args.mute else AudioEngine()
+    world.audio = audio
+    lod = DetailController(1000 / args.fps if args.fps else BUDGET_MS,
+                           None if args.detail == "auto" else int(args.detail))
+    ramp = StressRamp(world, hold=True) if args.stress and not (replay or client) else None
+    autosaver = AutoSaver(args.autosave) if args.autosave and not (replay or client or ramp) else None
+
+    def start_game():
+        nonlocal recorder
+        if client:
+            return "PLAYING"  # the server runs the game and decides when it restarts
+        if replay:
+            world.reset(replay.seed)
+        elif args.load:
+            load(args.load, world)
+        else:
+            world.reset(args.seed)
+            if args.start_wave:
+                world.start_at_wave(args.start_wave)
+        # A replay always starts from a fresh wave 1, so games started elsewhere aren't recorded
+        if args.record and not (args.load or args.start_wave or ramp):
+            if recorder:
+                recorder.close()
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{world.seed}.replay"
+            recorder = Recorder(os.path.join(args.record, name), world.seed)
+        return "PLAYING"
+
+    if replay or client or ramp:
+        game_state = start_game()
+
+    while running:
+        interval = clock.tick(args.fps)
+        accumulator += interval / 1000 * (0.0 if paused else speed)
+        mouse_pos = pygame.mouse.get_pos()
+        if ramp and game_state == "PLAYING":
+            ramp.fill()  # before the frame starts, so only the game's own work is timed
+        frame_start = time.perf_counter()  # without the wait in tick(), which is headroom, not cost
+        if profiler:
+            profiler.begin_frame()
+        lap = profiler.lap if profiler else no_lap
+
+        # Event Handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                if event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
+                    if profiler is None:
+                        profiler = world.profiler = FrameProfiler()
+
+                if replay:
+                    # Playback controls
+                    if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        direction = 1 if event.key == pygame.K_RIGHT else -1
+                        seek(world, replay, world.tick + direction * 5 * TICK_RATE)
+                        game_state = "PLAYING"
+                    elif event.key == pygame.K_UP:
+                        speed *= 2
+                    elif event.key == pygame.K_DOWN:
+                        speed /= 2
+                    elif event.key == pygame.K_p:
+                        paused = not paused
+                    elif event.key == pygame.K_r:
+                        game_state = start_game()
+
+                elif game_state == "START":
+                    if event.key == pygame.K_SPACE:
+                        game_state = start_game()
+
+                elif game_state == "GAME_OVER":
+                    if event.key == pygame.K_r:
+                        game_state = start_game()
+
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not replay:  # Left click
+                if game_state == "START":
+                    start_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50)
+                    if start_button_rect.collidepoint(mouse_pos):
+                        game_state = start_game()
+                elif game_state == "PLAYING":
+                    # Shoot with left mouse click, and keep shooting while it's held
+                    shoot = True
+                    firing = True
+                elif game_state == "GAME_OVER":
+                    restart_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 50, 200, 50)
+                    if restart_button_rect.collidepoint(mouse_pos):
+                        game_state = start_game()
+
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                firing = False
+
+        lap("events")
+
+        # Game Logic (fixed timestep)
+        if game_state == "PLAYING" or client:
+            max_ticks = MAX_TICKS_PER_FRAME * max(1, math.ceil(speed))
+            ticks = 0
+            while accumulator >= TICK and ticks < max_ticks:
+                if client:
+                    # Networked: only inputs go out; the world comes back in snapshots below
+                    client.send_inputs(Inputs(mouse_pos, shoot or firing))
+                    shoot = False
+                    accumulator -= TICK
+                    ticks += 1
+                    continue
+                if replay:
+                    if world.tick >= len(replay):
+                        game_state = "GAME_OVER"
+                        break
+                    inputs = replay.inputs(world.tick)
+                else:
+                    inputs = Inputs(mouse_pos, shoot or firing)
+                    if recorder:
+                        recorder.record(inputs)
+                world.step(inputs)
+                shoot = False
+                accumulator -= TICK
+                ticks += 1
+                if world.game_over:
+                    game_state = "GAME_OVER"
+                    break
+            if ticks == max_ticks:
+                accumulator = min(accumulator, TICK)
+            if autosaver and game_state == "PLAYING":
+                autosaver.update(world)
+        else:
+            accumulator = 0.0
+            shoot = firing = False
+        alpha = min(accumulator / TICK, 1.0)
+        if client:
+            previous_tick = world.tick
+            snapshot = client.poll()
+            if snapshot is not None:
+                apply_snapshot(world, snapshot, client.player_index or 0)
+                snapshot_ticks = max(1, world.tick - previous_tick)
+                snapshot_time = time.perf_counter()
+            # Snapshots arrive every few ticks; ease from the previous one to the newest
+            alpha = min((time.perf_counter() - snapshot_time) / (snapshot_ticks * TICK), 1.0)
+            game_state = "GAME_OVER" if world.game_over else "PLAYING"
+        if audio:
+            audio.update()
+            lap("audio")
+        if replay and world.tick:
+            # Show the recorded cursor rather than the live one
+            mouse_pos = replay.inputs(world.tick - 1).mouse_pos
+
+        # Drawing
+        if args.dirty_rects and game_state == drawn_state:
+            if game_state == "PLAYING":
+                # Erase last frame's entities from the cached background, redraw, push only those regions
+                for rect in drawn_rects:
+                    screen.blit(background, rect, rect)
+                lap("background")
+                rects = draw_world(screen, world, mouse_pos, alpha, lap, lod.detail)
+                if show_profiler:
+                    rects.append(draw_overlay(screen, profiler, entity_counts(world, lod.level), y=OVERLAY_Y))
+                    lap("overlay")
+                pygame.display.update(drawn_rects + rects)
+                drawn_rects = rects
+            # Menu screens are static; nothing to update until the state changes
+        else:
+            screen.blit(background, (0, 0))
+            lap("background")
+
+            if game_state == "START":
+                draw_start_screen(screen)
+            elif game_state == "PLAYING":
+                drawn_rects = draw_world(screen, world, mouse_pos, alpha, lap, lod.detail)
+                if show_profiler:
+                    drawn_rects.append(draw_overlay(screen, profiler, entity_counts(world, lod.level), y=OVERLAY_Y))
+                    lap("overlay")
+            elif game_state == "GAME_OVER":
+                draw_game_over_screen(screen, world)
+
+            pygame.display.flip()
+            drawn_state = game_state
+        lap("flip")
+        if game_state == "PLAYING":
+            lod.update((time.perf_counter() - frame_start) * 1000, len(world.enemies), len(world.particles))
+
+        if profiler:
+            frame_ms, _, phases, _ = profiler.end_frame(interval, entity_counts(world, lod.level))
+            if ramp and game_state == "PLAYING":
+                ramp.record(frame_ms, phases)
+
+    if recorder:
+        recorder.close()
+    if autosaver:
+        if game_state == "PLAYING":
+            autosaver.save(world)
+        autosaver.close()
+    if client:
+        client.close()
+    if profiler and args.profile_out:
+        profiler.dump(args.profile_out)
+    if ramp:
+        print(ramp.report())
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,721 @@
+import math
+import random
+from collections import deque, namedtuple
+
+import numpy as np
+import pygame
+
+from enemies import EnemyManager
+from particles import ParticleSystem
+from profiler import no_lap
+from spatial import SpatialHash, segment_box_entry, segment_boxes_entry
+from wavescript import SIDES, default_script
+from weapons import BEAM_TICKS, BEAM_WIDTH, DEFAULT_WEAPON, RAPID_FACTOR, WEAPONS
+
+# --- Game Constants ---
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 700
+FPS = 60  # default render rate
+TICK_RATE = 60  # simulation ticks per second; every timer and speed is per tick
+TICK = 1 / TICK_RATE
+BATCH_COLLISIONS = 300  # enemies from which bullets are tested in one vectorised batch per tick
+
+# --- Colors ---
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 50, 50)
+GREEN = (50, 255, 50)
+BLUE = (50, 150, 255)
+DARK_RED = (180, 0, 0)
+DARK_BLUE = (0, 0, 150)
+GRAY = (128, 128, 128)
+LIGHT_GRAY = (200, 200, 200)
+YELLOW = (255, 255, 0)
+ORANGE = (255, 165, 0)
+PURPLE = (128, 0, 128)
+
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+# Everything the simulation reads from the outside world for one tick
+Inputs = namedtuple("Inputs", ["mouse_pos", "shoot"])
+
+def player_start(index):
+    """Starting position of player `index`: the first in the centre, the rest on a ring around it."""
+    if index == 0:
+        return SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+    angle = 2 * math.pi * (index - 1) / 7
+    return SCREEN_WIDTH // 2 + round(140 * math.cos(angle)), SCREEN_HEIGHT // 2 + round(140 * math.sin(angle))
+
+class Player:
+    __slots__ = ("x", "y", "width", "height", "gun_length", "gun_angle", "health", "max_health", "rect",
+                 "weapon", "weapon_timer", "rapid_timer", "last_shot", "invulnerable_timer")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.width = 25
+        self.height = 70
+        self.gun_length = 35
+        self.gun_angle = 0
+        self.health = 100
+        self.max_health = 100
+        self.rect = pygame.Rect(self.x - self.width // 2, self.y - self.height // 2, self.width, self.height)
+        self.weapon = DEFAULT_WEAPON  # a key of weapons.WEAPONS
+        self.weapon_timer = 0  # ticks until a picked-up weapon runs out
+        self.rapid_timer = 0  # ticks of rapid fire left
+        self.last_shot = -WEAPONS[DEFAULT_WEAPON].cooldown
+        self.invulnerable_timer = 0
+
+    def aim_at_mouse(self, mouse_pos):
+        """Aim the gun at the mouse cursor position."""
+        dx = mouse_pos[0] - self.x
+        dy = mouse_pos[1] - self.y
+        self.gun_angle = math.atan2(dy, dx)
+
+    def cooldown(self):
+        """Ticks between shots with the current weapon and power-ups."""
+        cooldown = WEAPONS[self.weapon].cooldown
+        if self.rapid_timer > 0:
+            cooldown = max(1, round(cooldown * RAPID_FACTOR))
+        return cooldown
+
+    def can_shoot(self, tick):
+        return tick - self.last_shot >= self.cooldown()
+
+    def power_up(self, kind, duration):
+        """Apply a pickup: rapid fire, or a weapon for `duration` ticks."""
+        if kind == "rapid":
+            self.rapid_timer = duration
+        else:
+            self.weapon = kind
+            self.weapon_timer = duration
+
+    def gun_end(self):
+        return (self.x + self.gun_length * math.cos(self.gun_angle),
+                self.y + self.gun_length * math.sin(self.gun_angle))
+
+    def take_damage(self, damage):
+        """Apply damage unless invulnerable. Returns True if the hit landed."""
+        if self.invulnerable_timer <= 0:
+            self.health -= damage
+            self.invulnerable_timer = 60  # 1 second of invulnerability
+            return True
+        return False
+
+    @property
+    def alive(self):
+        return self.health > 0
+
+    def update(self):
+        if self.invulnerable_timer > 0:
+            self.invulnerable_timer -= 1
+        if self.weapon_timer > 0:
+            self.weapon_timer -= 1
+            if self.weapon_timer == 0:
+                self.weapon = DEFAULT_WEAPON
+        if self.rapid_timer > 0:
+            self.rapid_timer -= 1
+        self.rect.center = (self.x, self.y)
+
+class Bullet:
+    __slots__ = ("id", "x", "y", "prev_x", "prev_y", "speed", "radius", "angle", "vx", "vy", "rect", "trail",
+                 "damage", "blast", "alive")
+
+    TRAIL_LENGTH = 5
+
+    def __init__(self, x, y, angle, speed=12, damage=1, blast=0):
+        self.id = 0  # set by the World; stable for the bullet's lifetime, used by netcode
+        self.radius = 6
+        self.rect = pygame.Rect(0, 0, self.radius * 2, self.radius * 2)
+        self.trail = deque(maxlen=self.TRAIL_LENGTH)  # ring buffer of recent positions
+        self.spawn(x, y, angle, speed, damage, blast)
+
+    def spawn(self, x, y, angle, speed=12, damage=1, blast=0):
+        """(Re)initialise this bullet at the gun muzzle; used by the pool."""
+        self.speed = speed
+        self.damage = damage
+        self.blast = blast  # explosion radius on impact; 0 for a plain bullet
+        self.x = x
+        self.y = y
+        self.prev_x, self.prev_y = x, y
+        self.angle = angle
+        self.vx = math.cos(angle) * self.speed
+        self.vy = math.sin(angle) * self.speed
+        self.rect.center = (x, y)
+        self.trail.clear()
+        self.trail.append((x, y))
+        self.alive = True
+
+    def move(self):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x += self.vx
+        self.y += self.vy
+        self.rect.center = (self.x, self.y)
+
+        # Add to trail
+        self.trail.append((self.x, self.y))
+
+class Pickup:
+    """A power-up lying on the field. It drifts toward the nearest living
+    player, who can't move to fetch it, and is collected on contact."""
+    __slots__ = ("id", "x", "y", "prev_x", "prev_y", "kind", "timer", "rect")
+
+    RADIUS = 12
+    SPEED = 3  # px per tick
+
+    def __init__(self, x, y, kind, lifetime):
+        self.id = 0
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.kind = kind  # one of weapons.POWERUPS
+        self.timer = lifetime  # ticks until it vanishes if nobody picks it up
+        self.rect = pygame.Rect(0, 0, self.RADIUS * 2, self.RADIUS * 2)
+        self.rect.center = (x, y)
+
+class Beam:
+    """A hitscan shot. It hits everything on its ray on the tick it fires,
+    then stays on screen for BEAM_TICKS ticks."""
+    __slots__ = ("id", "x", "y", "angle", "length", "damage", "timer")
+
+    def __init__(self, x, y, angle, length, damage):
+        self.id = 0
+        self.x = x
+        self.y = y
+        self.angle = angle
+        self.length = length
+        self.damage = damage
+        self.timer = BEAM_TICKS
+
+    def end(self):
+        return self.x + self.length * math.cos(self.angle), self.y + self.length * math.sin(self.angle)
+
+# --- Object Pools ---
+class Pool:
+    """Free list of reusable entities. acquire() re-spawns a released object when
+    one is available instead of allocating a new one."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.spawn(*args)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.factory(*args)
+
+    def sweep(self, items):
+        """Release every dead object in items, compacting the list in place."""
+        keep = 0
+        for obj in items:
+            if obj.alive:
+                items[keep] = obj
+                keep += 1
+            else:
+                self.free.append(obj)
+        del items[keep:]
+
+    def release_all(self, items):
+        self.free.extend(items)
+        items.clear()
+
+# --- World ---
+class World:
+    """Headless game state. Advance it with step(); it never touches the display.
+
+    All randomness comes from the world's own seeded generators, so the same
+    seed and the same per-tick Inputs always produce the same game.
+    """
+
+    def __init__(self, seed=None, players=1, waves=None):
+        self.player_count = players
+        self.waves = waves or default_script()  # archetypes and wave contents; see wavescript.py
+        self.wave_break_duration = 180  # 3 seconds at 60 ticks/s
+
+        # Balance knobs (swept by batch_sim.py)
+        self.wave_heal = 30  # health restored between waves
+        self.bullet_damage = 1
+        self.bullet_speed = 12  # px per tick; hits are swept, so any speed is safe
+        self.contact_damage = 20
+        self.enemy_shot_damage = 10
+        self.enemy_separation = 0.0  # 0 lets enemies stack; ~1 keeps them a body-width apart
+
+        self.enemy_grid = SpatialHash(64)
+        self.rng = random.Random()
+        self.particles = ParticleSystem(capacity=2048)
+        self.bullet_pool = Pool(Bullet)
+        self.bullets = []
+        self.enemy_shots = []  # ranged enemies' projectiles; they only hit players
+        self.beams = []
+        self.pickups = []
+        self.enemies = EnemyManager()
+        self.profiler = None  # set to a FrameProfiler to time each phase of step()
+        self.audio = None  # set to an audio.AudioEngine to hear shots, hits, deaths and new waves
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game. Without a seed a fresh one is drawn, so restarts differ."""
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng.seed(self.seed)
+        self.particles.reseed(self.seed)
+        self.players = [Player(*player_start(i)) for i in range(self.player_count)]
+        self.player = self.players[0]  # the local player in single-player code paths
+        self.next_bullet_id = 0  # shared by bullets, enemy shots, beams and pickups
+        self.bullet_pool.release_all(self.bullets)
+        self.bullet_pool.release_all(self.enemy_shots)
+        self.beams = []
+        self.pickups = []
+        self.enemies.clear()
+        self.enemy_grid.padding = self.waves.padding
+        self.particles.clear()
+        self.score = 0
+        self.wave_number = 1
+        self.enemy_count_to_spawn = self.wave_size(1)
+        self.wave_state = "SPAWNING"  # SPAWNING, BREAK
+        self.wave_break_timer = 0
+        self.enemy_spawn_timer = 0  # the wave clock the spawn schedule runs on
+        self.enemies_spawned_this_wave = 0
+        self.tick = 0
+        self.game_over = False
+
+    def start_at_wave(self, wave):
+        """Jump a fresh game to the start of `wave`, as if the earlier ones had been cleared."""
+        self.wave_number = wave
+        self.enemy_count_to_spawn = self.wave_size(wave)
+        self.enemies_spawned_this_wave = 0
+        self.enemy_spawn_timer = 0
+        self.wave_state = "SPAWNING"
+
+    def add_player(self):
+        """Join another player into the running game. Returns its index."""
+        index = self.player_count
+        self.player_count += 1
+        self.players.append(Player(*player_start(index)))
+        return index
+
+    def living_players(self):
+        return [player for player in self.players if player.alive]
+
+    def wave_size(self, wave):
+        return len(self.waves.schedule(wave))
+
+    def enemies_left(self):
+        if self.wave_state != "SPAWNING":
+            return 0
+        return len(self.enemies) + (self.enemy_count_to_spawn - self.enemies_spawned_this_wave)
+
+    def create_explosion(self, x, y, color, count=10):
+        self.particles.emit(x, y, color, count)
+
+    def sound(self, name, x=None):
+        if self.audio:
+            self.audio.post(name, x)
+
+    def spawn_enemy(self, kind=0, side=None):
+        """Spawn an enemy of archetype `kind` just off a screen edge, a random one unless `side` is given."""
+        rng = self.rng
+        archetype = self.waves.archetypes[kind]
+        side = side or rng.choice(SIDES)
+        margin = 80
+        if side == 'top':
+            x, y = rng.randint(margin, SCREEN_WIDTH - margin), -50
+        elif side == 'bottom':
+            x, y = rng.randint(margin, SCREEN_WIDTH - margin), SCREEN_HEIGHT + 50
+        elif side == 'left':
+            x, y = -50, rng.randint(margin, SCREEN_HEIGHT - margin)
+        else:
+            x, y = SCREEN_WIDTH + 50, rng.randint(margin, SCREEN_HEIGHT - margin)
+        self.enemies.spawn(x, y, rng.uniform(archetype.speed_min, archetype.speed_max), archetype.health, kind,
+                           archetype.width, archetype.height, archetype.range, archetype.fire_interval)
+
+    def next_id(self):
+        entity_id = self.next_bullet_id
+        self.next_bullet_id += 1
+        return entity_id
+
+    def shoot(self, player):
+        if not player.can_shoot(self.tick):
+            return
+        weapon = WEAPONS[player.weapon]
+        gun_end_x, gun_end_y = player.gun_end()
+        damage = weapon.damage * self.bullet_damage
+        player.last_shot = self.tick
+        if weapon.beam:
+            # Resolved against the enemies in handle_collisions, once they have moved
+            beam = Beam(gun_end_x, gun_end_y, player.gun_angle, weapon.beam, damage)
+            beam.id = self.next_id()
+            self.beams.append(beam)
+            self.sound("beam", gun_end_x)
+            return
+        for k in range(weapon.pellets):
+            angle = player.gun_angle
+            if weapon.pellets > 1:
+                angle += weapon.spread * (k / (weapon.pellets - 1) - 0.5)
+            bullet = self.bullet_pool.acquire(gun_end_x, gun_end_y, angle, self.bullet_speed * weapon.speed, damage,
+                                              weapon.blast)
+            bullet.id = self.next_id()
+            self.bullets.append(bullet)
+        self.sound("shot", gun_end_x)
+
+    def update_waves(self):
+        if self.wave_state == "SPAWNING":
+            # Each tick, spawn whatever the schedule has due. With hold_clock the wave clock
+            # stops while the enemies on the field plus those spawned this wave reach the wave size
+            held = self.waves.hold_clock and (len(self.enemies) + self.enemies_spawned_this_wave
+                                              >= self.enemy_count_to_spawn)
+            if self.enemies_spawned_this_wave < self.enemy_count_to_spawn and not held:
+                self.enemy_spawn_timer += 1
+                schedule = self.waves.schedule(self.wave_number)
+                while (self.enemies_spawned_this_wave < len(schedule)
+                       and schedule[self.enemies_spawned_this_wave][0] <= self.enemy_spawn_timer):
+                    _, kind, side = schedule[self.enemies_spawned_this_wave]
+                    self.spawn_enemy(kind, side)
+                    self.enemies_spawned_this_wave += 1
+
+            # Check if all enemies are spawned and defeated
+            if self.enemies_spawned_this_wave >= self.enemy_count_to_spawn and len(self.enemies) == 0:
+                self.wave_state = "BREAK"
+                self.wave_break_timer = self.wave_break_duration
+                # Heal the survivors between waves
+                for player in self.living_players():
+                    player.health = min(player.health + self.wave_heal, player.max_health)
+
+        elif self.wave_state == "BREAK":
+            self.wave_break_timer -= 1
+            if self.wave_break_timer <= 0:
+                # Start next wave
+                self.wave_number += 1
+                self.enemy_count_to_spawn = self.wave_size(self.wave_number)
+                self.enemies_spawned_this_wave = 0
+                self.enemy_spawn_timer = 0
+                self.wave_state = "SPAWNING"
+                self.sound("wave_start")
+
+    def update_bullets(self):
+        # Bullets that leave the screen are culled after collisions, so the
+        # stretch of path that crossed the edge can still hit
+        for bullet in self.bullets:
+            bullet.move()
+        for shot in self.enemy_shots:
+            shot.move()
+
+    def update_enemies(self):
+        # Steer toward where the nearest player is now, not where they were at spawn
+        enemies = self.enemies
+        living = self.living_players()
+        if len(living) == 1:
+            target_x, target_y = living[0].x, living[0].y
+        else:
+            target_x, target_y = enemies.nearest_targets([p.x for p in living], [p.y for p in living])
+        distance = enemies.move(target_x, target_y, self.enemy_separation)
+        if distance is not None and enemies.range[:len(enemies)].any():
+            self.fire_enemy_shots(target_x, target_y, distance)
+
+    def fire_enemy_shots(self, target_x, target_y, distance):
+        """Ranged enemies that are off cooldown and about at their range shoot at their target."""
+        enemies = self.enemies
+        n = len(enemies)
+        reach = enemies.range[:n]
+        ready = np.flatnonzero((reach > 0) & (enemies.cooldown[:n] == 0) & (distance <= reach * 1.25))
+        target_x = np.broadcast_to(target_x, n)
+        target_y = np.broadcast_to(target_y, n)
+        for i in ready.tolist():
+            archetype = self.waves.archetypes[enemies.kind[i]]
+            x = float(enemies.x[i])
+            y = float(enemies.y[i]) - enemies.height[i] / 4  # from the chest
+            angle = math.atan2(target_y[i] - y, target_x[i] - x)
+            shot = self.bullet_pool.acquire(x, y, angle, archetype.shot_speed)
+            shot.id = self.next_id()
+            self.enemy_shots.append(shot)
+            enemies.cooldown[i] = archetype.fire_interval
+            self.sound("enemy_shot", x)
+
+    def update_particles(self):
+        self.particles.update()
+
+    def handle_collisions(self):
+        enemies = self.enemies
+        if len(enemies):
+            self.collide_enemies()
+
+        if self.enemy_shots:
+            self.collide_enemy_shots()
+        if self.pickups:
+            self.collect_pickups()
+        if not self.living_players():
+            self.game_over = True
+
+        # Cull spent and offscreen bullets back into the pool in one pass
+        for bullet in self.bullets:
+            if not SCREEN_RECT.colliderect(bullet.rect):
+                bullet.alive = False
+        self.bullet_pool.sweep(self.bullets)
+        if self.beams:
+            for beam in self.beams:
+                beam.timer -= 1
+            self.beams = [beam for beam in self.beams if beam.timer > 0]
+
+    def collide_enemy_shots(self):
+        living = self.living_players()
+        for shot in self.enemy_shots:
+            for player in living:
+                if player.rect.colliderect(shot.rect):
+                    shot.alive = False
+                    if player.take_damage(self.enemy_shot_damage):
+                        self.create_explosion(player.x, player.y, RED, 5)
+                        self.sound("player_hurt", player.x)
+                    break
+            if not SCREEN_RECT.colliderect(shot.rect):
+                shot.alive = False
+        self.bullet_pool.sweep(self.enemy_shots)
+
+    def collect_pickups(self):
+        living = self.living_players()
+        for pickup in self.pickups:
+            pickup.timer -= 1
+            pickup.prev_x, pickup.prev_y = pickup.x, pickup.y
+            if living:
+                target = min(living, key=lambda player: (player.x - pickup.x) ** 2 + (player.y - pickup.y) ** 2)
+                dx, dy = target.x - pickup.x, target.y - pickup.y
+                distance = math.hypot(dx, dy)
+                step = min(Pickup.SPEED, distance)
+                if step:
+                    pickup.x += dx / distance * step
+                    pickup.y += dy / distance * step
+                    pickup.rect.center = (pickup.x, pickup.y)
+            for player in living:
+                if player.rect.colliderect(pickup.rect):
+                    player.power_up(pickup.kind, self.waves.pickups.duration)
+                    pickup.timer = 0
+                    self.sound("powerup", pickup.x)
+                    break
+        self.pickups = [pickup for pickup in self.pickups if pickup.timer > 0]
+
+    def drop_pickup(self, x, y):
+        """Maybe leave a power-up where an enemy died, as the wave script's pickup table says."""
+        table = self.waves.pickups
+        if table is None or self.rng.random() >= table.chance:
+            return
+        kind = self.rng.choices(table.kinds, table.weights)[0]
+        # Kept on screen, so it stays visible while it drifts in
+        x = min(max(x, Pickup.RADIUS), SCREEN_WIDTH - Pickup.RADIUS)
+        y = min(max(y, Pickup.RADIUS), SCREEN_HEIGHT - Pickup.RADIUS)
+        pickup = Pickup(x, y, kind, table.lifetime)
+        pickup.id = self.next_id()
+        self.pickups.append(pickup)
+
+    def collide_enemies(self):
+        enemies = self.enemies
+        n = len(enemies)
+        grid = self.enemy_grid
+        cx, cy = enemies.centers()
+        alive = enemies.alive
+
+        # Bullet-Enemy collision, swept: each bullet's path this tick is tested
+        # in the frame of each candidate enemy, so neither one's motion can
+        # carry the bullet past the enemy between ticks. Each enemy's reach
+        # (its half-extents plus its step this tick) widens the grid search only
+        # around its own cell; the +1 covers the rounding of the centres.
+        step_x, step_y = enemies.pos[:, :n] - enemies.prev[:, :n]
+        reach_x = (enemies.width[:n] / 2 + np.abs(step_x) + 1).tolist()
+        reach_y = (enemies.height[:n] / 2 + np.abs(step_y) + 1).tolist()
+        grid.rebuild_points(cx, cy, (reach_x, reach_y))
+        if n >= BATCH_COLLISIONS:
+            self.collide_bullets_batched(step_x, step_y)
+        else:
+            self.collide_bullets(step_x.tolist(), step_y.tolist())
+
+        # Beams fired this tick hit every enemy on their ray
+        for beam in self.beams:
+            if beam.timer == BEAM_TICKS:
+                end_x, end_y = beam.end()
+                slots = self.enemies_on_ray(beam.x, beam.y, end_x, end_y, BEAM_WIDTH)
+                if len(slots):
+                    self.damage_enemies(slots, beam.damage)
+
+        # Player-Enemy collision
+        for player in self.living_players():
+            for i in grid.query(player.rect):
+                if alive[i] and player.rect.colliderect(enemies.rect(i, cx[i], cy[i])):
+                    if player.take_damage(self.contact_damage):
+                        self.create_explosion(player.x, player.y, RED, 5)
+                        self.sound("player_hurt", player.x)
+
+        enemies.sweep()
+
+    def collide_bullets(self, step_x, step_y):
+        """One bullet at a time; earliest entry wins, ties to the lowest slot."""
+        enemies = self.enemies
+        grid = self.enemy_grid
+        alive = enemies.alive
+        prev_x, prev_y = enemies.prev[:, :len(enemies)].tolist()
+        half_widths = (enemies.width[:len(enemies)] / 2).tolist()
+        half_heights = (enemies.height[:len(enemies)] / 2).tolist()
+        for bullet in self.bullets:
+            x0, y0 = bullet.prev_x, bullet.prev_y
+            dx, dy = bullet.x - x0, bullet.y - y0
+            r = bullet.radius
+            hit, first = -1, 2.0
+            for i in grid.query_segment(x0, y0, bullet.x, bullet.y, r):
+                if alive[i]:
+                    half_width = half_widths[i] + r
+                    half_height = half_heights[i] + r
+                    t = segment_box_entry(x0 - prev_x[i], y0 - prev_y[i], dx - step_x[i], dy - step_y[i],
+                                          -half_width, -half_height, half_width, half_height)
+                    if t is not None and (t < first or t == first and i < hit):
+                        hit, first = i, t
+            if hit >= 0:
+                self.bullet_hit(bullet, hit, first)
+
+    def collide_bullets_batched(self, step_x, step_y):
+        """collide_bullets with every bullet-candidate pair in one vectorised
+        test, for large hordes where the per-pair Python cost dominates."""
+        enemies = self.enemies
+        alive = enemies.alive
+        bullets = self.bullets
+        segments = [(bullet.prev_x, bullet.prev_y, bullet.x, bullet.y, bullet.radius) for bullet in bullets]
+        owner, near = self.enemy_grid.query_segments(segments)
+        near_alive = alive[near]
+        owner, near = owner[near_alive], near[near_alive]
+        if not len(near):
+            return
+        x0, y0, x1, y1, r = np.array(segments).T
+        dx, dy = x1 - x0, y1 - y0
+        prev_x, prev_y = enemies.prev[:, :len(enemies)]
+        half_width = enemies.width[near] / 2 + r[owner]
+        half_height = enemies.height[near] / 2 + r[owner]
+        t = segment_boxes_entry(x0[owner] - prev_x[near], y0[owner] - prev_y[near],
+                                dx[owner] - step_x[near], dy[owner] - step_y[near],
+                                -half_width, -half_height, half_width, half_height)
+        # Resolve in bullet order, each bullet's hits sorted the way
+        # collide_bullets picks them. One whose first choice an earlier bullet
+        # killed this tick falls back to its next hit.
+        hits = np.flatnonzero(~np.isnan(t))
+        hits = hits[np.lexsort((near[hits], t[hits], owner[hits]))]
+        owners = owner[hits].tolist()
+        firsts = np.flatnonzero(np.r_[True, owner[hits][1:] != owner[hits][:-1]]).tolist()
+        slots, entries = near[hits].tolist(), t[hits].tolist()
+        for start, end in zip(firsts, firsts[1:] + [len(hits)]):
+            for j in range(start, end):
+                if alive[slots[j]]:
+                    self.bullet_hit(bullets[owners[start]], slots[j], entries[j])
+                    break
+
+    def bullet_hit(self, bullet, i, first):
+        """Bullet hit enemy slot `i` at fraction `first` along its path this tick."""
+        bullet.alive = False
+        if bullet.blast:
+            x0, y0 = bullet.prev_x, bullet.prev_y
+            self.explode(x0 + (bullet.x - x0) * first, y0 + (bullet.y - y0) * first, bullet.blast, bullet.damage)
+        else:
+            self.damage_enemy(i, bullet.damage)
+
+    # --- Hits ---
+    # Everything that damages enemies goes through these. The area queries
+    # run on the enemy grid, which collide_enemies rebuilds, so they are only
+    # valid while it runs, before the dead are swept out.
+    def damage_enemy(self, i, amount):
+        """Hit enemy slot `i` for `amount`. Returns True if it died."""
+        enemies = self.enemies
+        x, y = float(enemies.x[i]), float(enemies.y[i])
+        self.create_explosion(x, y, ORANGE, 3)
+        if not enemies.damage(i, amount):
+            self.sound("hit", x)
+            return False
+        enemies.kill(i)
+        self.score += self.waves.archetypes[enemies.kind[i]].score
+        self.create_explosion(x, y, RED, 8)
+        self.sound("enemy_death", x)
+        self.drop_pickup(x, y)
+        return True
+
+    def damage_enemies(self, slots, amount):
+        """damage_enemy for an array of distinct slots at once, for area damage."""
+        enemies = self.enemies
+        self.particles.emit_many(enemies.x[slots], enemies.y[slots], ORANGE, 3)
+        dead = slots[enemies.damage(slots, amount)]
+        if len(dead) < len(slots):
+            self.sound("hit", float(enemies.x[slots[0]]))
+        if not len(dead):
+            return
+        enemies.kill(dead)
+        archetypes = self.waves.archetypes
+        dead_x, dead_y = enemies.x[dead].tolist(), enemies.y[dead].tolist()
+        for kind, x, y in zip(enemies.kind[dead].tolist(), dead_x, dead_y):
+            self.score += archetypes[kind].score
+            self.drop_pickup(x, y)
+        self.particles.emit_many(dead_x, dead_y, RED, 8)
+        self.sound("enemy_death", dead_x[0])
+
+    def explode(self, x, y, radius, amount):
+        """Area damage: every live enemy within `radius` of (x, y) takes `amount`."""
+        self.create_explosion(x, y, ORANGE, 24)
+        self.sound("explosion", x)
+        slots = self.enemies_in_radius(x, y, radius)
+        if len(slots):
+            self.damage_enemies(slots, amount)
+
+    def live_candidates(self, found):
+        """The live enemies among a grid query's results, as a sorted slot array."""
+        slots = np.fromiter(found, dtype=np.int64, count=len(found))
+        slots.sort()  # slot order, so area damage is applied the same way every run
+        return slots[self.enemies.alive[slots]]
+
+    def enemies_in_radius(self, x, y, radius):
+        """Slots of the live enemies whose box comes within `radius` of (x, y)."""
+        enemies = self.enemies
+        slots = self.live_candidates(self.enemy_grid.query_radius(x, y, radius))
+        # Distance from the point to each box: how far it is outside the box on each axis
+        dx = np.maximum(np.abs(enemies.x[slots] - x) - enemies.width[slots] / 2, 0.0)
+        dy = np.maximum(np.abs(enemies.y[slots] - y) - enemies.height[slots] / 2, 0.0)
+        return slots[dx * dx + dy * dy <= radius * radius]
+
+    def enemies_on_ray(self, x0, y0, x1, y1, radius=0.0):
+        """Slots of the live enemies whose box, grown by `radius`, the segment
+        (x0, y0)-(x1, y1) passes through, nearest first."""
+        enemies = self.enemies
+        slots = self.live_candidates(self.enemy_grid.query_ray(x0, y0, x1, y1, radius))
+        half_width = enemies.width[slots] / 2 + radius
+        half_height = enemies.height[slots] / 2 + radius
+        x, y = enemies.x[slots], enemies.y[slots]
+        t = segment_boxes_entry(x0, y0, x1 - x0, y1 - y0, x - half_width, y - half_height, x + half_width,
+                                y + half_height)
+        hit = ~np.isnan(t)
+        return slots[hit][np.argsort(t[hit], kind="stable")]
+
+    def step(self, inputs):
+        """Advance the world by one fixed tick. `inputs` is the local player's
+        Inputs, or a sequence with one Inputs (or None for idle) per player."""
+        if self.game_over:
+            return
+        lap = self.profiler.lap if self.profiler else no_lap
+
+        if isinstance(inputs, Inputs):
+            inputs = (inputs,)
+        for i, player in enumerate(self.players):
+            if not player.alive:
+                continue
+            player.update()
+            player_inputs = inputs[i] if i < len(inputs) else None
+            if player_inputs is not None:
+                player.aim_at_mouse(player_inputs.mouse_pos)  # Manual aiming with mouse
+                if player_inputs.shoot:
+                    self.shoot(player)
+        lap("input")
+
+        self.update_waves()
+        lap("waves")
+        self.update_bullets()
+        lap("bullets")
+        self.update_enemies()
+        lap("enemies")
+        self.update_particles()
+        lap("particles")
+        self.handle_collisions()
+        lap("collision")
+        self.tick += 1
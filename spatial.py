@@ -0,0 +1,212 @@
+# --- Spatial Hash Grid ---
+# Uniform "loose" grid broadphase. Each item goes into the one cell holding its
+# centre, and queries widen their search by `padding` (the largest half-extent
+# of anything inserted), so a rebuild is a single dict append per entity and a
+# query only looks at the few cells around the query rect.
+#
+# The query_* methods are the broadphase shared by everything that hits
+# enemies: query_rect for boxes, query_radius for explosions, query_ray for
+# beams, query_segments for a tick's bullets at once. They return a superset
+# of the items that may be hit; the exact test is up to the caller.
+
+from collections import defaultdict
+
+import numpy as np
+
+class SpatialHash:
+    def __init__(self, cell_size=64, padding=32):
+        self.cell_size = cell_size
+        self.padding = padding
+        self.cells = defaultdict(list)
+        self.reach = {}  # cell -> largest (x, y) reach of the items in it, for the segment queries
+        self.max_reach = 0
+        self.points = None  # what the last rebuild inserted, for query_segments' cell order
+        self.order = None
+        self.slices = {}
+
+    def clear(self):
+        self.cells.clear()
+        self.reach = {}
+        self.max_reach = 0
+        self.points = None
+        self.order = None
+        self.slices = {}
+
+    def rebuild_points(self, xs, ys, reach=None):
+        """Clear the grid and insert index i at the integer point (xs[i], ys[i]).
+
+        `reach`, if given, is a pair of lists: how far each item may extend
+        from its point along x and along y (its half-extents plus any
+        movement). The segment queries then use each cell's own reach in place
+        of `padding`, so one large or fast item doesn't widen every query."""
+        cs = self.cell_size
+        cells = self.cells
+        self.clear()
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            cells[x // cs, y // cs].append(i)
+        if reach is not None:
+            reach_x, reach_y = reach
+            self.reach = {cell: (max(map(reach_x.__getitem__, bucket)), max(map(reach_y.__getitem__, bucket)))
+                          for cell, bucket in cells.items()}
+            self.max_reach = max(map(max, self.reach.values()), default=0)
+            self.points = xs, ys
+
+    def query(self, rect):
+        """Return the set of items that may overlap rect (a superset of actual overlaps)."""
+        return self.query_rect(rect.left, rect.top, rect.right, rect.bottom)
+
+    def segment_cells(self, x0, y0, x1, y1, margin=0):
+        """Occupied cells that items may reach from within `margin` of the
+        segment (x0, y0)-(x1, y1), going by each cell's reach."""
+        cs = self.cell_size
+        reaches = self.reach
+        widest = self.max_reach
+        left, top = min(x0, x1) - margin, min(y0, y1) - margin
+        right, bottom = max(x0, x1) + margin, max(y0, y1) + margin
+        for cx in range(int((left - widest) // cs), int((right + widest) // cs) + 1):
+            for cy in range(int((top - widest) // cs), int((bottom + widest) // cs) + 1):
+                reach = reaches.get((cx, cy))
+                if reach:
+                    reach_x, reach_y = reach
+                    # Only as wide as this cell's own reach needs
+                    if (cx * cs - reach_x <= right and (cx + 1) * cs + reach_x >= left
+                            and cy * cs - reach_y <= bottom and (cy + 1) * cs + reach_y >= top):
+                        yield cx, cy
+
+    def query_segment(self, x0, y0, x1, y1, margin=0):
+        """Items that may come within `margin` of the segment (x0, y0)-(x1, y1),
+        by the reach given to rebuild_points."""
+        cells = self.cells
+        found = []
+        for cell in self.segment_cells(x0, y0, x1, y1, margin):
+            found += cells[cell]
+        return found
+
+    def query_segments(self, segments):
+        """query_segment for many (x0, y0, x1, y1, margin) segments at once.
+        Returns two arrays, (segment, item) per pair, each segment's items in
+        cell order; an item appears at most once per segment."""
+        if self.order is None:
+            # Every index sorted by cell, so each cell's items are one slice of it
+            cs = self.cell_size
+            xs, ys = self.points
+            cell_x, cell_y = np.floor_divide(xs, cs), np.floor_divide(ys, cs)
+            self.order = np.lexsort((cell_y, cell_x))
+            cell_x, cell_y = cell_x[self.order], cell_y[self.order]
+            starts = np.flatnonzero(np.r_[True, (cell_x[1:] != cell_x[:-1]) | (cell_y[1:] != cell_y[:-1])])
+            self.slices = dict(zip(zip(cell_x[starts].tolist(), cell_y[starts].tolist()),
+                                   zip(starts.tolist(), np.r_[starts[1:], len(xs)].tolist())))
+        slices = self.slices
+        owners, starts, ends = [], [], []
+        for s, segment in enumerate(segments):
+            for cell in self.segment_cells(*segment):
+                start, end = slices[cell]
+                owners.append(s)
+                starts.append(start)
+                ends.append(end)
+        if not owners:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        # Expand the (start, end) slices into one index array without a Python loop
+        starts = np.array(starts)
+        lengths = np.array(ends) - starts
+        offsets = np.cumsum(lengths) - lengths
+        items = self.order[np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())]
+        return np.repeat(owners, lengths), items
+
+    def query_radius(self, x, y, radius):
+        """Items that may come within `radius` of (x, y)."""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
+
+    def query_ray(self, x0, y0, x1, y1, margin=0):
+        """Items that may come within `margin` of the segment (x0, y0)-(x1, y1).
+
+        Same result as query_rect over the segment's bounds, but only the
+        cells along the segment are visited: for each column of cells, just
+        the rows the segment passes through that column. A long diagonal
+        doesn't scan its bounding box.
+        """
+        cs = self.cell_size
+        pad = self.padding + margin
+        cells = self.cells
+        dx = x1 - x0
+        dy = y1 - y0
+        found = set()
+        for cx in range(int((min(x0, x1) - pad) // cs), int((max(x0, x1) + pad) // cs) + 1):
+            t0, t1 = 0.0, 1.0
+            if dx:
+                # Stretch of the segment within `pad` of this column
+                a = (cx * cs - pad - x0) / dx
+                b = ((cx + 1) * cs + pad - x0) / dx
+                t0, t1 = max(t0, min(a, b)), min(t1, max(a, b))
+                if t0 > t1:
+                    continue
+            ya, yb = y0 + dy * t0, y0 + dy * t1
+            for cy in range(int((min(ya, yb) - pad) // cs), int((max(ya, yb) + pad) // cs) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query_rect(self, left, top, right, bottom):
+        """Items that may overlap the box from (left, top) to (right, bottom)."""
+        cs = self.cell_size
+        pad = self.padding
+        cells = self.cells
+        found = set()
+        for cx in range(int((left - pad) // cs), int((right + pad) // cs) + 1):
+            for cy in range(int((top - pad) // cs), int((bottom + pad) // cs) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+# --- Swept Tests ---
+def segment_box_entry(x0, y0, dx, dy, left, top, right, bottom):
+    """Fraction t in [0, 1] at which the segment (x0, y0) + t * (dx, dy) first
+    touches the box, or None if it misses. Slab test, so a fast mover can't
+    step over a thin box between ticks."""
+    t_enter = 0.0
+    t_exit = 1.0
+    if dx:
+        a = (left - x0) / dx
+        b = (right - x0) / dx
+        if a > b:
+            a, b = b, a
+        t_enter = max(t_enter, a)
+        t_exit = min(t_exit, b)
+    elif not left <= x0 <= right:
+        return None
+    if dy:
+        a = (top - y0) / dy
+        b = (bottom - y0) / dy
+        if a > b:
+            a, b = b, a
+        t_enter = max(t_enter, a)
+        t_exit = min(t_exit, b)
+    elif not top <= y0 <= bottom:
+        return None
+    return t_enter if t_enter <= t_exit else None
+
+def segment_boxes_entry(x0, y0, dx, dy, left, top, right, bottom):
+    """segment_box_entry for arrays of boxes at once: the entry fraction for
+    each box, NaN where the segment misses it. The segment may be an array
+    too, one per box."""
+    t_enter = np.zeros(len(left))
+    t_exit = np.ones(len(left))
+    for start, delta, low, high in ((x0, dx, left, right), (y0, dy, top, bottom)):
+        if np.ndim(delta):
+            moving = delta != 0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                a = (low - start) / delta
+                b = (high - start) / delta
+            t_enter = np.where(moving, np.maximum(t_enter, np.minimum(a, b)), t_enter)
+            outside = (start < low) | (start > high)
+            t_exit = np.where(moving, np.minimum(t_exit, np.maximum(a, b)), np.where(outside, -1.0, t_exit))
+        elif delta:
+            a = (low - start) / delta
+            b = (high - start) / delta
+            t_enter = np.maximum(t_enter, np.minimum(a, b))
+            t_exit = np.minimum(t_exit, np.maximum(a, b))
+        else:
+            t_exit = np.where((start < low) | (start > high), -1.0, t_exit)
+    return np.where(t_enter <= t_exit, t_enter, np.nan)
@@ -0,0 +1,292 @@
+# --- Entity Sprites ---
+# Stickmen and bullets are baked once per visual state into a cached surface,
+# so drawing an entity is a single blit. The *_shape functions below are the
+# immediate-mode pygame.draw versions used to bake those surfaces. Under
+# load the level-of-detail settings (see lod.py) pick cheaper variants.
+
+import math
+
+import numpy as np
+import pygame
+
+from render_cache import LRUCache
+from simulation import BLACK, WHITE, RED, GREEN, BLUE, DARK_RED, DARK_BLUE, GRAY, YELLOW, Bullet, Pickup
+from weapons import BEAM_TICKS, BEAM_WIDTH, POWERUP_COLORS
+
+ANGLE_STEPS = 72  # gun and bullet headings are baked in 5 degree steps
+
+sprite_cache = LRUCache(maxsize=512)
+
+# --- Primitive Drawing ---
+def draw_player_shape(surface, x, y, width, height, gun_length, gun_angle):
+    gun_end_x = x + gun_length * math.cos(gun_angle)
+    gun_end_y = y + gun_length * math.sin(gun_angle)
+
+    # Shadow effect
+    shadow_offset = 2
+    pygame.draw.circle(surface, GRAY, (x + shadow_offset, y - height // 2 + shadow_offset), width // 2)
+
+    # Head
+    pygame.draw.circle(surface, BLACK, (x, y - height // 2), width // 2)
+    pygame.draw.circle(surface, WHITE, (x, y - height // 2), width // 2, 2)
+
+    # Body
+    pygame.draw.line(surface, BLACK, (x, y - height // 2 + width // 2),
+                    (x, y + height // 4), 4)
+
+    # Legs
+    pygame.draw.line(surface, BLACK, (x, y + height // 4),
+                    (x - width // 2, y + height // 2), 4)
+    pygame.draw.line(surface, BLACK, (x, y + height // 4),
+                    (x + width // 2, y + height // 2), 4)
+
+    # Gun
+    pygame.draw.line(surface, DARK_BLUE, (x, y), (gun_end_x, gun_end_y), 6)
+    pygame.draw.circle(surface, DARK_BLUE, (int(gun_end_x), int(gun_end_y)), 4)
+
+def draw_enemy_shape(surface, x, y, width, height, health, max_health, hit, color=RED, shadow=True):
+    # Change color when hit
+    color = YELLOW if hit else color
+    shadow_color = (200, 200, 0) if hit else GRAY
+
+    # Shadow effect
+    if shadow:
+        shadow_offset = 2
+        pygame.draw.circle(surface, shadow_color,
+                          (x + shadow_offset, y - height // 2 + shadow_offset),
+                          width // 2)
+
+    # Head
+    pygame.draw.circle(surface, color, (x, y - height // 2), width // 2)
+    pygame.draw.circle(surface, WHITE, (x, y - height // 2), width // 2, 2)
+
+    # Body
+    pygame.draw.line(surface, color,
+                    (x, y - height // 2 + width // 2),
+                    (x, y + height // 4), 4)
+
+    # Arms
+    arm_y = y - 5
+    pygame.draw.line(surface, color,
+                    (x, arm_y),
+                    (x - width // 2, arm_y - 5), 3)
+    pygame.draw.line(surface, color,
+                    (x, arm_y),
+                    (x + width // 2, arm_y - 5), 3)
+
+    # Legs
+    pygame.draw.line(surface, color,
+                    (x, y + height // 4),
+                    (x - width // 2, y + height // 2), 4)
+    pygame.draw.line(surface, color,
+                    (x, y + height // 4),
+                    (x + width // 2, y + height // 2), 4)
+
+    # Health bar
+    if health < max_health:
+        bar_width = max(20, width + 4)
+        bar_height = 4
+        bar_x = x - bar_width // 2
+        bar_y = y - height // 2 - 15
+
+        pygame.draw.rect(surface, DARK_RED, (bar_x, bar_y, bar_width, bar_height))
+        pygame.draw.rect(surface, GREEN, (bar_x, bar_y,
+                       bar_width * (health / max_health), bar_height))
+
+def draw_simple_enemy_shape(surface, x, y, width, height, color):
+    # Lowest detail: head, body and legs in one colour
+    pygame.draw.circle(surface, color, (x, y - height // 2), width // 2)
+    pygame.draw.line(surface, color, (x, y - height // 2), (x, y + height // 4), 3)
+    pygame.draw.line(surface, color, (x, y + height // 4), (x - width // 2, y + height // 2), 3)
+    pygame.draw.line(surface, color, (x, y + height // 4), (x + width // 2, y + height // 2), 3)
+
+def draw_bullet_shape(surface, x, y, radius, trail):
+    # Draw trail
+    for i, pos in enumerate(trail):
+        alpha = int(255 * (i + 1) / len(trail))
+        size = int(radius * (i + 1) / len(trail))
+        pygame.draw.circle(surface, (*BLUE, alpha // 2), pos, size)
+
+    # Draw bullet
+    pygame.draw.circle(surface, BLUE, (int(x), int(y)), radius)
+    pygame.draw.circle(surface, WHITE, (int(x), int(y)), radius // 2)
+
+def draw_enemy_shot_shape(surface, x, y, radius):
+    pygame.draw.circle(surface, DARK_RED, (x, y), radius)
+    pygame.draw.circle(surface, YELLOW, (x, y), radius // 2)
+
+def draw_pickup_shape(surface, x, y, radius, color):
+    pygame.draw.circle(surface, color, (x, y), radius)
+    pygame.draw.circle(surface, WHITE, (x, y), radius // 2)
+    pygame.draw.circle(surface, BLACK, (x, y), radius, 2)
+
+# --- Baking ---
+def quantize_angle(angle):
+    return round(angle * ANGLE_STEPS / (2 * math.pi)) % ANGLE_STEPS
+
+def bake(half_width, half_height, draw, colorkey=None):
+    """Run draw(surface, cx, cy) on a transparent surface centred on (cx, cy).
+    With a colorkey the surface has no per-pixel alpha, which blits faster
+    but can't blend.
+
+    Returns (surface, offset) where offset is added to an entity's position
+    to get the blit destination.
+    """
+    if colorkey is None:
+        surface = pygame.Surface((half_width * 2, half_height * 2), pygame.SRCALPHA)
+    else:
+        surface = pygame.Surface((half_width * 2, half_height * 2))
+        surface.fill(colorkey)
+        surface.set_colorkey(colorkey)
+    draw(surface, half_width, half_height)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha() if colorkey is None else surface.convert()
+    return surface, (-half_width, -half_height)
+
+def player_sprite(player):
+    step = quantize_angle(player.gun_angle)
+    key = ("player", step, player.width, player.height, player.gun_length)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        angle = step * 2 * math.pi / ANGLE_STEPS
+        reach = max(player.gun_length + 6, player.height // 2 + player.width // 2 + 4)
+        sprite = sprite_cache.put(key, bake(reach, reach, lambda s, x, y: draw_player_shape(
+            s, x, y, player.width, player.height, player.gun_length, angle)))
+    return sprite
+
+def enemy_sprite(width, height, health, max_health, hit, color=RED, shadow=True):
+    key = ("enemy", color, hit, health, max_health, width, height, shadow)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        half_width = max(width // 2 + 2, 10) + 4
+        half_height = height // 2 + 17
+        sprite = sprite_cache.put(key, bake(half_width, half_height, lambda s, x, y: draw_enemy_shape(
+            s, x, y, width, height, health, max_health, hit, color, shadow)))
+    return sprite
+
+def simple_enemy_sprite(width, height, color):
+    key = ("simple_enemy", color, width, height)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        colorkey = WHITE if color == BLACK else BLACK
+        sprite = sprite_cache.put(key, bake(width // 2 + 2, height // 2 + width // 2 + 2, lambda s, x, y:
+                                            draw_simple_enemy_shape(s, x, y, width, height, color), colorkey))
+    return sprite
+
+def enemy_shot_sprite(radius):
+    key = ("enemy_shot", radius)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        sprite = sprite_cache.put(key, bake(radius + 1, radius + 1, lambda s, x, y: draw_enemy_shot_shape(
+            s, x, y, radius)))
+    return sprite
+
+def pickup_sprite(kind):
+    key = ("pickup", kind)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        sprite = sprite_cache.put(key, bake(Pickup.RADIUS + 1, Pickup.RADIUS + 1, lambda s, x, y: draw_pickup_shape(
+            s, x, y, Pickup.RADIUS, POWERUP_COLORS[kind])))
+    return sprite
+
+def bullet_sprite(bullet, trail=None):
+    step = quantize_angle(bullet.angle)
+    trail_length = min(len(bullet.trail), trail or Bullet.TRAIL_LENGTH)
+    key = ("bullet", step, trail_length, bullet.speed, bullet.radius)
+    sprite = sprite_cache.get(key)
+    if sprite is None:
+        angle = step * 2 * math.pi / ANGLE_STEPS
+        dx = math.cos(angle) * bullet.speed
+        dy = math.sin(angle) * bullet.speed
+        reach = int(bullet.speed * (trail_length - 1)) + bullet.radius + 1
+
+        def draw(s, x, y):
+            trail = [(x - dx * (trail_length - 1 - i), y - dy * (trail_length - 1 - i))
+                     for i in range(trail_length)]
+            draw_bullet_shape(s, x, y, bullet.radius, trail)
+
+        sprite = sprite_cache.put(key, bake(reach, reach, draw))
+    return sprite
+
+# --- Cached Drawing ---
+def lerp_position(entity, alpha):
+    """Position between the last two simulation ticks; alpha=1 is the latest tick."""
+    return (entity.prev_x + (entity.x - entity.prev_x) * alpha,
+            entity.prev_y + (entity.y - entity.prev_y) * alpha)
+
+def draw_player(surface, player):
+    # Add flashing effect when invulnerable
+    if player.invulnerable_timer > 0 and player.invulnerable_timer % 10 < 5:
+        return None
+    sprite, (ox, oy) = player_sprite(player)
+    return surface.blit(sprite, (player.x + ox, player.y + oy))
+
+def draw_enemies(surface, enemies, alpha=1.0, colors=None, shadows=True, health_bars=True, simple=False):
+    """Blit every on-screen enemy of an EnemyManager in one batch. `colors` is
+    indexed by archetype; without it every enemy is red. The other flags are
+    the level of detail: shadows and health bars can be left off, and simple
+    draws every enemy of an archetype with one flat sprite. Returns the
+    touched rects."""
+    n = len(enemies)
+    if not n:
+        return []
+    x = enemies.prev_x[:n] + (enemies.x[:n] - enemies.prev_x[:n]) * alpha
+    y = enemies.prev_y[:n] + (enemies.y[:n] - enemies.prev_y[:n]) * alpha
+
+    # Cull against the surface, with the sprite's margin for head, arms and health bar
+    width = enemies.width[:n]
+    height = enemies.height[:n]
+    reach_x = np.maximum(width // 2 + 2, 10) + 4
+    reach_y = height // 2 + 17
+    surface_width, surface_height = surface.get_size()
+    visible = np.flatnonzero((x > -reach_x) & (x < surface_width + reach_x)
+                             & (y > -reach_y) & (y < surface_height + reach_y))
+    if not len(visible):
+        return []
+
+    blits = []
+    columns = (x[visible].tolist(), y[visible].tolist(), enemies.kind[visible].tolist(), width[visible].tolist(),
+               height[visible].tolist())
+    if simple:
+        for x, y, kind, width, height in zip(*columns):
+            sprite, (ox, oy) = simple_enemy_sprite(width, height, colors[kind] if colors else RED)
+            blits.append((sprite, (x + ox, y + oy)))
+        return surface.blits(blits, doreturn=True)
+
+    max_health = enemies.max_health[visible].tolist()
+    # Without health bars every enemy is baked at full health, so they share sprites
+    health = enemies.health[visible].tolist() if health_bars else max_health
+    for x, y, kind, width, height, health, max_health, hit in zip(
+            *columns, health, max_health, (enemies.hit_timer[visible] > 0).tolist()):
+        sprite, (ox, oy) = enemy_sprite(width, height, health, max_health, hit, colors[kind] if colors else RED,
+                                        shadows)
+        blits.append((sprite, (x + ox, y + oy)))
+    return surface.blits(blits, doreturn=True)
+
+def draw_enemy_shot(surface, shot, alpha=1.0):
+    sprite, (ox, oy) = enemy_shot_sprite(shot.radius)
+    x, y = lerp_position(shot, alpha)
+    return surface.blit(sprite, (x + ox, y + oy))
+
+def draw_bullet(surface, bullet, alpha=1.0, trail=None):
+    """Blit a bullet with at most `trail` trail dots (its whole trail by default)."""
+    sprite, (ox, oy) = bullet_sprite(bullet, trail)
+    x, y = lerp_position(bullet, alpha)
+    return surface.blit(sprite, (x + ox, y + oy))
+
+def draw_pickup(surface, pickup, alpha=1.0):
+    # Blink for the last two seconds before it vanishes
+    if pickup.timer < 120 and pickup.timer % 20 < 10:
+        return None
+    sprite, (ox, oy) = pickup_sprite(pickup.kind)
+    x, y = lerp_position(pickup, alpha)
+    return surface.blit(sprite, (x + ox, y + oy))
+
+def draw_beam(surface, beam):
+    """A line that narrows as the beam fades."""
+    width = max(1, BEAM_WIDTH * beam.timer // BEAM_TICKS)
+    start = (beam.x, beam.y)
+    end = beam.end()
+    rect = pygame.draw.line(surface, POWERUP_COLORS["beam"], start, end, width)
+    pygame.draw.line(surface, WHITE, start, end, max(1, width // 3))
+    return rect
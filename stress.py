@@ -0,0 +1,134 @@
+"""Stress mode: grow the enemy, bullet and particle counts level by level and
+find the count at which each subsystem goes over the 16.6 ms frame budget.
+
+A StressRamp holds the world at a fixed population: before every frame it
+tops the world back up with enemies scattered over the screen, bullets flying
+in random directions and bursts of sparks. The wave script is swapped for one
+that spawns nothing and the players can't be hurt, so there is no enemy cap
+or spawn delay and only the ramp decides what is on the field. After `frames`
+frames at a level the mean time of each subsystem is recorded and the level
+grows by `growth`:
+
+    movement   the bullets and enemies phases of World.step
+    collision  the collision phase
+    particles  particle update and particle drawing
+    draw       entity sprites and the HUD
+
+The first level at which a subsystem's mean goes over the budget is its
+breakpoint; "frame" is the same for the whole frame.
+
+    python shooter.py --stress              # live, with the profiler overlay
+    python benchmarks/bench_scaling.py      # headless, with JSON output to diff
+"""
+import math
+import random
+
+from profiler import BUDGET_MS
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, ORANGE, RED
+from wavescript import WaveScript
+
+SUBSYSTEMS = {
+    "movement": ("bullets", "enemies"),
+    "collision": ("collision",),
+    "particles": ("particles", "draw_particles"),
+    "draw": ("draw_entities", "draw_hud"),
+}
+BULLETS_PER_ENEMY = 0.25
+PARTICLES_PER_ENEMY = 4
+BURST = 16  # sparks per top-up explosion
+
+class StressRamp:
+    def __init__(self, world, start=25, growth=1.5, frames=30, budget=BUDGET_MS, hold=False, seed=0):
+        self.world = world
+        self.rng = random.Random(seed)
+        self.enemy_target = start
+        self.growth = growth
+        self.frames = frames
+        self.budget = budget
+        self.hold = hold  # stop growing once the whole frame is over budget
+        self.samples = []  # (frame ms, {subsystem: ms}) for each frame of the current level
+        self.levels = []  # one record per finished level
+        self.breakpoints = dict.fromkeys(("frame",) + tuple(SUBSYSTEMS))  # name -> counts, None until broken
+
+        # Same archetypes, no waves, no damage
+        world.waves = WaveScript({"archetypes": world.waves.spec["archetypes"]}, world.waves.path)
+        world.contact_damage = 0
+        world.enemy_shot_damage = 0
+
+    def targets(self):
+        """Enemy, bullet and particle counts of the current level."""
+        enemies = self.enemy_target
+        return enemies, int(enemies * BULLETS_PER_ENEMY), enemies * PARTICLES_PER_ENEMY
+
+    def finished(self):
+        return all(counts is not None for counts in self.breakpoints.values())
+
+    def fill(self):
+        """Top the world back up to the current level."""
+        world = self.world
+        rng = self.rng
+        enemy_count, bullet_count, particle_count = self.targets()
+
+        archetypes = world.waves.archetypes
+        for _ in range(enemy_count - len(world.enemies)):
+            archetype = rng.choice(archetypes)
+            world.enemies.spawn(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                                rng.uniform(archetype.speed_min, archetype.speed_max), archetype.health,
+                                archetype.index, archetype.width, archetype.height, archetype.range,
+                                archetype.fire_interval)
+
+        for _ in range(bullet_count - len(world.bullets)):
+            bullet = world.bullet_pool.acquire(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                                               rng.uniform(-math.pi, math.pi), world.bullet_speed)
+            bullet.id = world.next_bullet_id
+            world.next_bullet_id += 1
+            world.bullets.append(bullet)
+
+        # Twice the slots, so new bursts rarely land on live sparks
+        world.particles.reserve(2 * particle_count)
+        missing = particle_count - len(world.particles)
+        while missing > 0:
+            world.create_explosion(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                                   rng.choice((ORANGE, RED)), min(BURST, missing))
+            missing -= BURST
+
+    def record(self, frame_ms, phases):
+        """Add one frame's profiler phases (ms by name), finishing the level after `frames` of them."""
+        self.samples.append((frame_ms, {name: sum(phases.get(phase, 0.0) for phase in parts)
+                                        for name, parts in SUBSYSTEMS.items()}))
+        if len(self.samples) < self.frames:
+            return
+
+        enemies, bullets, particles = self.targets()
+        counts = {"enemies": enemies, "bullets": bullets, "particles": particles}
+        times = {"frame": sum(frame for frame, _ in self.samples) / len(self.samples)}
+        for name in SUBSYSTEMS:
+            times[name] = sum(subsystems[name] for _, subsystems in self.samples) / len(self.samples)
+        self.levels.append(dict(counts, ms=times))
+        self.samples = []
+
+        for name, ms in times.items():
+            if ms > self.budget and self.breakpoints[name] is None:
+                self.breakpoints[name] = counts
+        if not (self.hold and self.breakpoints["frame"]):
+            self.enemy_target = max(self.enemy_target + 1, round(self.enemy_target * self.growth))
+
+    def summary(self):
+        return {
+            "budget_ms": self.budget,
+            "growth": self.growth,
+            "frames_per_level": self.frames,
+            "levels": self.levels,
+            "breakpoints": self.breakpoints,
+        }
+
+    def report(self):
+        """One line per breakpoint, for printing."""
+        lines = []
+        for name, counts in self.breakpoints.items():
+            if counts is not None:
+                lines.append(f"{name:>10}: over budget at {counts['enemies']} enemies, {counts['bullets']} bullets, "
+                             f"{counts['particles']} particles")
+            elif self.levels:
+                lines.append(f"{name:>10}: within budget up to {self.levels[-1]['enemies']} enemies")
+        return "\n".join(lines)
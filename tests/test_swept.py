@@ -0,0 +1,163 @@
+"""Tunnelling edge cases for the swept bullet test."""
+import math
+import random
+
+import numpy as np
+import pytest
+
+import simulation
+from simulation import World
+from spatial import SpatialHash, segment_box_entry, segment_boxes_entry
+
+BOX = (100, 0, 102, 10)  # a 2 px wide box
+
+# --- segment_box_entry ---
+def test_fast_segment_through_thin_box():
+    assert segment_box_entry(0, 5, 200, 0, *BOX) == pytest.approx(0.5)
+
+def test_grazing_corner_hits():
+    # (0, 0) -> (20, 20) touches the box only at its corner (10, 10)
+    assert segment_box_entry(0, 0, 20, 20, 10, -10, 20, 10) == pytest.approx(0.5)
+
+def test_start_inside_box():
+    assert segment_box_entry(101, 5, 50, 0, *BOX) == 0.0
+
+def test_zero_length_segment():
+    assert segment_box_entry(101, 5, 0, 0, *BOX) == 0.0
+    assert segment_box_entry(99, 5, 0, 0, *BOX) is None
+
+def test_axis_parallel_segments():
+    assert segment_box_entry(101, -50, 0, 100, *BOX) == pytest.approx(0.5)
+    assert segment_box_entry(103, -50, 0, 100, *BOX) is None
+    assert segment_box_entry(0, 11, 200, 0, *BOX) is None
+
+def test_segment_ending_short_of_box():
+    assert segment_box_entry(0, 5, 99, 0, *BOX) is None
+
+def test_boxes_entry_matches_single_box():
+    rng = random.Random(1)
+    boxes = []
+    for _ in range(200):
+        x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        boxes.append((x, y, x + rng.uniform(0, 30), y + rng.uniform(0, 30)))
+    left, top, right, bottom = (np.array(side) for side in zip(*boxes))
+    for _ in range(50):
+        x0, y0 = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        dx, dy = rng.choice([(rng.uniform(-150, 150), rng.uniform(-150, 150)), (rng.uniform(-150, 150), 0), (0, 0)])
+        entries = segment_boxes_entry(x0, y0, dx, dy, left, top, right, bottom)
+        for box, t in zip(boxes, entries):
+            expected = segment_box_entry(x0, y0, dx, dy, *box)
+            if expected is None:
+                assert math.isnan(t)
+            else:
+                assert t == pytest.approx(expected)
+
+def test_boxes_entry_with_a_segment_per_box():
+    rng = random.Random(2)
+    segments = [(rng.uniform(-100, 100), rng.uniform(-100, 100), *rng.choice([(rng.uniform(-150, 150), 0),
+                                                                               (0, rng.uniform(-150, 150)), (0, 0),
+                                                                               (rng.uniform(-150, 150),) * 2]))
+                for _ in range(200)]
+    x0, y0, dx, dy = (np.array(column) for column in zip(*segments))
+    entries = segment_boxes_entry(x0, y0, dx, dy, *(np.full(200, side) for side in (-20, -10, 20, 10)))
+    for segment, t in zip(segments, entries):
+        expected = segment_box_entry(*segment, -20, -10, 20, 10)
+        assert math.isnan(t) if expected is None else t == expected
+
+# --- SpatialHash reach ---
+def test_reach_widens_only_its_own_cell():
+    grid = SpatialHash(64)
+    grid.rebuild_points([32, 32 + 64 * 4], [32, 32], ([150, 8], [8, 8]))
+    # 148 px right of the far-reaching item, 108 px left of the other
+    owner, items = grid.query_segments([(180, 32, 180, 40, 0)])
+    assert items.tolist() == [0]
+    grid.rebuild_points([32, 32 + 64 * 4], [32, 32], ([8, 8], [8, 8]))
+    owner, items = grid.query_segments([(180, 32, 180, 40, 0)])
+    assert items.tolist() == []
+
+def test_query_segments_pairs():
+    grid = SpatialHash(64)
+    xs, ys = [10, 20, 100, 300], [10, 20, 10, 300]
+    grid.rebuild_points(xs, ys, ([5] * 4, [5] * 4))
+    # Each segment only gets its own cell: the neighbour is 34 px away, beyond its reach
+    owner, items = grid.query_segments([(0, 0, 30, 30, 0), (90, 0, 90, 0, 0), (500, 500, 510, 510, 0)])
+    assert list(zip(owner.tolist(), items.tolist())) == [(0, 0), (0, 1), (1, 2)]
+
+# --- World.collide_enemies ---
+@pytest.fixture
+def world():
+    world = World(seed=1)
+    world.contact_damage = 0
+    return world
+
+def add_enemy(world, x, y, prev=None):
+    i = world.enemies.spawn(x, y, 0.0, health=1, width=10, height=10)
+    if prev:
+        world.enemies.prev[:, i] = prev
+    return i
+
+def fire(world, x0, y0, x1, y1):
+    bullet = world.bullet_pool.acquire(x1, y1, math.atan2(y1 - y0, x1 - x0), math.hypot(x1 - x0, y1 - y0))
+    bullet.prev_x, bullet.prev_y = x0, y0
+    world.bullets.append(bullet)
+    return bullet
+
+def test_fast_bullet_does_not_tunnel(world):
+    add_enemy(world, 300, 100)
+    bullet = fire(world, 100, 100, 500, 100)
+    world.collide_enemies()
+    assert not bullet.alive
+    assert len(world.enemies) == 0
+
+def test_near_miss_outside_box_and_radius(world):
+    # Half height 5 plus bullet radius 6: a path 11.5 px off centre passes by
+    add_enemy(world, 300, 100)
+    bullet = fire(world, 200, 111.5, 400, 111.5)
+    world.collide_enemies()
+    assert bullet.alive
+    assert len(world.enemies) == 1
+
+def test_grazing_hit_inside_radius(world):
+    add_enemy(world, 300, 100)
+    bullet = fire(world, 200, 110.5, 400, 110.5)
+    world.collide_enemies()
+    assert not bullet.alive
+
+def test_enemy_walking_across_path(world):
+    # Neither the start nor the end of the tick overlaps; the two meet halfway
+    add_enemy(world, 300, 160, prev=(300, 40))
+    bullet = fire(world, 250, 100, 350, 100)
+    world.collide_enemies()
+    assert not bullet.alive
+    assert len(world.enemies) == 0
+
+def test_earliest_of_two_enemies_is_hit(world):
+    add_enemy(world, 400, 100)
+    add_enemy(world, 250, 100)
+    fire(world, 100, 100, 500, 100)
+    world.collide_enemies()
+    assert len(world.enemies) == 1
+    assert world.enemies.x[0] == 400
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batched_matches_one_at_a_time(monkeypatch, seed):
+    results = []
+    for batch in (10 ** 9, 0):
+        monkeypatch.setattr(simulation, "BATCH_COLLISIONS", batch)
+        rng = random.Random(seed)
+        world = World(seed=1)
+        world.contact_damage = 0
+        for _ in range(150):
+            x, y = rng.randrange(0, 400), rng.randrange(0, 300)
+            i = world.enemies.spawn(x, y, 0.0, health=rng.randint(1, 2), width=10, height=rng.choice([10, 30]))
+            world.enemies.prev[:, i] = x + rng.uniform(-15, 15), y + rng.uniform(-15, 15)
+            if rng.random() < 0.2:
+                world.enemies.spawn(x, y, 0.0, health=1, width=10, height=10)  # stacked, for ties
+        bullets = []
+        for _ in range(60):
+            x, y = rng.uniform(0, 400), rng.uniform(0, 300)
+            bullets.append(fire(world, x, y, x + rng.uniform(-60, 60), y + rng.uniform(-60, 60)))
+        world.collide_enemies()
+        results.append(([bullet.alive for bullet in bullets], world.enemies.ids[:len(world.enemies)].tolist(),
+                        world.enemies.health[:len(world.enemies)].tolist()))
+    assert results[0] == results[1]
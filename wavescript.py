@@ -0,0 +1,202 @@
+"""Enemy archetypes and wave scripts.
+
+A wave script is a JSON file (see waves/) that defines the enemy archetypes
+and what each wave sends at the players. Loading compiles it: every wave
+becomes a schedule of (wave-clock tick, archetype, side) spawns sorted by
+tick, so the World's per-tick spawn check is a cursor comparison however
+large the wave is.
+
+    {
+      "archetypes": {
+        "grunt": {"health": 2, "speed": [2.5, 4.5], "width": 18, "height": 55, "score": 10,
+                  "color": [255, 50, 50]},
+        "ranged": {..., "range": 260, "fire_interval": 90, "shot_speed": 5}
+      },
+      "waves": [
+        {"groups": [{"archetype": "grunt", "count": 5}]},
+        {"groups": [{"archetype": "grunt", "count": 6},
+                    {"archetype": "swarm", "count": 8, "start": 120, "interval": 6, "side": "left"}]}
+      ],
+      "endless": {"base": 2, "growth": 3, "max": 25, "interval": 30, "mix": {"grunt": 4, "fast": 1}},
+      "pickups": {"chance": 0.05, "lifetime": 480, "duration": 600, "kinds": {"spread": 3, "rapid": 2}},
+      "hold_clock": false
+    }
+
+A group is `count` spawns of one archetype: the first `start + interval`
+ticks into the wave, then one every `interval` (default 30), from `side`
+(top, bottom, left or right; random if left out). An archetype with a
+`range` is ranged: it stops that far from its target and fires a shot every
+`fire_interval` ticks. Waves past the scripted ones come from "endless":
+min(base + growth * wave, max) enemies, split between the archetypes of
+`mix` in proportion to their weights and interleaved evenly. Those are
+compiled the first time each wave is reached.
+
+The wave clock starts at 0 when a wave begins. Without "hold_clock" it
+counts every tick, so each spawn happens on the tick it is scheduled for.
+With "hold_clock": true it only counts ticks on which the enemies on the
+field plus the ones spawned so far this wave number fewer than the wave's
+size, the way the original game paced its waves. Enemies that have spawned
+and are still alive are counted twice, so the clock stops with the field
+about half full and a group spawns later than `start + interval` whenever
+the players fall behind; a fast burst is spread out to the rate the players
+kill at. Both shipped scripts set it: classic.json to reproduce the original
+game, default.json because its waves are balanced for that pacing.
+
+With "pickups", each enemy killed drops a power-up with probability `chance`,
+one of `kinds` (see weapons.py) picked by weight. It drifts toward the
+nearest player, vanishes after `lifetime` ticks if it hasn't reached one,
+and lasts `duration` ticks once picked up. A script without it drops
+nothing, and never draws from the World's generator for drops.
+
+    python wavescript.py [FILE] [--waves N]   # print the compiled schedules
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from weapons import POWERUPS
+
+SIDES = ["top", "bottom", "left", "right"]
+DEFAULT_INTERVAL = 30
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "waves", "default.json")
+
+class Archetype:
+    FIELDS = ("health", "speed", "width", "height", "score", "color", "range", "fire_interval", "shot_speed")
+
+    def __init__(self, index, name, spec):
+        unknown = set(spec) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"archetype {name!r}: unknown fields {', '.join(sorted(unknown))}")
+        self.index = index
+        self.name = name
+        self.health = int(spec.get("health", 2))
+        self.speed_min, self.speed_max = (float(v) for v in spec.get("speed", (2.5, 4.5)))
+        self.width = int(spec.get("width", 18))
+        self.height = int(spec.get("height", 55))
+        self.score = int(spec.get("score", 10))
+        self.color = tuple(spec.get("color", (255, 50, 50)))
+        self.range = float(spec.get("range", 0.0))  # 0 for melee enemies
+        self.fire_interval = int(spec.get("fire_interval", 0))
+        self.shot_speed = float(spec.get("shot_speed", 0.0))
+        if self.health < 1 or self.speed_min > self.speed_max or self.width < 1 or self.height < 1:
+            raise ValueError(f"archetype {name!r}: bad health, speed or size")
+        if self.range and (self.fire_interval < 1 or self.shot_speed <= 0):
+            raise ValueError(f"archetype {name!r}: a ranged archetype needs fire_interval and shot_speed")
+
+class PickupTable:
+    def __init__(self, spec):
+        self.chance = float(spec.get("chance", 0.05))
+        self.lifetime = int(spec.get("lifetime", 480))
+        self.duration = int(spec.get("duration", 600))
+        kinds = spec.get("kinds", {kind: 1 for kind in POWERUPS})
+        unknown = set(kinds) - set(POWERUPS)
+        if unknown:
+            raise ValueError(f"unknown pickups {', '.join(sorted(unknown))}; expected some of {', '.join(POWERUPS)}")
+        self.kinds = list(kinds)
+        self.weights = [kinds[kind] for kind in self.kinds]
+        if not 0 <= self.chance <= 1 or self.lifetime < 1 or self.duration < 1 or not self.kinds:
+            raise ValueError("pickups: bad chance, lifetime, duration or kinds")
+
+class WaveScript:
+    def __init__(self, spec, path=None):
+        self.path = path
+        self.spec = spec
+        self.archetypes = [Archetype(i, name, fields) for i, (name, fields) in enumerate(spec["archetypes"].items())]
+        if not self.archetypes:
+            raise ValueError("a wave script needs at least one archetype")
+        self.kinds = {archetype.name: archetype.index for archetype in self.archetypes}
+        self.scripted = [self.compile_wave(wave.get("groups", [])) for wave in spec.get("waves", [])]
+        self.endless = spec.get("endless")
+        if self.endless is not None:
+            for name in self.endless.get("mix", {}):
+                self.kind(name)
+        self.compiled = {}  # endless wave number -> schedule
+        self.pickups = PickupTable(spec["pickups"]) if "pickups" in spec else None
+        self.hold_clock = bool(spec.get("hold_clock", False))
+        # Largest half-extent of any archetype, for the enemy grid's query padding
+        self.padding = max(math.ceil(max(a.width, a.height) / 2) for a in self.archetypes)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path) as f:
+            return cls(json.load(f), path)
+
+    def kind(self, name):
+        if name not in self.kinds:
+            raise ValueError(f"unknown archetype {name!r}")
+        return self.kinds[name]
+
+    def compile_wave(self, groups):
+        spawns = []
+        for group in groups:
+            kind = self.kind(group["archetype"])
+            side = group.get("side")
+            if side is not None and side not in SIDES:
+                raise ValueError(f"bad side {side!r}; expected one of {', '.join(SIDES)}")
+            start = int(group.get("start", 0))
+            interval = int(group.get("interval", DEFAULT_INTERVAL))
+            spawns.extend((start + interval * (k + 1), kind, side) for k in range(int(group["count"])))
+        spawns.sort(key=lambda spawn: spawn[0])  # stable, so same-tick spawns keep group order
+        return spawns
+
+    def compile_endless(self, wave):
+        endless = self.endless
+        size = min(endless.get("base", 2) + endless.get("growth", 3) * wave, endless.get("max", 25))
+        mix = list(endless.get("mix", {self.archetypes[0].name: 1}).items())
+        total = sum(weight for _, weight in mix)
+        # Largest-remainder split of the wave between the archetypes
+        shares = [size * weight / total for _, weight in mix]
+        counts = [int(share) for share in shares]
+        by_remainder = sorted(range(len(mix)), key=lambda i: counts[i] - shares[i])
+        for i in by_remainder[:size - sum(counts)]:
+            counts[i] += 1
+        # Spread each archetype's spawns evenly through the wave
+        order = sorted(((j + 0.5) / count, i) for i, count in enumerate(counts) for j in range(count))
+        interval = endless.get("interval", DEFAULT_INTERVAL)
+        return [(interval * (k + 1), self.kind(mix[i][0]), None) for k, (_, i) in enumerate(order)]
+
+    def schedule(self, wave):
+        """Spawns of `wave` (1-based) as (tick, kind, side) tuples, sorted by tick."""
+        if wave <= len(self.scripted):
+            return self.scripted[wave - 1]
+        if self.endless is None:
+            return self.scripted[-1] if self.scripted else []
+        spawns = self.compiled.get(wave)
+        if spawns is None:
+            spawns = self.compiled[wave] = self.compile_endless(wave)
+        return spawns
+
+_default = None
+
+def default_script():
+    """waves/default.json, loaded once per process."""
+    global _default
+    if _default is None:
+        _default = WaveScript.load()
+    return _default
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a wave script and print its spawn schedules.")
+    parser.add_argument("file", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--waves", type=int, default=12, help="how many waves to show")
+    args = parser.parse_args(argv)
+
+    script = WaveScript.load(args.file)
+    for archetype in script.archetypes:
+        kind = f"ranged {archetype.range:.0f}px" if archetype.range else "melee"
+        print(f"{archetype.name:>8}: health {archetype.health}, speed {archetype.speed_min}-{archetype.speed_max}, "
+              f"{archetype.width}x{archetype.height}, {archetype.score} points, {kind}")
+    for wave in range(1, args.waves + 1):
+        spawns = script.schedule(wave)
+        counts = {}
+        for _, kind, _ in spawns:
+            name = script.archetypes[kind].name
+            counts[name] = counts.get(name, 0) + 1
+        last = spawns[-1][0] if spawns else 0
+        mix = ", ".join(f"{count} {name}" for name, count in counts.items())
+        print(f"wave {wave:>3}: {len(spawns):>3} enemies, last at tick {last:>4} of the wave clock ({mix})")
+
+if __name__ == "__main__":
+    sys.exit(main())
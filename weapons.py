@@ -0,0 +1,34 @@
+# --- Weapons ---
+# What the player's gun fires. Every weapon's damage and projectile speed are
+# multiples of the World's bullet_damage and bullet_speed knobs, so balance
+# sweeps scale all of them together. A weapon is either a projectile gun
+# (pellets fanned out over `spread` radians, each optionally exploding for
+# area damage within `blast` px where it hits) or a beam, a hitscan ray
+# `beam` px long that passes through everything on it.
+#
+# Power-ups are timed: a weapon pickup swaps the gun for `duration` ticks
+# (see the wave script's "pickups"), and "rapid" halves the cooldown of
+# whatever is held for as long.
+
+from collections import namedtuple
+
+Weapon = namedtuple("Weapon", ["name", "cooldown", "damage", "pellets", "spread", "speed", "beam", "blast"])
+
+WEAPONS = {
+    "pistol": Weapon("pistol", cooldown=15, damage=1, pellets=1, spread=0.0, speed=1.0, beam=0, blast=0),
+    "spread": Weapon("spread", cooldown=22, damage=1, pellets=5, spread=0.5, speed=1.0, beam=0, blast=0),
+    "beam": Weapon("beam", cooldown=40, damage=2, pellets=0, spread=0.0, speed=0.0, beam=1400, blast=0),
+    "explosive": Weapon("explosive", cooldown=35, damage=2, pellets=1, spread=0.0, speed=0.75, beam=0, blast=90),
+}
+DEFAULT_WEAPON = "pistol"
+
+POWERUPS = ["spread", "beam", "explosive", "rapid"]  # index is the kind sent over the network and saved
+POWERUP_COLORS = {
+    "spread": (255, 165, 0),
+    "beam": (0, 220, 255),
+    "explosive": (255, 50, 50),
+    "rapid": (255, 255, 0),
+}
+RAPID_FACTOR = 0.5  # cooldown multiplier while rapid fire lasts
+BEAM_TICKS = 8  # how long a beam stays on screen after it fires
+BEAM_WIDTH = 6  # enemies this close to the ray are hit too